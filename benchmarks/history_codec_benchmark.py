@@ -0,0 +1,83 @@
+""" History wire format benchmark
+
+Compares the legacy history encoding (LangChain dumpd + json.dumps in the history provider
++ json.dumps in the list store, and the reverse with LangChain load on read) with the compact
+versioned format (encode_message + a single fast_json encoding in the list store).
+
+Reports serialize/deserialize cost per message and the stored size.
+
+Usage:
+    python benchmarks/history_codec_benchmark.py [--messages 10000]
+"""
+import argparse
+import json
+import time
+import warnings
+from langchain_core.load import dumpd, load
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from cel.assistants.macaw.macaw_message_codec import decode_message, encode_message
+from cel.stores.common import fast_json
+
+
+warnings.filterwarnings("ignore")
+
+
+def build_messages(count: int):
+    turn = [
+        HumanMessage("What is the price of BTC and ETH today?"),
+        AIMessage("", tool_calls=[
+            {"name": "get_price", "args": {"crypto": "BTC"}, "id": "call_1"},
+            {"name": "get_price", "args": {"crypto": "ETH"}, "id": "call_2"},
+        ]),
+        ToolMessage("BTC: 65000 USD", tool_call_id="call_1"),
+        ToolMessage("ETH: 3500 USD", tool_call_id="call_2"),
+        AIMessage("BTC is trading at 65000 USD and ETH at 3500 USD."),
+    ]
+    return (turn * (count // len(turn) + 1))[:count]
+
+
+def legacy_encode(msg):
+    return json.dumps(json.dumps(dumpd(msg)))
+
+
+def legacy_decode(data):
+    return load(json.loads(json.loads(data)))
+
+
+def compact_encode(msg):
+    return fast_json.dumps(encode_message(msg))
+
+
+def compact_decode(data):
+    return decode_message(fast_json.loads(data))
+
+
+def run(name: str, encode, decode, messages):
+    start = time.perf_counter()
+    stored = [encode(m) for m in messages]
+    enc = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode(d) for d in stored]
+    dec = time.perf_counter() - start
+
+    size = sum(len(d) for d in stored) / len(stored)
+    n = len(messages)
+    print(f"{name:<10} serialize {enc / n * 1e6:>8.2f} us/msg"
+          f"   deserialize {dec / n * 1e6:>8.2f} us/msg   {size:>7.1f} bytes/msg")
+    assert [m.content for m in decoded] == [m.content for m in messages]
+
+
+def main(count: int):
+    messages = build_messages(count)
+    print(f"{len(messages)} messages")
+    run("legacy", legacy_encode, legacy_decode, messages)
+    run("compact", compact_encode, compact_decode, messages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.messages)
@@ -0,0 +1,122 @@
+""" Markdown slicer benchmark
+
+Compares the legacy parse_markdown (a backwards breadcrumb walk per block, calling
+doc.children.index for every earlier block: O(n^3)) with the single pass iter_markdown
+(running heading stack) on a generated manual of several MB (~300 bytes per section).
+
+Reports parse time, slicing time, time to the first block and output parity. The legacy
+parser only runs on inputs up to --legacy-max-sections, 50 sections already take seconds.
+
+Usage:
+    python benchmarks/markdown_slicer_benchmark.py [--sections 10000] [--split-table-rows]
+"""
+import argparse
+import time
+import marko
+from loguru import logger
+
+from cel.rag.slicers.markdown import MarkdownSlicer
+from cel.rag.slicers.markdown.utils import Block, iter_markdown
+
+
+def build_markdown(sections: int) -> str:
+    parts = []
+    for i in range(sections):
+        parts.append(f"# Chapter {i}\n\nIntroduction of chapter {i}, it explains the main topic.\n")
+        parts.append(f"## Setup {i}\n\nInstall the package and configure the credentials for step {i}.\n")
+        parts.append(f"### Details {i}\n\nThe service retries failed requests up to {i % 5 + 1} times.\n")
+        parts.append("| Option | Default |\n| --- | --- |\n| timeout | 20 |\n| retries | 3 |\n")
+    return "\n".join(parts)
+
+
+def legacy_build_breadcrumbs(doc, current_index):
+    breadcrumbs = []
+    current_level = float('inf')
+    for block in reversed(doc.children[:current_index]):
+        if doc.children.index(block) >= current_index:
+            break
+        if block.get_type().lower() == 'heading':
+            level = block.level
+            if level < current_level:
+                current_level = level
+                breadcrumbs.append(block.children[0].children)
+    breadcrumbs.reverse()
+    return breadcrumbs
+
+
+def legacy_parse_markdown(md: str, split_table_rows: bool = False) -> list[Block]:
+    from marko.md_renderer import MarkdownRenderer
+    mdr = marko.Markdown(extensions=['gfm'], renderer=MarkdownRenderer)
+    doc = mdr.parse(md)
+    block_types = ['paragraph', 'code', 'blockquote', 'html', 'hr', 'list', 'listitem', 'table', 'tablerow', 'tablecell', 'strong', 'em', 'codespan', 'br', 'del', 'link', 'image', 'text']
+    blocks = []
+    for child in doc.children:
+        type = child.get_type().lower()
+        if type in block_types:
+            text = child.children[0].children
+            child_index = doc.children.index(child)
+            bc = legacy_build_breadcrumbs(doc, child_index)
+            blocks.append(Block(type=type, text=text, index=child_index, breadcrumbs=bc))
+        if type == 'table':
+            table = []
+            header = child.children[0].children
+            rows = child.children[1:]
+            if split_table_rows:
+                header_text = ' | '.join([cell.children[0].children for cell in header])
+                header_sepator = ' | '.join(['---' for cell in header])
+                for row in rows:
+                    row_text = ' | '.join([cell.children[0].children for cell in row.children])
+                    table.append(f"{header_text}\n{header_sepator}\n{row_text}")
+                for row in table:
+                    child_index = doc.children.index(child)
+                    bc = legacy_build_breadcrumbs(doc, child_index)
+                    blocks.append(Block(type='table', text=row, index=child_index, breadcrumbs=bc))
+            else:
+                table_text = mdr.render(child)
+                bc = legacy_build_breadcrumbs(doc, child_index)
+                blocks.append(Block(type='table', text=table_text, index=doc.children.index(child), breadcrumbs=bc))
+    return blocks
+
+
+def run(name: str, parse, md: str, split_table_rows: bool):
+    start = time.perf_counter()
+    blocks = parse(md, split_table_rows)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed:>8.3f} s   {len(blocks):>7} blocks")
+    return blocks
+
+
+def main(sections: int, legacy_max_sections: int, split_table_rows: bool):
+    # per block debug logging is not part of the measure
+    logger.remove()
+    md = build_markdown(sections)
+    print(f"{sections} sections, {len(md) / 1e6:.1f} MB")
+
+    blocks = run("single pass", lambda md, split: list(iter_markdown(md, split)), md, split_table_rows)
+
+    start = time.perf_counter()
+    next(iter_markdown(md, split_table_rows))
+    print(f"{'first block':<12} {time.perf_counter() - start:>8.3f} s   (parse + first yield)")
+
+    start = time.perf_counter()
+    count = sum(1 for _ in MarkdownSlicer("bench", content=md, split_table_rows=split_table_rows).iter_slices())
+    print(f"{'slicer':<12} {time.perf_counter() - start:>8.3f} s   {count:>7} slices")
+
+    legacy_md = md if sections <= legacy_max_sections else build_markdown(legacy_max_sections)
+    if legacy_md is not md:
+        print(f"legacy on {legacy_max_sections} sections, {len(legacy_md) / 1e6:.1f} MB")
+        blocks = run("single pass", lambda md, split: list(iter_markdown(md, split)), legacy_md, split_table_rows)
+    legacy = run("legacy", legacy_parse_markdown, legacy_md, split_table_rows)
+    # the text of some blocks is a list of marko elements, compare their rendering
+    key = lambda b: (b.type, str(b.text), b.index, b.breadcrumbs)
+    assert [key(b) for b in legacy] == [key(b) for b in blocks], "single pass output differs from legacy"
+    print("parity ok")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=10000)
+    parser.add_argument("--legacy-max-sections", type=int, default=50)
+    parser.add_argument("--split-table-rows", action="store_true")
+    args = parser.parse_args()
+    main(args.sections, args.legacy_max_sections, args.split_table_rows)
@@ -0,0 +1,84 @@
+""" Streaming sentence detection benchmark
+
+Compares the legacy pySBD detector (re-segments the buffer on every token) with the
+incremental StreamingSentenceSegmenter, with and without the pySBD fallback.
+
+Reports tokens/sec, first sentence latency and output parity against the legacy detector.
+
+Usage:
+    python benchmarks/sentence_detection_benchmark.py [--sentences 200] [--token-size 4]
+"""
+import argparse
+import asyncio
+import time
+import pysbd
+
+from cel.assistants.stream_content_chunk import StreamContentChunk
+from cel.comms.sentense_detection import streaming_sentence_detector_async
+
+
+SAMPLE = (
+    "Holi is a popular ancient Hindu festival, also known as the \"Festival of Colors\". "
+    "The festival celebrates the arrival of spring, the end of winter and the blossoming of love! "
+    "Dr. Smith said it costs about 3.50 USD per person, e.g. for the colored powder. "
+    "Is it celebrated outside India? Yes, it has spread to parts of Europe and North America.\n"
+)
+
+
+async def legacy_detector_async(stream, language="en"):
+    """pySBD detector as it was before the incremental segmenter"""
+    buffer = ''
+    seg = pysbd.Segmenter(language=language, clean=False)
+    async for chunk in stream:
+        buffer += chunk.content
+        sentences = seg.segment(buffer)
+        if len(sentences) > 1:
+            for sentence in sentences[:-1]:
+                yield StreamContentChunk(content=sentence, is_partial=True)
+            buffer = sentences[-1]
+    if buffer:
+        yield StreamContentChunk(content=buffer, is_partial=True)
+
+
+def build_tokens(sentences: int, token_size: int) -> list[str]:
+    text = SAMPLE * (sentences // 4 + 1)
+    return [text[i:i + token_size] for i in range(0, len(text), token_size)]
+
+
+async def token_stream(tokens: list[str]):
+    for t in tokens:
+        yield StreamContentChunk(content=t, is_partial=True)
+
+
+async def run(name: str, detector, tokens: list[str]):
+    start = time.perf_counter()
+    first = None
+    out = []
+    async for sentence in detector(token_stream(tokens)):
+        if first is None:
+            first = time.perf_counter() - start
+        out.append(sentence.content)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {len(tokens) / elapsed:>14,.0f} tok/s {elapsed * 1000:>10.1f} ms"
+          f" {first * 1000:>10.3f} ms first sentence {len(out):>6} sentences")
+    return out
+
+
+async def main(sentences: int, token_size: int):
+    tokens = build_tokens(sentences, token_size)
+    print(f"{len(tokens)} tokens, {sum(len(t) for t in tokens)} chars")
+    legacy = await run("legacy pySBD", legacy_detector_async, tokens)
+    incremental = await run("incremental", streaming_sentence_detector_async, tokens)
+    fallback = await run("incremental + pySBD",
+                         lambda s: streaming_sentence_detector_async(s, use_pysbd=True),
+                         tokens)
+    print(f"parity incremental: {incremental == legacy}")
+    print(f"parity incremental + pySBD: {fallback == legacy}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--token-size", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.sentences, args.token_size))
@@ -5,6 +5,7 @@ from loguru import logger as log
 from cel.assistants.base_assistant import BaseAssistant
 from cel.assistants.macaw.macaw_history_adapter import MacawHistoryAdapter
 from cel.assistants.macaw.macaw_inference_context import MacawNlpInferenceContext
+from cel.assistants.macaw.macaw_llm_pool import MacawLLMPool, get_functions_key
 from cel.assistants.macaw.macaw_nlp import MacawFunctionCall, blend_message, process_insights, process_new_message
 from cel.assistants.macaw.macaw_settings import MacawSettings
 from cel.gateway.model.conversation_lead import ConversationLead
@@ -12,7 +13,8 @@ from cel.gateway.model.message import Message
 from cel.prompt.prompt_template import PromptTemplate
 from cel.stores.history.base_history_provider import BaseHistoryProvider
 from cel.stores.state.base_state_provider import BaseChatStateProvider
-from langchain.load.load import loads, load
+from langchain.load.load import loads
+from cel.assistants.macaw.macaw_message_codec import decode_message
 from langchain.load.dump import dumps
 
 
@@ -67,8 +69,22 @@ class MacawAssistant(BaseAssistant):
             log.warning("No settings provided for Macaw Assistant, using default settings")
         self.settings = settings or MacawSettings()
         self.llm = llm
+        # LLM clients and tool bindings are reused across messages
+        self.llm_pool = MacawLLMPool()
+        self._functions_key = None
         log.debug(f"Macaw Assistant initialized with settings: {self.settings}")
         
+    def function(self, name, desc, params):
+        # the function set changed, tool bindings must be rebuilt
+        self._functions_key = None
+        self.llm_pool.invalidate_tools()
+        return super().function(name, desc, params)
+
+    def get_functions_key(self) -> str:
+        if self._functions_key is None:
+            self._functions_key = get_functions_key(self.get_functions())
+        return self._functions_key
+
 
     async def new_message(self, message: Message, local_state: dict = {}):
         # create context
@@ -82,7 +98,9 @@ class MacawAssistant(BaseAssistant):
             state_store=self._state_store,
             settings=self.settings,
             rag_retriever=self.rag_retriever,
-            llm=self.llm
+            llm=self.llm,
+            llm_pool=self.llm_pool,
+            functions_key=self.get_functions_key()
         )
         
         async def on_function_call(ctx: MacawNlpInferenceContext, call: MacawFunctionCall):
@@ -115,7 +133,8 @@ class MacawAssistant(BaseAssistant):
             local_state={},
             history_store=self._history_store,
             state_store=self._state_store,
-            settings=self.settings
+            settings=self.settings,
+            llm_pool=self.llm_pool
         )
         
         
@@ -141,7 +160,8 @@ class MacawAssistant(BaseAssistant):
                 local_state={},
                 history_store=self._history_store,
                 state_store=self._state_store,
-                settings=self.settings
+                settings=self.settings,
+                llm_pool=self.llm_pool
             )
             
             insights = await process_insights(ctx, targets=mix_targets)
@@ -196,7 +216,7 @@ class MacawAssistant(BaseAssistant):
                 return
 
             for h in history:
-                aux = load(h)
+                aux = decode_message(h)
                 log.debug(f"History: {aux}")
                 yield dumps(aux)
             
@@ -1,7 +1,6 @@
 from cel.gateway.model.conversation_lead import ConversationLead
-from langchain.load.dump import dumpd
-from langchain.load.load import load
 from langchain_core.messages import BaseMessage
+from cel.assistants.macaw.macaw_message_codec import decode_message, encode_message, is_tool_message
 from cel.stores.history.base_history_provider import BaseHistoryProvider
 
 
@@ -11,15 +10,45 @@ class MacawHistoryAdapter:
 
     async def append_to_history(self, lead: ConversationLead, entry: BaseMessage, metadata=None, ttl=None):
         assert isinstance(lead, ConversationLead), f"Expected ConversationLead, got {type (lead)}"
-        aux = dumpd(entry)
+        aux = encode_message(entry)
         await self.store.append_to_history(lead.get_session_id(), aux, metadata, ttl)
 
+    async def append_many(self, lead: ConversationLead, entries: list[BaseMessage], metadata=None, ttl=None):
+        assert isinstance(lead, ConversationLead), f"Expected ConversationLead, got {type (lead)}"
+        await self.store.append_many(lead.get_session_id(), [encode_message(e) for e in entries], metadata, ttl)
+
     async def get_history(self, lead: ConversationLead) -> list[BaseMessage]:
         assert isinstance(lead, ConversationLead), f"Expected ConversationLead, got {type (lead)}"
         history = await self.store.get_history(lead.get_session_id())
-        return [load(h) for h in history]
+        return [decode_message(h) for h in history if h]
 
 
+    async def get_history_window(self, lead: ConversationLead, count: int, max_count: int = None) -> list[BaseMessage]:
+        """Read only the tail of the history needed for a window of count messages.
+        
+        If the tail starts with ToolMessages, the read is extended backwards (up to max_count,
+        defaults to 4 * count) until it includes the AI message that made the tool calls,
+        so tool-call/tool-message pairs are not broken. Entries are checked before decoding,
+        only the returned window is deserialized.
+        """
+        assert isinstance(lead, ConversationLead), f"Expected ConversationLead, got {type (lead)}"
+        if count <= 0:
+            return []
+        session_id = lead.get_session_id()
+        max_count = max(count, max_count or 4 * count)
+        
+        fetch = count
+        msgs = await self.store.get_last_messages(session_id, fetch)
+        while len(msgs) == fetch and msgs and is_tool_message(msgs[0]) and fetch < max_count:
+            fetch = min(fetch + count, max_count)
+            msgs = await self.store.get_last_messages(session_id, fetch)
+        
+        # Orphan ToolMessages (group longer than max_count) are dropped
+        start = 0
+        while start < len(msgs) and is_tool_message(msgs[start]):
+            start += 1
+        return [decode_message(m) for m in msgs[start:] if m]
+
     async def clear_history(self, lead: ConversationLead, keep_last_messages=None):
         assert isinstance(lead, ConversationLead), f"Expected ConversationLead, got {type (lead)}"
         await self.store.clear_history(lead.get_session_id(), keep_last_messages)
@@ -27,7 +56,7 @@ class MacawHistoryAdapter:
     async def get_last_messages(self, lead: ConversationLead, count) -> list[BaseMessage]:
         assert isinstance(lead, ConversationLead), f"Expected ConversationLead, got {type (lead)}"
         msgs = await self.store.get_last_messages(lead.get_session_id(), count)
-        return [load(m) for m in msgs]
+        return [decode_message(m) for m in msgs if m]
 
     async def close_conversation(self, lead: ConversationLead):
         raise NotImplementedError
\ No newline at end of file
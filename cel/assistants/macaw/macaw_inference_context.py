@@ -1,4 +1,5 @@
 from cel.assistants.common import FunctionDefinition
+from cel.assistants.macaw.macaw_llm_pool import MacawLLMPool
 from cel.assistants.macaw.macaw_settings import MacawSettings
 from cel.gateway.model.conversation_lead import ConversationLead
 from cel.prompt.prompt_template import PromptTemplate
@@ -25,4 +26,7 @@ class MacawNlpInferenceContext(ABC):
     llm_kwargs: dict[str, Any] = None
     history_store: BaseHistoryProvider = None
     state_store: BaseChatStateProvider = None
-    llm: Any = None
\ No newline at end of file
+    llm: Any = None
+    # optional shared pool of LLM clients, if None a new client is created per call
+    llm_pool: MacawLLMPool = None
+    functions_key: str = None
\ No newline at end of file
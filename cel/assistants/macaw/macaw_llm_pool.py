@@ -0,0 +1,81 @@
+import hashlib
+import json
+from dataclasses import asdict
+from typing import Any, Callable
+import cachetools
+from loguru import logger as log
+from cel.assistants.common import FunctionDefinition
+from cel.assistants.macaw.macaw_utils import map_functions_to_tool_messages
+
+
+def get_functions_key(functions: list[FunctionDefinition]) -> str:
+    """Stable hash of a function set, used to key tool-bound runnables"""
+    if not functions:
+        return ''
+    data = json.dumps([asdict(f) for f in functions], sort_keys=True)
+    return hashlib.md5(data.encode('utf-8')).hexdigest()
+
+
+def _settings_key(settings: dict) -> str:
+    return json.dumps(settings, sort_keys=True, default=repr)
+
+
+class MacawLLMPool:
+    """Keyed cache of LLM clients and tool-bound runnables.
+
+    Building a ChatOpenAI client per message throws away its HTTP connection pool
+    and TLS sessions, and bind_tools re-maps the tool schemas every time. The pool
+    keeps one client per (llm class, settings) and one tool-bound runnable per
+    (llm class, settings, function set).
+
+    Args:
+        maxsize (int, optional): Max number of clients and runnables kept in each cache. Defaults to 32.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self._llms = cachetools.LRUCache(maxsize=maxsize)
+        self._runnables = cachetools.LRUCache(maxsize=maxsize)
+
+    def get_llm(self, llm_factory: Callable[..., Any], settings: dict):
+        """Return a cached LLM client built with llm_factory(**settings)"""
+        key = (llm_factory, _settings_key(settings))
+        llm = self._llms.get(key)
+        if llm is None:
+            log.debug(f"MacawLLMPool: creating LLM client for model: {settings.get('model')}")
+            llm = llm_factory(**settings)
+            self._llms[key] = llm
+        return llm
+
+    def get_llm_with_tools(self,
+                           llm_factory: Callable[..., Any],
+                           settings: dict,
+                           functions: list[FunctionDefinition],
+                           functions_key: str = None):
+        """Return a cached runnable with the functions bound as tools.
+        If the LLM does not support tools, the plain LLM client is returned."""
+        llm = self.get_llm(llm_factory, settings)
+        if not functions:
+            return llm
+
+        functions_key = functions_key or get_functions_key(functions)
+        key = (llm_factory, _settings_key(settings), functions_key)
+        runnable = self._runnables.get(key)
+        if runnable is None:
+            try:
+                runnable = llm.bind_tools(map_functions_to_tool_messages(functions))
+            except Exception as e:
+                if isinstance(e, NotImplementedError):
+                    log.error(f"Error binding tools: Functions not implemented")
+                else:
+                    log.error(f"Error binding tools: {e}")
+                runnable = llm
+            self._runnables[key] = runnable
+        return runnable
+
+    def invalidate_tools(self):
+        """Drop the tool-bound runnables, call it when the function set changes"""
+        self._runnables.clear()
+
+    def clear(self):
+        self._llms.clear()
+        self._runnables.clear()
@@ -0,0 +1,86 @@
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+
+# Wire format version of the stored history entries
+MESSAGE_FORMAT_VERSION = 1
+
+# Stored entry (v1):
+# {
+#     "v": 1,
+#     "t": "human" | "ai" | "tool" | "system",
+#     "c": content (str or list of content blocks),
+#     "tc": [{"id": ..., "name": ..., "args": {...}}],   # ai only, optional
+#     "tid": tool_call_id,                               # tool only
+#     "n": name,                                         # optional
+#     "s": "error",                                      # tool only, optional
+# }
+
+
+def encode_message(msg: BaseMessage) -> dict:
+    """Encode a message to the compact history wire format.
+    Only role, content, name and tool calls are kept, chunk and response metadata are dropped."""
+    entry = {"v": MESSAGE_FORMAT_VERSION, "t": msg.type, "c": msg.content}
+    if msg.type == "AIMessageChunk":
+        entry["t"] = "ai"
+    if msg.name:
+        entry["n"] = msg.name
+
+    if isinstance(msg, AIMessage):
+        if msg.tool_calls:
+            entry["tc"] = [{"id": tc["id"], "name": tc["name"], "args": tc["args"]}
+                           for tc in msg.tool_calls]
+    elif isinstance(msg, ToolMessage):
+        entry["tid"] = msg.tool_call_id
+        if msg.status != "success":
+            entry["s"] = msg.status
+    elif msg.type not in ("human", "system"):
+        raise ValueError(f"Macaw message codec: unsupported message type: {msg.type}")
+    return entry
+
+
+def decode_message(entry: dict) -> BaseMessage:
+    """Decode a stored history entry.
+    Entries stored with LangChain dumpd (before the compact format) are loaded with LangChain load."""
+    if "lc" in entry:
+        return _load_legacy(entry)
+
+    version = entry.get("v")
+    if version != MESSAGE_FORMAT_VERSION:
+        raise ValueError(f"Macaw message codec: unsupported format version: {version}")
+
+    t = entry["t"]
+    content = entry.get("c", "")
+    name = entry.get("n")
+    if t == "human":
+        return HumanMessage(content, name=name)
+    if t == "ai":
+        return AIMessage(content, name=name, tool_calls=[
+            {"id": tc["id"], "name": tc["name"], "args": tc["args"], "type": "tool_call"}
+            for tc in entry.get("tc", [])
+        ])
+    if t == "tool":
+        return ToolMessage(content, tool_call_id=entry["tid"], name=name, status=entry.get("s", "success"))
+    if t == "system":
+        return SystemMessage(content, name=name)
+    raise ValueError(f"Macaw message codec: unsupported message type: {t}")
+
+
+def is_tool_message(entry: dict) -> bool:
+    """Check the role of a stored entry without decoding it"""
+    if not isinstance(entry, dict):
+        return False
+    if "lc" in entry:
+        # dumpd: {"id": ["langchain", "schema", "messages", "ToolMessage"], ...}
+        return (entry.get("id") or [None])[-1] == "ToolMessage"
+    return entry.get("t") == "tool"
+
+
+def _load_legacy(entry: dict) -> BaseMessage:
+    from langchain_core.load import load
+    return load(entry)
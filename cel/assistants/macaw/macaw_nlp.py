@@ -8,8 +8,11 @@ from cel.assistants.common import EventResponse
 from cel.assistants.macaw.custom_chat_models.chat_open_router import ChatOpenRouter
 from cel.assistants.macaw.macaw_inference_context import MacawNlpInferenceContext
 from cel.assistants.macaw.macaw_history_adapter import MacawHistoryAdapter
-from cel.assistants.macaw.macaw_utils import get_last_n_elements, map_functions_to_tool_messages
+from cel.assistants.macaw.macaw_llm_pool import MacawLLMPool
+from cel.assistants.macaw.macaw_utils import get_last_n_elements
 from cel.assistants.stream_content_chunk import StreamContentChunk
+from cel.gateway.speculation import wait_for_commit
+from cel.rag.context_builder import build_rag_context
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, ToolMessage, AIMessageChunk
 from langchain_core.messages import (
@@ -36,6 +39,72 @@ class MacawFunctionCall:
     args: dict
     id: str     
 
+
+def build_llm(ctx: MacawNlpInferenceContext, settings: dict):
+    """Get the LLM client for these settings, from the context pool if available"""
+    llm_factory = ctx.llm or ChatOpenAI
+    kwargs = {**settings, **(ctx.llm_kwargs or {})}
+    if ctx.llm_pool is not None:
+        return ctx.llm_pool.get_llm(llm_factory, kwargs)
+    return llm_factory(**kwargs)
+
+
+def build_llm_with_tools(ctx: MacawNlpInferenceContext, settings: dict):
+    """Get the LLM runnable with the context functions bound as tools"""
+    llm_factory = ctx.llm or ChatOpenAI
+    kwargs = {**settings, **(ctx.llm_kwargs or {})}
+    pool = ctx.llm_pool if ctx.llm_pool is not None else MacawLLMPool(maxsize=1)
+    return pool.get_llm_with_tools(llm_factory, kwargs, ctx.functions, ctx.functions_key)
+
+async def call_tool(ctx: MacawNlpInferenceContext, tool_call: dict, on_function_call) -> tuple[ToolMessage, bool]:
+    """Call a single tool, returns the ToolMessage and whether the AI response must be cancelled"""
+    name = tool_call.get("name")
+    args = tool_call.get("args")
+    id = tool_call.get("id")
+    log.debug(f"Function: {name} called with params: {args}")
+    cancel_ai = False
+    try:
+        mtool_call = MacawFunctionCall(name, args, id)
+        func_output = await on_function_call(ctx, mtool_call)
+        
+        response_text = None
+        if isinstance(func_output, FunctionResponse):
+            response_text = func_output.text
+        elif isinstance(func_output, EventResponse):
+            if func_output.disable_ai_response:
+                cancel_ai = True
+                log.debug(f"Function {name} requested cancel_ai_response")
+            response_text = "ok"
+        elif isinstance(func_output, str):
+            response_text = func_output
+        else:
+            response_text = "Data not found"
+
+        log.debug(f"History udpated: func: {name} called with params: {args} -> {response_text}")
+        return ToolMessage(response_text, tool_call_id=id), cancel_ai
+
+    except Exception as e:
+        log.critical(f"Error calling function: {name} with args: {args} - {e}")
+        tool_output = "In this moment I can't process this request."
+        # NOTE: If one function fails, the rest of the functions are still called.
+        # ToolCall messages with no ToolMessage break the history, 
+        # it's better to have a message with the error.
+        return ToolMessage(tool_output, tool_call_id=id), cancel_ai
+
+
+async def call_tools(ctx: MacawNlpInferenceContext, tool_calls: list[dict], on_function_call) -> tuple[list[ToolMessage], bool]:
+    """Call the independent tools of a single turn concurrently, at most
+    core_max_parallel_function_calls at a time. ToolMessages keep the tool_calls order."""
+    semaphore = asyncio.Semaphore(max(1, ctx.settings.core_max_parallel_function_calls))
+    
+    async def limited(tool_call):
+        async with semaphore:
+            return await call_tool(ctx, tool_call, on_function_call)
+    
+    results = await asyncio.gather(*[limited(tool_call) for tool_call in tool_calls])
+    return [msg for msg, _ in results], any(cancel for _, cancel in results)
+
+
 @traceable
 async def process_new_message(ctx: MacawNlpInferenceContext, message: str, on_function_call=None):
     assert isinstance(ctx, MacawNlpInferenceContext),\
@@ -54,57 +123,9 @@ async def process_new_message(ctx: MacawNlpInferenceContext, message: str, on_fu
     settings["timeout"] = ctx.settings.core_timeout
     settings["max_retries"] = ctx.settings.core_max_retries
     # **{"model": "mistralai/mixtral-8x7b-instruct"}
-    # merge kwargs
-    ctx.llm = ctx.llm or ChatOpenAI
-    llm = ctx.llm(
-        **{**settings, **(ctx.llm_kwargs or {})}
-    )
-
-    try:
-        # Toolling
-        functions = ctx.functions
-        if functions is not None and len(functions) > 0:
-            mapfuncs = map_functions_to_tool_messages(functions)
-            llm_with_tools = llm.bind_tools(mapfuncs)
-        else:
-            llm_with_tools = llm
-    except Exception as e:
-        if isinstance(e, NotImplementedError):
-            log.error(f"Error binding tools: Functions not implemented")
-        else:
-            log.error(f"Error binding tools: {e}")
-        llm_with_tools = llm    
-    
-    # Build State
-    # ------------------------------------------------------------------------
-    try:
-        stored_state = await ctx.state_store.get_store(ctx.lead.get_session_id()) or {}    
-        # TODO: Remove this when the self.init_state is removed
-        stored_state.update(ctx.init_state or {})
-    except Exception as e:
-        raise ValueError("Macaw NLP: Error getting stored state") from e
-
-
-
-    # Compile prompt
-    # ------------------------------------------------------------------------  
-    try: 
-        prompt = await ctx.prompt.compile(stored_state, ctx.lead, message=message)
-    except Exception as e:
-        raise ValueError("Macaw NLP: Error compiling prompt") from e
-    
-    # RAG
-    # ------------------------------------------------------------------------
+    # Toolling, clients and tool bindings are reused from the pool
+    llm_with_tools = build_llm_with_tools(ctx, settings)
     
-    # Prompt > System Message
-    history = [SystemMessage(prompt)]
-
-    # Load messages from store before RAG retrieval
-    msgs = await history_store.get_history(ctx.lead) or []
-
-    # append to messages
-    history.extend(msgs)
-
     # Add the human message
     input_msg = HumanMessage(message)
     
@@ -112,6 +133,50 @@ async def process_new_message(ctx: MacawNlpInferenceContext, message: str, on_fu
     # If everything goes well, we will append this list to the history
     # at the end of the process
     new_messages = [input_msg]
+
+    # Build State and compile prompt
+    # ------------------------------------------------------------------------
+    async def load_state_and_prompt():
+        try:
+            stored_state = await ctx.state_store.get_store(ctx.lead.get_session_id()) or {}    
+            # TODO: Remove this when the self.init_state is removed
+            stored_state.update(ctx.init_state or {})
+        except Exception as e:
+            raise ValueError("Macaw NLP: Error getting stored state") from e
+
+        try: 
+            return await ctx.prompt.compile(stored_state, ctx.lead, message=message)
+        except Exception as e:
+            raise ValueError("Macaw NLP: Error compiling prompt") from e
+
+    # Load history and RAG
+    # ------------------------------------------------------------------------
+    async def load_history_and_rag():
+        # Only the tail needed for the window is read and deserialized
+        msgs = await history_store.get_history_window(ctx.lead, ctx.settings.core_history_window_length) or []
+        if not ctx.rag_retriever:
+            return msgs, None
+        # The retriever gets the conversation without the system prompt,
+        # so it does not wait for the prompt compilation
+        rag_response = await ctx.rag_retriever.asearch(message, ctx.settings.core_rag_knn, msgs + new_messages)
+        return msgs, rag_response
+
+    # Retrieval (embedding + vector search) runs while the state is loaded
+    # and the prompt is compiled
+    prompt, (msgs, rag_response) = await asyncio.gather(load_state_and_prompt(), load_history_and_rag())
+
+    # Retrieved passages are part of the system message
+    rag_context = build_rag_context(rag_response,
+                                    max_tokens=ctx.settings.core_rag_max_tokens,
+                                    max_distance=ctx.settings.core_rag_max_distance)
+    if rag_context:
+        prompt = f"{prompt}\n\n{rag_context}"
+
+    # Prompt > System Message
+    history = [SystemMessage(prompt)]
+
+    # append to messages
+    history.extend(msgs)
     
     # Slice the messages 
     try:
@@ -123,12 +188,6 @@ async def process_new_message(ctx: MacawNlpInferenceContext, message: str, on_fu
         # or keep on processing the whole history?
         # For now, we keep on processing the whole history
 
-    if ctx.rag_retriever:
-        rag_response = ctx.rag_retriever.search(message, ctx.settings.core_rag_knn, history + new_messages)
-        if rag_response:
-            for vr in rag_response:
-                prompt += f"\n{vr.text or ''}" 
-
     response = None
     try:
         # Process LLM invoke in a stream
@@ -157,80 +216,45 @@ async def process_new_message(ctx: MacawNlpInferenceContext, message: str, on_fu
             # easy way to avoid infinite loop$
                 
             cancel_ai = False
-            yielded_to_gateway = False
             for idx in range(ctx.settings.core_max_function_calls_in_message):
-                if response.tool_calls:
-                    # Do all function calls
-                    for tool_call in response.tool_calls: 
-                        name = tool_call.get("name")
-                        args = tool_call.get("args")
-                        id = tool_call.get("id")
-                        log.debug(f"Function: {name} called with params: {args}")
-                        try:
-                            mtool_call = MacawFunctionCall(name, args, id)
-                            func_output = await on_function_call(ctx, mtool_call)
-                            
-                            response_text = None
-                            if isinstance(func_output, FunctionResponse):
-                                response_text = func_output.text
-                            elif isinstance(func_output, EventResponse):
-                                if func_output.disable_ai_response:
-                                    cancel_ai = True
-                                    log.debug(f"Function {name} requested cancel_ai_response")
-                                response_text = "ok"
-                            elif isinstance(func_output, str):
-                                response_text = func_output
-                            else:
-                                response_text = "Data not found"
-
-                            msg = ToolMessage(response_text, tool_call_id=id)
-                            new_messages.append(msg)
-                            log.debug(f"History udpated: func: {name} called with params: {args} -> {response_text}")
-
-                        except Exception as e:
-                            log.critical(f"Error calling function: {name} with args: {args} - {e}")
-                            tool_output = "In this moment I can't process this request."
-                            msg = ToolMessage(tool_output, tool_call_id=id)
-                            new_messages.append(msg)
-
-                            # break
-                            # NOTE: If one function fails, the rest of the functions are not called?
-                            # This is a design decision, we can change it later.
-                            # ----------
-                            # NOTE: Removed due broken behavior. If one function fails, the history ends badly. 
-                            # ToolCall messages end with no ToolMessage. It's better to have a message with the error.
-
-                    # Si cancel_ai_response fue solicitado, no re-invocar al LLM
-                    if cancel_ai:
-                        log.debug("cancel_ai_response: skipping further LLM invocation")
-                        break
-
-                    # Process response
-                    response = llm_with_tools.invoke(history + new_messages)
-                    new_messages.append(response)
+                if not response.tool_calls:
+                    break
+
+                # Tools have side effects, wait for the speculation verdict (if any)
+                if not await wait_for_commit():
+                    log.warning(f"Macaw NLP: speculative response rejected, session: {ctx.lead.get_session_id()}")
+                    return
+
+                # Do all function calls of this turn concurrently
+                tool_messages, cancel_ai = await call_tools(ctx, response.tool_calls, on_function_call)
+                new_messages.extend(tool_messages)
+
+                # Si cancel_ai_response fue solicitado, no re-invocar al LLM
+                if cancel_ai:
+                    log.debug("cancel_ai_response: skipping further LLM invocation")
+                    break
+
+                # Process response, content is streamed to the gateway as it arrives
+                response = None
+                async for delta in llm_with_tools.astream(history + new_messages):
+                    assert isinstance(delta, AIMessageChunk)
+                    if response is None:
+                        response = delta
+                    else:
+                        response += delta
+
                     if not response.tool_calls:
-                        yielded_to_gateway = True
-                        yield StreamContentChunk(content=response.content, is_partial=True)
-                        break
-                else:
-                    yielded_to_gateway = True
-                    yield StreamContentChunk(content=response.content, is_partial=True)
+                        yield StreamContentChunk(content=delta.content, is_partial=True)
+                if response is None:
+                    log.warning(f"Macaw NLP: empty LLM response after tool calls, session: {ctx.lead.get_session_id()}")
                     break
+                new_messages.append(response)
 
-            if not yielded_to_gateway:
-                content = response.content if response else None
-                if (
-                    response
-                    and not response.tool_calls
-                    and isinstance(content, str)
-                    and content.strip()
-                ):
-                    log.warning(
-                        "Macaw NLP: yielding final response after tool loop exhausted "
-                        f"(session={ctx.lead.get_session_id()})"
-                    )
-                    yielded_to_gateway = True
-                    yield StreamContentChunk(content=content, is_partial=True)
+            if response is not None and response.tool_calls and not cancel_ai:
+                log.warning(
+                    "Macaw NLP: tool loop exhausted with pending tool calls "
+                    f"(session={ctx.lead.get_session_id()})"
+                )
                 
             # TODO: This validation may not be needed
             # -----------------------------------------------
@@ -262,16 +286,19 @@ async def process_new_message(ctx: MacawNlpInferenceContext, message: str, on_fu
             #     raise ValueError("Macaw NLP process_message: Number of tool calls must be the same as the number of ToolMessages") 
 
             
-            # TODO: add support for storing batch messages
-            for msg in new_messages:
-                await history_store.append_to_history(ctx.lead, msg)
+            if not await wait_for_commit():
+                log.warning(f"Macaw NLP: speculative response rejected, session: {ctx.lead.get_session_id()}")
+                return
+            await history_store.append_many(ctx.lead, new_messages)
 
             log.debug(f"Validated history store udpated with tool calls: {len(new_messages)} messages stored, session: {ctx.lead.get_session_id()}")
         else:
             # No tool calls, we can store the new_messages in the history
-            # TODO: add support for storing batch messages
-            for msg in new_messages:
-                await history_store.append_to_history(ctx.lead, msg)
+            # (once the speculation verdict, if any, accepted the message)
+            if not await wait_for_commit():
+                log.warning(f"Macaw NLP: speculative response rejected, session: {ctx.lead.get_session_id()}")
+                return
+            await history_store.append_many(ctx.lead, new_messages)
             log.debug(f"History store udpated: {len(new_messages)} messages stored, session: {ctx.lead.get_session_id()}")
 
             
@@ -306,10 +333,7 @@ async def blend_message(ctx: MacawNlpInferenceContext, message: str, history_len
     settings["max_retries"] = ctx.settings.blend_max_retries
     
     # merge kwargs
-    ctx.llm = ctx.llm or ChatOpenAI
-    llm = ctx.llm(
-        **{**settings, **(ctx.llm_kwargs or {})}
-    )
+    llm = build_llm(ctx, settings)
 
 
     # Load messages from store
@@ -337,7 +361,7 @@ async def blend_message(ctx: MacawNlpInferenceContext, message: str, history_len
         HumanMessage(prompt_message)
     ]
 
-    res = llm.invoke(messages)    
+    res = await llm.ainvoke(messages)
 
     return res.content
 
@@ -363,10 +387,10 @@ async def process_insights(ctx: MacawNlpInferenceContext, targets: dict = {}, hi
     settings["timeout"] = ctx.settings.insights_timeout
     settings["max_retries"] = ctx.settings.insights_max_retries
     
-    # merge kwargs
-    llm = ChatOpenAI(
-        **settings
-    )
+    if ctx.llm_pool is not None:
+        llm = ctx.llm_pool.get_llm(ChatOpenAI, settings)
+    else:
+        llm = ChatOpenAI(**settings)
 
 
     # Load messages from store
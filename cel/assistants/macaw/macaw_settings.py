@@ -18,12 +18,18 @@ class MacawSettings:
     """The history window length to use for the core processing."""
     core_max_function_calls_in_message: int = 5
     """The max number of function calls recursively allowed in a single message."""
+    core_max_parallel_function_calls: int = 4
+    """The max number of tool calls of a single turn executed concurrently. Set to 1 to run them sequentially."""
     core_max_retries: int = 3
     """The max number of retries allowed for a single message."""
     core_timeout: int = 20
     """The timeout to use for the core processing."""
     core_rag_knn: int = 3
     """The number of nearest neighbors to use for the RAG retrieval."""
+    core_rag_max_tokens: int = 1000
+    """The token budget of the RAG passages injected in the system message."""
+    core_rag_max_distance: float = None
+    """Passages with a greater distance are not injected. None disables the cutoff."""
 
     blend_model: str = "gpt-3.5-turbo"
     """The temperature to use for the blend processing"""
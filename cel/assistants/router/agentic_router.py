@@ -1,7 +1,7 @@
 import json
 from loguru import logger as log
 
-from langchain.load.load import load
+from cel.assistants.macaw.macaw_message_codec import decode_message
 from langchain.load.dump import dumps
 from langchain_core.prompts import PromptTemplate as LangchainPromptTemplate
 from langchain_openai import ChatOpenAI
@@ -146,7 +146,7 @@ Returns only the name of the assistant."""
         prompt = LangchainPromptTemplate.from_template(prompt_str)
         
         # invoke
-        res = llm.invoke(prompt.format(input_text=input_text, asts=asts))
+        res = await llm.ainvoke(prompt.format(input_text=input_text, asts=asts))
         ast_name = res.content
         
         if ast_name == "Default Agent":
@@ -271,7 +271,7 @@ Returns only the name of the assistant."""
                 return
 
             for h in history:
-                aux = load(h)
+                aux = decode_message(h)
                 log.debug(f"History: {aux}")
                 yield dumps(aux)
             
@@ -2,7 +2,7 @@ import inspect
 import json
 from loguru import logger as log
 
-from langchain.load.load import load
+from cel.assistants.macaw.macaw_message_codec import decode_message
 from langchain.load.dump import dumps
 
 from cel.assistants.base_assistant import BaseAssistant
@@ -188,7 +188,7 @@ class LogicRouter(BaseAssistant):
                 return
 
             for h in history:
-                aux = load(h)
+                aux = decode_message(h)
                 log.debug(f"History: {aux}")
                 yield dumps(aux)
             
@@ -1,6 +1,6 @@
 from cel.gateway.model.conversation_lead import ConversationLead
 from cel.stores.history.base_history_provider import BaseHistoryProvider
-from langchain.load.load import load
+from cel.assistants.macaw.macaw_message_codec import decode_message
 
 
 
@@ -9,7 +9,7 @@ async def build_router_query (history_store: BaseHistoryProvider, lead: Conversa
     # Create a list of the last N messages without tools and tool_calls
     messages = []
     for h in history:
-        aux = load(h)
+        aux = decode_message(h)
         role = aux.type 
         text = aux.content
         
@@ -0,0 +1,60 @@
+import aiohttp
+from loguru import logger as log
+
+
+class HttpSessionPool:
+    """Shared aiohttp session with a pooled, keep-alive TCP connector.
+
+    Opening a ClientSession per request costs a new TCP + TLS handshake per outbound
+    message. Connectors and clients keep one HttpSessionPool, open it on startup and
+    close it on shutdown. The session is also created lazily on first use, so clients
+    used outside the gateway lifecycle keep working.
+
+    Note: aiohttp speaks HTTP/1.1 only, connections are reused with keep-alive.
+
+    Args:
+        ssl (bool, optional): Verify SSL certificates. Defaults to False.
+        limit (int, optional): Max number of open connections. Defaults to 100.
+        limit_per_host (int, optional): Max number of open connections (and so, concurrent
+        requests) per host. Defaults to 20.
+        keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to 30.
+        timeout (float, optional): Total timeout per request in seconds. Defaults to 30.
+    """
+
+    def __init__(self,
+                 ssl: bool = False,
+                 limit: int = 100,
+                 limit_per_host: int = 20,
+                 keepalive_timeout: float = 30,
+                 timeout: float = 30):
+        self.ssl = ssl
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session: aiohttp.ClientSession = None
+
+    def open(self) -> aiohttp.ClientSession:
+        """Create the session if it is not open. Must be called from the event loop"""
+        if self._session is None or self._session.closed:
+            log.debug(f"HttpSessionPool: opening session (limit: {self.limit}, per host: {self.limit_per_host})")
+            connector = aiohttp.TCPConnector(ssl=self.ssl,
+                                             limit=self.limit,
+                                             limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening it on first use"""
+        return self.open()
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,21 +1,135 @@
 import asyncio
+import re
 from typing import Callable
 import pysbd
 
 from cel.assistants.stream_content_chunk import StreamContentChunk
 
 
-def streaming_sentence_detector(stream, language="en"):
-    """pySBD based streaming sentence detector"""
+# Candidate sentence boundaries: terminal punctuation (optionally closed by quotes)
+# followed by whitespace, or a line break.
+_BOUNDARY_RE = re.compile(r'([.!?…]+)["\'”’»]*\s+|\n\s*')
+# Trailing chars that may become part of a boundary when the next token arrives
+_PENDING_TAIL_CHARS = set('.!?…"\'”’» \t\r\n')
+_LAST_WORD_RE = re.compile(r'(\S+)$')
+# Words that are usually followed by a period without ending the sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "sra", "srta", "jr", "st", "vs",
+    "e.g", "i.e", "lic", "ing", "av", "avda", "ud", "uds"
+}
+
+
+class StreamingSentenceSegmenter:
+    """Incremental sentence segmenter for token streams.
+    
+    Text is pushed as it arrives and only the unresolved tail of the buffer is scanned:
+    each character is inspected a constant number of times, so a long reply costs O(n)
+    instead of re-segmenting the growing buffer on every token.
+    
+    Sentences keep their trailing whitespace, like pySBD with clean=False. 
+    
+    Args:
+        - language (str, optional): pySBD language, only used with use_pysbd. Defaults to "en".
+        - use_pysbd (bool, optional): Confirm boundaries with pySBD for output parity with
+        the pySBD detector. pySBD only runs over the unresolved tail and only when a candidate
+        boundary shows up, not on every token. Defaults to False.
+    
+    Example:
+        ```python
+        seg = StreamingSentenceSegmenter()
+        for token in stream:
+            for sentence in seg.push(token):
+                print(sentence)
+        last = seg.flush()
+        ```
+    """
+    
+    def __init__(self, language: str = "en", use_pysbd: bool = False):
+        self.buffer = ''
+        self._scan_pos = 0
+        self._pysbd = pysbd.Segmenter(language=language, clean=False) if use_pysbd else None
+        
+    def push(self, text: str) -> list[str]:
+        """Append text to the buffer and return the sentences completed by it"""
+        if not text:
+            return []
+        self.buffer += text
+        
+        cut = 0
+        candidate = False
+        for m in _BOUNDARY_RE.finditer(self.buffer, self._scan_pos):
+            if m.end() == len(self.buffer):
+                # Wait for the next token, the whitespace run may continue
+                break
+            if self._pysbd is not None:
+                candidate = True
+            elif self._is_boundary(m):
+                cut = m.end()
+        
+        sentences = []
+        if candidate:
+            parts = self._pysbd.segment(self.buffer)
+            if len(parts) > 1:
+                sentences = parts[:-1]
+                cut = len(self.buffer) - len(parts[-1])
+        elif cut:
+            sentences = self._split(cut)
+        
+        if cut:
+            self.buffer = self.buffer[cut:]
+        pos = len(self.buffer)
+        while pos > 0 and self.buffer[pos - 1] in _PENDING_TAIL_CHARS:
+            pos -= 1
+        self._scan_pos = pos
+        return sentences
+
+    def flush(self) -> str:
+        """Return the remaining text and reset the segmenter"""
+        rest = self.buffer
+        self.buffer = ''
+        self._scan_pos = 0
+        return rest
+    
+    def _split(self, cut: int) -> list[str]:
+        # Split the resolved text [0:cut] in sentences, boundaries are checked again
+        # because a single push may complete more than one sentence
+        sentences = []
+        start = 0
+        for m in _BOUNDARY_RE.finditer(self.buffer, 0, cut):
+            if self._is_boundary(m):
+                sentences.append(self.buffer[start:m.end()])
+                start = m.end()
+        return sentences
+    
+    def _is_boundary(self, m: re.Match) -> bool:
+        punct = m.group(1)
+        if punct is None:
+            # line break
+            return True
+        if punct in ("...", "…"):
+            # ellipsis followed by lowercase continues the sentence
+            return not self.buffer[m.end()].islower()
+        if punct == ".":
+            word = _LAST_WORD_RE.search(self.buffer, max(0, m.start() - 16), m.start())
+            if word:
+                word = word.group(1).lower()
+                # initials (J. Smith) and known abbreviations (Dr. House)
+                if (len(word) == 1 and word.isalpha()) or word in ABBREVIATIONS:
+                    return False
+                # numbered list items (1. first)
+                before = m.start() - len(word) - 1
+                if word.isdigit() and (before < 0 or self.buffer[before] == "\n"):
+                    return False
+        return True
+
+
+def streaming_sentence_detector(stream, language="en", use_pysbd=False):
+    """Incremental streaming sentence detector"""
     
-    buffer = ''
-    seg = pysbd.Segmenter(language=language, clean=False)
+    seg = StreamingSentenceSegmenter(language=language, use_pysbd=use_pysbd)
     for char in stream:
-        buffer += char
-        sentences = seg.segment(buffer)
-        if len(sentences) > 1:
-            yield from sentences[:-1]
-            buffer = sentences[-1]
+        yield from seg.push(char)
+    buffer = seg.flush()
     if buffer:
         yield buffer
         
@@ -38,11 +152,11 @@ async def streaming_word_detector_async(stream):
         yield buffer
 
 
-async def streaming_sentence_detector_async(stream, language="en", on_chunk = None):
-    """pySBD based streaming sentence detector"""
+async def streaming_sentence_detector_async(stream, language="en", on_chunk = None, use_pysbd = False):
+    """Incremental streaming sentence detector. Only the unresolved tail of the
+    stream is scanned on each chunk. Set use_pysbd=True to confirm boundaries with pySBD."""
     
-    buffer = ''
-    seg = pysbd.Segmenter(language=language, clean=False)
+    seg = StreamingSentenceSegmenter(language=language, use_pysbd=use_pysbd)
     async for chunk in stream:
         # cast char to class StreamChunk
         assert isinstance(chunk, StreamContentChunk), "stream must be a StreamChunk"
@@ -51,16 +165,14 @@ async def streaming_sentence_detector_async(stream, language="en", on_chunk = No
             yield StreamContentChunk(content=chunk.content, is_partial=False)     
             break
       
-        buffer += chunk.content   
+        sentences = seg.push(chunk.content)
         
         if on_chunk:
-            await on_chunk(chunk, buffer)
+            await on_chunk(chunk, seg.buffer)
             
-        sentences = seg.segment(buffer)
-        if len(sentences) > 1:
-            for sentence in sentences[:-1]:
-                yield StreamContentChunk(content=sentence, is_partial=chunk.is_partial)
-            buffer = sentences[-1]
+        for sentence in sentences:
+            yield StreamContentChunk(content=sentence, is_partial=chunk.is_partial)
+    buffer = seg.flush()
     if buffer:
         yield StreamContentChunk(content=buffer, is_partial=chunk.is_partial)
 
@@ -1,3 +1,4 @@
+import asyncio
 import threading
 import time
 from loguru import logger as log
@@ -37,11 +38,17 @@ class CliConnector(BaseConnector):
                 print("Exiting CLI Connector")
                 exit()
             
-            async_run(self.__process_message(command))
+            # Hand the message over to the gateway event loop, where the
+            # scheduler keeps the messages of this terminal session in order
+            asyncio.run_coroutine_threadsafe(self.__enqueue_message(command), self.loop)
             
             
             
 
+    async def __enqueue_message(self, payload: str):
+        session_id = CliLead(connector=self).get_session_id()
+        await self.gateway.scheduler.submit(session_id, lambda: self.__process_message(payload))
+
     async def __process_message(self, payload: str):
         try:
             log.debug("Received Cli Message")
@@ -152,6 +159,7 @@ class CliConnector(BaseConnector):
     
     def startup(self, context: MessageGatewayContext):
         log.debug("Starting CLI Connector")
+        self.loop = asyncio.get_event_loop()
         self.command_thread = threading.Thread(target=self.cli_listener, daemon=True)
         self.command_thread.daemon = True
         self.command_thread.start()
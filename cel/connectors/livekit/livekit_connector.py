@@ -46,15 +46,16 @@ class LiveKitConnector(BaseConnector):
             
             if self.gateway:
             
-                async for chunk in self.gateway.process_message(msg, mode=StreamMode.DIRECT, capture_response=True):
-                    
-                    # Send the content with proper formatting
-                    if chunk.content:
-                        yield f"data: {chunk.content}\n\n"
-                    
-                    # If this is the end of a partial chunk, add the flush sentinel
-                    if not chunk.is_partial:
-                        yield f"data: <FLUSH>\n\n"
+                async with self.gateway.scheduler.slot(msg.lead.get_session_id()):
+                    async for chunk in self.gateway.process_message(msg, mode=StreamMode.DIRECT, capture_response=True):
+                        
+                        # Send the content with proper formatting
+                        if chunk.content:
+                            yield f"data: {chunk.content}\n\n"
+                        
+                        # If this is the end of a partial chunk, add the flush sentinel
+                        if not chunk.is_partial:
+                            yield f"data: <FLUSH>\n\n"
             
             # End of stream
             yield f"data: \n\n"
@@ -51,7 +51,6 @@ class TelegramConnector(BaseConnector):
         self.security_token = shortuuid.uuid()
         self.__create_routes(self.router)
         self.stream_mode = stream_mode
-        self.user_queues = {}
         self.voice_provider = voice_provider
         self.run_mode = RunMode.get_mode(run_mode)  
         
@@ -81,40 +80,17 @@ class TelegramConnector(BaseConnector):
                 return {"status": "error", "message": str(e)}
             return {"status": "ok"}
 
-    async def __process_user_queue(self, chat_id: str):
-        queue = self.user_queues[chat_id]
-        
-        while True:
-            message = await queue.get()
-            try:
-                # Procesa el mensaje (reemplaza esta función por tu lógica)
-                await self.__process_message(message)
-            except Exception as e:
-                log.debug(f"Error processing message for user {chat_id}: {e}")
-            finally:
-                queue.task_done()
-
-            # Si deseas limpiar las colas y tareas cuando estén vacías:
-            if queue.empty():
-                # Opcionalmente, puedes agregar un retraso aquí si esperas más mensajes pronto
-                del self.user_queues[chat_id]
-                log.debug(f"User {chat_id} queue has been cleared")
-                break  # Sal del bucle y termina la tarea
-
-
     async def __enqueue_message(self, payload: dict | AiogramMessage):
         # if its edited_message, return error
         if "edited_message" in payload:
             log.error("Edited messages are not supported")
             raise Exception("Edited messages are not supported")
         
-        chat_id =  str(payload["message"]["from"]["id"])
+        chat_id = str(payload["message"]["chat"]["id"])
         log.debug(f"Enqueuing message for chat_id: {chat_id}")
-        if chat_id not in self.user_queues:
-            # Crea una nueva cola y tarea para el nuevo usuario
-            self.user_queues[chat_id] = asyncio.Queue()
-            asyncio.create_task(self.__process_user_queue(chat_id))
-        await self.user_queues[chat_id].put(payload)
+        # Messages are processed in the gateway scheduler, one at a time per chat
+        session_id = TelegramLead(chat_id=chat_id, connector=self).get_session_id()
+        await self.gateway.scheduler.submit(session_id, lambda: self.__process_message(payload))
 
 
     async def __process_message(self, msg: dict | AiogramMessage):
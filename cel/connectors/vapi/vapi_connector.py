@@ -80,9 +80,10 @@ class VAPIConnector(BaseConnector):
                         
             if self.gateway:
                 id = "vapi-" + shortuuid.uuid()
-                async for chunk in self.gateway.process_message(msg, mode=StreamMode.DIRECT, capture_response=True):
-                    assert isinstance(chunk, StreamContentChunk), "stream chunk must be a StreamContentChunk object"
-                    yield f"data: {json.dumps(create_chunk_response(id=id, text=chunk.content))}\n\n"
+                async with self.gateway.scheduler.slot(msg.lead.get_session_id()):
+                    async for chunk in self.gateway.process_message(msg, mode=StreamMode.DIRECT, capture_response=True):
+                        assert isinstance(chunk, StreamContentChunk), "stream chunk must be a StreamContentChunk object"
+                        yield f"data: {json.dumps(create_chunk_response(id=id, text=chunk.content))}\n\n"
                 
                 # end of stream 
                 yield f"data: {json.dumps(create_chunk_response(id=id))}\n\n"
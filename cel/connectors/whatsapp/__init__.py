@@ -1,4 +1,5 @@
 from .model.media_utils import upload_media, delete_media, query_media_url, download_media
+from .model.media_client import WhatsappMediaClient
 from .model.whatsapp_attachment import WhatsappAttachment
 from .model.whatsapp_lead import WhatsappLead
 from .model.whatsapp_message import WhatsappMessage
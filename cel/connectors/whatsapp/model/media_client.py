@@ -0,0 +1,206 @@
+import asyncio
+import base64
+import hashlib
+import mimetypes
+import os
+import tempfile
+from typing import Any, AsyncIterator, BinaryIO, Dict, Union
+import aiohttp
+import cachetools
+from loguru import logger as log
+from cel.comms.http_session import HttpSessionPool
+from cel.connectors.whatsapp.constants import BASE_URL
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_SPOOL_MAX_SIZE = 1024 * 1024
+
+
+class WhatsappMediaClient:
+    """Async client for the WhatsApp Cloud API media endpoints.
+
+    Runs on a pooled HttpSessionPool, so media requests never block the event loop and
+    reuse the connector keep-alive connections. Downloads are streamed in chunks to a
+    spooled temp file (memory up to spool_max_size, disk after that) or to a temp file.
+
+    - Media id -> url resolutions are cached with a TTL (WhatsApp media urls are short lived).
+    - Downloads of a media with a known sha256 (sent by WhatsApp in the webhook) are
+    deduplicated: the file is downloaded once and the same path is returned while it exists.
+    - Concurrent calls for the same media id or sha256 share a single request.
+    - Downloads and uploads are not bound by the pool total timeout, a large media on a
+    slow link can take minutes: only connecting and each read are bound.
+
+    Args:
+        token (str): The Meta Access Token
+        phone_number_id (str): The Meta Phone Number Id
+        http (HttpSessionPool, optional): Shared session pool. Defaults to a new pool.
+        url_ttl (int, optional): Seconds a resolved media url is cached. Defaults to 240.
+        cache_size (int, optional): Max number of cached urls and downloaded files. Defaults to 1000.
+        chunk_size (int, optional): Download chunk size in bytes. Defaults to 64KB.
+        spool_max_size (int, optional): Max bytes kept in memory by download_to_spool. Defaults to 1MB.
+        download_dir (str, optional): Directory for downloaded files. Defaults to the system temp dir.
+        connect_timeout (float, optional): Seconds to connect for a media transfer. Defaults to 30.
+        read_timeout (float, optional): Max seconds between two reads of a media transfer. Defaults to 60.
+    """
+
+    def __init__(self,
+                 token: str,
+                 phone_number_id: str = None,
+                 http: HttpSessionPool = None,
+                 url_ttl: int = 240,
+                 cache_size: int = 1000,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 spool_max_size: int = DEFAULT_SPOOL_MAX_SIZE,
+                 download_dir: str = None,
+                 connect_timeout: float = 30,
+                 read_timeout: float = 60):
+        assert token is not None, "Token not provided"
+        self.token = token
+        self.phone_number_id = phone_number_id
+        self.http = http or HttpSessionPool()
+        self.chunk_size = chunk_size
+        self.spool_max_size = spool_max_size
+        self.download_dir = download_dir
+        self.transfer_timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        self._urls = cachetools.TTLCache(maxsize=cache_size, ttl=url_ttl)
+        self._files = cachetools.LRUCache(maxsize=cache_size)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _auth_headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def _single_flight(self, key: str, factory):
+        """Run factory() once for concurrent callers with the same key"""
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.ensure_future(factory())
+        self._inflight[key] = fut
+        try:
+            return await asyncio.shield(fut)
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    async def query_media_url(self, media_id: str) -> Union[str, None]:
+        """Resolve the download url of a media id, cached for url_ttl seconds"""
+        assert media_id is not None, "Media id not provided"
+        url = self._urls.get(media_id)
+        if url is not None:
+            return url
+        return await self._single_flight(f"url:{media_id}", lambda: self.__query_media_url(media_id))
+
+    async def __query_media_url(self, media_id: str) -> Union[str, None]:
+        log.info(f"Querying media url for {media_id}")
+        session = self.http.session()
+        async with session.get(f"{BASE_URL}/{media_id}", headers=self._auth_headers()) as r:
+            if r.status == 200:
+                url = (await r.json())["url"]
+                self._urls[media_id] = url
+                return url
+            log.error(f"Media url not queried for {media_id}, status: {r.status}, response: {await r.text()}")
+            return None
+
+    async def iter_media(self, media_url: str) -> AsyncIterator[bytes]:
+        """Stream the media content in chunks"""
+        session = self.http.session()
+        async with session.get(media_url, headers=self._auth_headers(), timeout=self.transfer_timeout) as r:
+            r.raise_for_status()
+            async for chunk in r.content.iter_chunked(self.chunk_size):
+                yield chunk
+
+    async def download_to_spool(self, media_url: str, sha256: str = None) -> tempfile.SpooledTemporaryFile:
+        """Download the media to a SpooledTemporaryFile positioned at the start.
+        The caller owns the file and must close it."""
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_max_size, dir=self.download_dir)
+        try:
+            await self.__write_media(media_url, spool, sha256)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    async def download_media(self, media_id: str, mime_type: str, sha256: str = None) -> Union[str, None]:
+        """Download a media by id to a temp file and return its path.
+        If sha256 is provided, the same media is downloaded only once."""
+        assert media_id is not None, "Media id not provided"
+        assert mime_type is not None, "Mime type not provided"
+        if sha256:
+            path = self._files.get(sha256)
+            if path and os.path.exists(path):
+                return path
+        key = f"file:{sha256 or media_id}"
+        return await self._single_flight(key, lambda: self.__download_media(media_id, mime_type, sha256))
+
+    async def __download_media(self, media_id: str, mime_type: str, sha256: str = None) -> Union[str, None]:
+        media_url = await self.query_media_url(media_id)
+        if media_url is None:
+            return None
+        extension = mimetypes.guess_extension(mime_type.split(";")[0].strip()) or f".{mime_type.split('/')[-1]}"
+        f = tempfile.NamedTemporaryFile(suffix=extension, dir=self.download_dir, delete=False)
+        try:
+            with f:
+                await self.__write_media(media_url, f, sha256)
+        except Exception as e:
+            log.error(f"Error downloading media {media_id}: {e}")
+            os.unlink(f.name)
+            return None
+        log.info(f"Media {media_id} downloaded to {f.name}")
+        if sha256:
+            self._files[sha256] = f.name
+        return f.name
+
+    async def __write_media(self, media_url: str, file: BinaryIO, sha256: str = None):
+        digest = hashlib.sha256()
+        async for chunk in self.iter_media(media_url):
+            digest.update(chunk)
+            file.write(chunk)
+        # WhatsApp sends the sha256 of the media base64 encoded (hex in some payloads)
+        if sha256 and sha256 not in (digest.hexdigest(), base64.b64encode(digest.digest()).decode()):
+            raise ValueError(f"Media sha256 mismatch: expected {sha256}, got {digest.hexdigest()}")
+
+    async def upload_media(self, media: Union[str, BinaryIO], mime_type: str = None, filename: str = None) -> Union[Dict[Any, Any], None]:
+        """Upload a media (path or binary file object) to the Cloud API, streamed from the file.
+        Returns the response with the media id"""
+        assert self.phone_number_id is not None, "Phone number id not provided"
+        assert media is not None, "Media not provided"
+
+        close = False
+        if isinstance(media, str):
+            filename = filename or os.path.basename(media)
+            media = open(os.path.realpath(media), "rb")
+            close = True
+        filename = filename or getattr(media, "name", None) or "file"
+        mime_type = mime_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        form = aiohttp.FormData()
+        form.add_field("messaging_product", "whatsapp")
+        form.add_field("type", mime_type)
+        form.add_field("file", media, filename=os.path.basename(str(filename)), content_type=mime_type)
+        try:
+            log.info(f"Uploading media {filename}")
+            session = self.http.session()
+            async with session.post(f"{BASE_URL}/{self.phone_number_id}/media",
+                                    headers=self._auth_headers(),
+                                    data=form,
+                                    timeout=self.transfer_timeout) as r:
+                if r.status == 200:
+                    log.info(f"Media {filename} uploaded")
+                    return await r.json()
+                log.error(f"Error uploading media {filename}, status: {r.status}, response: {await r.text()}")
+                return None
+        finally:
+            if close:
+                media.close()
+
+    async def delete_media(self, media_id: str) -> Union[Dict[Any, Any], None]:
+        assert media_id is not None, "Media id not provided"
+        log.info(f"Deleting media {media_id}")
+        session = self.http.session()
+        async with session.delete(f"{BASE_URL}/{media_id}", headers=self._auth_headers()) as r:
+            if r.status == 200:
+                self._urls.pop(media_id, None)
+                return await r.json()
+            log.error(f"Error deleting media {media_id}, status: {r.status}, response: {await r.text()}")
+            return None
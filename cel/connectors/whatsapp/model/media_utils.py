@@ -1,3 +1,4 @@
+"""Blocking media helpers. Inside the event loop use WhatsappMediaClient (media_client.py)."""
 from loguru import logger as log
 import requests
 import os
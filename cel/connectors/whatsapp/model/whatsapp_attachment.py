@@ -1,5 +1,7 @@
+import asyncio
 from aiogram import Bot
 from loguru import logger as log
+from cel.connectors.whatsapp.model.media_client import WhatsappMediaClient
 from cel.connectors.whatsapp.model.media_utils import query_media_url
 from cel.gateway.model.attachment import FileAttachment, \
                                         LocationAttachment, \
@@ -112,14 +114,14 @@ class WhatsappAttachment(FileAttachment):
     
     
     @classmethod
-    async def load_from_message(cls, data: dict, token: str, phone_number_id: str):
+    async def load_from_message(cls, data: dict, token: str, phone_number_id: str, media: WhatsappMediaClient = None):
         assert isinstance(data, dict), "data must be a dictionary"
         msg = data.get("entry")[0].get("changes")[0].get("value").get("messages")[0]
 
         # check if the message has a photo
         if 'image' in msg:
             log.info("Loading image from message")
-            return await cls.load_image_from_message(data, token, phone_number_id)
+            return await cls.load_image_from_message(data, token, phone_number_id, media=media)
         if 'contacts' in msg:
             log.info("Loading contact from message")
             return await cls.load_contact_from_message(data)
@@ -130,7 +132,7 @@ class WhatsappAttachment(FileAttachment):
         #     return await cls.load_location_from_message(message)
         
     @classmethod
-    async def load_image_from_message(cls, data: dict, token: str, phone_number_id: str):
+    async def load_image_from_message(cls, data: dict, token: str, phone_number_id: str, media: WhatsappMediaClient = None):
         
         msg = data.get("entry")[0].get("changes")[0].get("value").get("messages")[0]
         image = msg.get('image')
@@ -139,7 +141,11 @@ class WhatsappAttachment(FileAttachment):
         mime_type = image.get('mime_type', 'image/jpeg')
         file_id = image.get('id')
         sha256 = image.get('sha256')
-        file_url = query_media_url(file_id, token)
+        if media:
+            file_url = await media.query_media_url(file_id)
+        else:
+            # no async media client, keep the blocking request off the event loop
+            file_url = await asyncio.to_thread(query_media_url, file_id, token)
         metadata = {
             'sha256': sha256,
             'file_id': file_id,
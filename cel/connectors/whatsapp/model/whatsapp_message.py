@@ -76,7 +76,8 @@ class WhatsappMessage(Message):
         id = msg0.get("id")
         metadata = {}
         lead = WhatsappLead.from_whatsapp_message(data, connector=connector)
-        attach = await WhatsappAttachment.load_from_message(data, token, phone_number_id)
+        attach = await WhatsappAttachment.load_from_message(data, token, phone_number_id,
+                                                            media=getattr(connector, "media", None))
         return WhatsappMessage(lead=lead,
                                id=id,
                                text=text,
@@ -4,11 +4,11 @@ Unofficial Python wrapper for the WhatsApp Cloud API.
 from __future__ import annotations
 import json
 from typing import Any, BinaryIO, Callable, Dict
-import aiohttp
 from fastapi import APIRouter, BackgroundTasks, Request
 from loguru import logger as log
-import aiohttp
 import shortuuid
+from cel.comms.http_session import HttpSessionPool
+from cel.connectors.whatsapp.model.media_client import WhatsappMediaClient
 from cel.connectors.telegram.telegram_connector import hash_token
 from cel.connectors.whatsapp.components.list_item import ListItem
 from cel.gateway.model.base_connector import BaseConnector
@@ -25,7 +25,7 @@ from cel.gateway.model.outgoing import OutgoingMessage,\
                                             OutgoingSelectMessage,\
                                             OutgoingTextMessage
 from cel.gateway.model.outgoing.outgoing_message_buttons import OutgoingButtonsMessage
-from .functions.utils import changed_field, is_message, is_reaction
+from .functions.utils import changed_field, get_mobile, is_message, is_reaction
 
 
 
@@ -42,7 +42,10 @@ class WhatsappConnector(BaseConnector):
                  endpoint_prefix: str = None,
                  stream_mode: StreamMode = StreamMode.SENTENCE,
                  verify_token: str = None,
-                 ssl: bool = False):
+                 ssl: bool = False,
+                 http_limit: int = 100,
+                 http_limit_per_host: int = 20,
+                 http_keepalive_timeout: float = 30):
         """
         Initialize the Async WhatsApp Cloud API Connector with the Meta Access Token and the Phone Number Id
 
@@ -52,6 +55,9 @@ class WhatsappConnector(BaseConnector):
             - verify_token[str]: The verification token, defaults to a random string
             - webhook_prefix[str]: The prefix for the webhook, defaults to "/whatsapp"
             - stream_mode[StreamMode]: The stream mode for the gateway, defaults to StreamMode.SENTENCE
+            - http_limit[int]: Max open connections to the Cloud API, defaults to 100
+            - http_limit_per_host[int]: Max concurrent connections per host, defaults to 20
+            - http_keepalive_timeout[float]: Seconds an idle connection is kept alive, defaults to 30
         """
 
         # Verify the token and phone number id
@@ -69,6 +75,13 @@ class WhatsappConnector(BaseConnector):
         self.stream_mode = stream_mode
         self.verification_handler = nothing
         self.ssl = ssl
+        # Pooled keep-alive session shared by all requests to the Cloud API
+        self.http = HttpSessionPool(ssl=ssl,
+                                    limit=http_limit,
+                                    limit_per_host=http_limit_per_host,
+                                    keepalive_timeout=http_keepalive_timeout)
+        # Async media api (url resolution, streamed downloads and uploads) on the same pool
+        self.media = WhatsappMediaClient(token, phone_number_id, http=self.http)
         log.debug("Whatsapp Connector initialized")
         
         
@@ -119,7 +132,10 @@ class WhatsappConnector(BaseConnector):
                     log.warning(f"Display phone number {display_phone_number} is not allowed.")
                     return {"success": True}
                 else:
-                    background_tasks.add_task(self.__process_message, data)
+                    # Process the message in the gateway scheduler, keyed by the sender
+                    # session in order to keep replies in order inside a conversation
+                    await self.gateway.scheduler.submit(self.__session_id_from_payload(data),
+                                                        lambda: self.__process_message(data))
                     return {"success": True}
             except Exception as e:
                 # Avoid replaying the message
@@ -147,6 +163,18 @@ class WhatsappConnector(BaseConnector):
                     async for m in self.gateway.process_message(msg, mode=self.stream_mode):
                         pass
 
+    def __session_id_from_payload(self, data: dict) -> str:
+        """Build the session id from the raw webhook payload, before loading the message.
+        Matches WhatsappLead.get_session_id(). Non message payloads (e.g. statuses)
+        fall back to the connector name."""
+        try:
+            phone = get_mobile(data)
+        except (IndexError, KeyError, TypeError):
+            phone = None
+        if not phone:
+            return self.name()
+        return WhatsappLead(phone=phone, connector=self).get_session_id()
+
     def on_verification(self, handler: callable):
         """
         Set the handler for verification
@@ -176,9 +204,10 @@ class WhatsappConnector(BaseConnector):
 
     def startup(self, context: MessageGatewayContext):
         log.warning(f"Be sure to setup in Meta Whatsapp Cloud API -> Webhoook this URL: {context.webhook_url}{self.endpoint_prefix}")
+        self.http.open()
 
-    def shutdown(self, context: MessageGatewayContext):
-        pass
+    async def shutdown(self, context: MessageGatewayContext):
+        await self.http.close()
 
     def pause(self):
         self.paused = True
@@ -198,16 +227,16 @@ class WhatsappConnector(BaseConnector):
           "typing_indicator": { "type": "text" }
         }
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(f"{self.url}", 
-                                    headers=build_headers(self.token), 
-                                    json=payload) as response:
-                if response.status == 200:
-                    log.info(await response.json())
-                    return await response.json()
-                else:
-                    log.error(await response.json())
-                    return await response.json()              
+        session = self.http.session()
+        async with session.post(f"{self.url}", 
+                                headers=build_headers(self.token), 
+                                json=payload) as response:
+            if response.status == 200:
+                log.info(await response.json())
+                return await response.json()
+            else:
+                log.error(await response.json())
+                return await response.json()              
         
 
     async def send_text_message(self, 
@@ -240,12 +269,12 @@ class WhatsappConnector(BaseConnector):
         headers = build_headers(self.token)
         log.info(f"Sending message to {lead.phone}")
         
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(f"{self.url}", headers=headers, json=data) as r:
-                if r.status == 200:
-                    log.info(f"Message sent to {lead.phone}")
-                else:
-                    log.error(await r.json())
+        session = self.http.session()
+        async with session.post(f"{self.url}", headers=headers, json=data) as r:
+            if r.status == 200:
+                log.info(f"Message sent to {lead.phone}")
+            else:
+                log.error(await r.json())
 
     async def send_select_message(self, 
                                   lead: WhatsappLead, 
@@ -529,12 +558,12 @@ class WhatsappConnector(BaseConnector):
         
         log.debug(f"Sending buttons to {recipient_id}")
         headers = build_headers(self.token)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(f"{self.url}", headers=headers, json=data) as r:
-                if r.status == 200:
-                    log.debug(f"Message sent to {recipient_id}")
-                else:
-                    log.error(await r.json())     
+        session = self.http.session()
+        async with session.post(f"{self.url}", headers=headers, json=data) as r:
+            if r.status == 200:
+                log.debug(f"Message sent to {recipient_id}")
+            else:
+                log.error(await r.json())     
                     
     async def _send_select(
         self, 
@@ -561,12 +590,12 @@ class WhatsappConnector(BaseConnector):
             "interactive": list,
         }
         headers = build_headers(self.token)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(f"{self.url}", headers=headers, json=data) as r:
-                if r.status == 200:
-                    log.debug(f"Message sent to {recipient_id}")
-                else:
-                    log.error(await r.json())                       
+        session = self.http.session()
+        async with session.post(f"{self.url}", headers=headers, json=data) as r:
+            if r.status == 200:
+                log.debug(f"Message sent to {recipient_id}")
+            else:
+                log.error(await r.json())                       
                        
 
     async def _send_reply_button(
@@ -595,12 +624,12 @@ class WhatsappConnector(BaseConnector):
             "interactive": button,
         }
         headers = build_headers(self.token)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(f"{self.url}", headers=headers, json=data) as r:
-                if r.status == 200:
-                    log.debug(f"Message sent to {recipient_id}")
-                else:
-                    log.error(await r.json())     
+        session = self.http.session()
+        async with session.post(f"{self.url}", headers=headers, json=data) as r:
+            if r.status == 200:
+                log.debug(f"Message sent to {recipient_id}")
+            else:
+                log.error(await r.json())     
                     
     async def _send_cta_url(
         self, cta_url: Dict[Any, Any], 
@@ -624,12 +653,12 @@ class WhatsappConnector(BaseConnector):
             "interactive": cta_url,
         }
         headers = build_headers(self.token)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(f"{self.url}", headers=headers, json=data) as r:
-                if r.status == 200:
-                    log.debug(f"Message sent to {recipient_id}")
-                else:
-                    log.error(await r.json())     
+        session = self.http.session()
+        async with session.post(f"{self.url}", headers=headers, json=data) as r:
+            if r.status == 200:
+                log.debug(f"Message sent to {recipient_id}")
+            else:
+                log.error(await r.json())     
 
 
 
@@ -14,8 +14,14 @@ from cel.gateway.http_callbacks import HttpCallbackProvider
 from cel.gateway.model.message import ConversationLead, Message 
 from cel.gateway.model.message_gateway_context import MessageGatewayContext
 from cel.gateway.model.middleware import BaseMiddleware
+from cel.gateway.middleware_runner import run_middlewares_concurrently
+from cel.gateway.speculation import Speculation
 from cel.gateway.model.outgoing import OutgoingMessage, OutgoingTextMessage
+from cel.gateway.session_scheduler import DEFAULT_MAX_CONCURRENT_SESSIONS,\
+                                            DEFAULT_MAX_PENDING_MESSAGES,\
+                                            SessionScheduler
 from cel.message_enhancers.default_message_enhancer import DefaultMessageEnhancer
+from cel.stores.common.redis_batch import RedisBatch
 
 
 DEFAULT_CHARS_SLEEP_TIME_RATIO = 25
@@ -27,7 +33,7 @@ class StreamMode:
     Attributes:
         DIRECT (str): The response is sent as soon as it is ready.
         WORD (str): TODO: not implemented yet.
-        SENTENCE (str): pySBD based streaming sentence detector available.
+        SENTENCE (str): Incremental streaming sentence detector (optional pySBD fallback).
         FULL (str): The whole response is sent at once.
     """
     # the response is sent as soon as it is ready
@@ -35,7 +41,7 @@ class StreamMode:
     # TODO: not implemented yet
     WORD = "word"
     
-    # pySBD based streaming sentence detector available
+    # incremental streaming sentence detector (optional pySBD fallback)
     SENTENCE = "sentence"
     
     # the whole response is sent at once
@@ -87,6 +93,25 @@ class MessageGateway:
         - auto_voice_response (bool, optional): If True, the gateway will automatically send voice messages in 
         response to text messages from users. Defaults to False.
         
+        - max_concurrent_sessions (int, optional): The max number of sessions processed at the same time
+        across the whole gateway. Messages of the same session are always processed in order, one at a time.
+        Defaults to 32.
+        
+        - max_pending_messages (int, optional): The max number of messages queued in the gateway scheduler.
+        When the limit is reached, connectors wait before enqueuing new messages (backpressure). 
+        Defaults to 1000.
+        
+        - concurrent_middlewares (bool, optional): If True, incoming message middlewares that declare
+        themselves parallel_safe run concurrently, unless they read or write the same Message
+        fields (see BaseMiddleware). The chain stops as soon as one of them rejects the message.
+        Defaults to False.
+        
+        - speculative_llm (bool, optional): If True, the assistant response starts at the same time as the
+        advisory middlewares (middlewares with advisory = True, e.g. moderation), instead of after them. 
+        The response is buffered and released when they accept the message, or cancelled (and not stored
+        in the history) when they reject it. Advisory middlewares start after the other middlewares;
+        client commands and events wait for their verdict. Defaults to False.
+        
     """
     
     #singleton
@@ -110,7 +135,11 @@ class MessageGateway:
                  gateway_api_key: str = None,
                  gateway_api_key_header: str = "x-api-key",
                  auto_voice_response: bool = False,
-                 on_startup: list[Callable] = None
+                 on_startup: list[Callable] = None,
+                 max_concurrent_sessions: int = DEFAULT_MAX_CONCURRENT_SESSIONS,
+                 max_pending_messages: int = DEFAULT_MAX_PENDING_MESSAGES,
+                 concurrent_middlewares: bool = False,
+                 speculative_llm: bool = False
                 ):
         self.__class__._instance = self
         self.callbacks_manager = HttpCallbackProvider()
@@ -172,8 +201,12 @@ class MessageGateway:
         self.delivery_rate_control = delivery_rate_control
         self.delivery_rate_control_ratio = delivery_rate_control_ratio
         self.middlewares = middlewares or []
+        self.concurrent_middlewares = concurrent_middlewares
+        self.speculative_llm = speculative_llm
         self.message_enhancer = message_enhancer or DefaultMessageEnhancer()
         self.auto_voice_response = auto_voice_response
+        self.scheduler = SessionScheduler(max_concurrent_sessions=max_concurrent_sessions,
+                                          max_pending_messages=max_pending_messages)
         
     def register_middleware(self, 
                             middleware: Callable[[Message, BaseConnector, BaseAssistant], bool]):
@@ -212,6 +245,10 @@ class MessageGateway:
                 connector.resume()
             return {"message": "resumed"}
         
+        @router.get("/scheduler")
+        async def get_scheduler_stats():
+            return self.scheduler.stats()
+        
         return router
         
     def __startup(self):
@@ -229,23 +266,51 @@ class MessageGateway:
             self.on_startup(self.get_context())
                 
     
-    def __shutdown(self):
+    async def __shutdown(self):
         log.debug("Shutting down message gateway")
         for connector in self.connectors:
-            connector.shutdown(self.get_context())
+            res = connector.shutdown(self.get_context())
+            # connectors may release async resources (e.g. http sessions)
+            if asyncio.iscoroutine(res):
+                await res
+        
+        for middleware in self.middlewares:
+            if isinstance(middleware, BaseMiddleware):
+                await middleware.shutdown(self.get_context())
+        self.scheduler.shutdown()
 
     def get_context(self):
         return MessageGatewayContext(router=APIRouter(), webhook_url=self.webhook_url, app=self.app)
     
     
-    async def process_incoming_msg_middlewares(self, message: Message):
+    async def process_incoming_msg_middlewares(self, message: Message, middlewares: list = None):
+        # Middlewares share a per-message Redis batch: their reads are prefetched in one
+        # round-trip and their writes are flushed in one pipeline after the chain
+        middlewares = self.middlewares if middlewares is None else middlewares
+        batch = RedisBatch()
+        token = batch.activate()
         try:
-            for middleware in self.middlewares:
-                # if middleware is instance of BaseMiddleware
-                if isinstance(middleware, BaseMiddleware):
-                    res = await middleware.incoming_message(message, message.lead.connector, self.assistant)
-                else:
-                    res = await middleware(message, message.lead.connector, self.assistant)
+            return await self.__run_incoming_msg_middlewares(message, middlewares, batch)
+        finally:
+            batch.deactivate(token)
+            await batch.flush()
+
+    async def __run_incoming_msg_middlewares(self, message: Message, middlewares: list, batch: RedisBatch):
+        try:
+            for middleware in middlewares:
+                if hasattr(middleware, "prefetch"):
+                    middleware.prefetch(message, batch)
+            await batch.load()
+
+            if self.concurrent_middlewares:
+                accepted, rejected_by = await run_middlewares_concurrently(middlewares, 
+                                                                            lambda m: self.__call_incoming_middleware(m, message))
+                if not accepted:
+                    log.error(f"Middleware {type(rejected_by)} rejected message: {message.text}")
+                return accepted
+
+            for middleware in middlewares:
+                res = await self.__call_incoming_middleware(middleware, message)
                     
                 # Break the chain if any middleware returns False
                 if not res:
@@ -255,7 +320,37 @@ class MessageGateway:
         except Exception as e:
             log.error(f"Middleware error processing incoming msg: {e}")
             return False
-        
+
+    async def __call_incoming_middleware(self, middleware, message: Message):
+        if isinstance(middleware, BaseMiddleware):
+            return await middleware.incoming_message(message, message.lead.connector, self.assistant)
+        return await middleware(message, message.lead.connector, self.assistant)
+        
+        
+    def __split_advisory_middlewares(self):
+        if not self.speculative_llm or not self.assistant:
+            return self.middlewares, []
+        advisory = [m for m in self.middlewares if getattr(m, "advisory", False)]
+        return [m for m in self.middlewares if m not in advisory], advisory
+
+    def __speculate(self, message: Message, advisory: list, rt) -> Speculation:
+        """Start the advisory middlewares and, unless the message is a client command,
+        the assistant response. Client commands and events wait for the verdict"""
+        verdict = asyncio.create_task(self.process_incoming_msg_middlewares(message, advisory))
+        if (message.text or '').startswith("/"):
+            return Speculation(verdict)
+        with tracing_context(parent=rt):
+            return Speculation(verdict, self.assistant.new_message(message, {}))
+
+    def __run_tree(self, lead: ConversationLead):
+        from langsmith.run_trees import RunTree
+        rt = RunTree(name="Chat Message")
+        rt.add_metadata({
+            "session_id": lead.get_session_id(),
+            "lead_metadata": lead.metadata
+        })
+        rt.add_tags(["message", lead.connector_name])
+        return rt
         
     async def process_outgoing_msg_middlewares(self, 
                                                  message: OutgoingMessage, 
@@ -350,6 +445,9 @@ class MessageGateway:
                 pass
             ```
             That's it. The gateway will send the response to the user.
+            Connectors should prefer `enqueue_message` for fire and forget mode, or wrap the call
+            with `self.scheduler.slot(session_id)`, so messages of the same session keep their order
+            and the number of concurrent sessions stays bounded.
             
             Capture response use example:
             ```python
@@ -359,6 +457,8 @@ class MessageGateway:
             ```
         """
         
+        speculation: Speculation = None
+        rt = None
         try:
             assert message is not None, "Message is None"
             assert isinstance(message, Message), "Message is not of type Message"
@@ -371,10 +471,20 @@ class MessageGateway:
             connector = message.lead.connector
             lead = message.lead
             
-            if not await self.process_incoming_msg_middlewares(message):
+            # advisory middlewares run with the speculative response, see speculative_llm
+            middlewares, advisory = self.__split_advisory_middlewares()
+            if not await self.process_incoming_msg_middlewares(message, middlewares):
                 log.warning(f"Message {message.lead.get_session_id()} rejected by middlewares")
                 return
             
+            if advisory:
+                # Langsmith Tracing, the speculative response is traced in the message run
+                rt = self.__run_tree(lead)
+                speculation = self.__speculate(message, advisory, rt)
+                if not await speculation.accepted():
+                    log.warning(f"Message {message.lead.get_session_id()} rejected by advisory middlewares")
+                    return
+            
             if not await self.__process_client_command(message):
                 return
             
@@ -386,17 +496,13 @@ class MessageGateway:
             if self.assistant:
 
                 # Langsmith Tracing 
-                from langsmith.run_trees import RunTree
-                rt = RunTree(name="Chat Message")
+                rt = rt or self.__run_tree(lead)
                 try:
-                    rt.add_metadata({
-                        "session_id": lead.get_session_id(),
-                        "lead_metadata": lead.metadata
-                    })
-                    rt.add_tags(["message", lead.connector_name])
-                    
                     with tracing_context(parent=rt):
-                        stream = self.assistant.new_message(message, {})
+                        if speculation and speculation.stream:
+                            stream = speculation.commit()
+                        else:
+                            stream = self.assistant.new_message(message, {})
                         content = ''
                         
                         if mode == StreamMode.SENTENCE:
@@ -472,6 +578,7 @@ class MessageGateway:
                 finally:
                     rt.end()
                     rt.post()
+                    rt = None
             else: 
                 log.critical("No assistant available")
                 if capture_response:
@@ -482,6 +589,35 @@ class MessageGateway:
         except Exception as e:
             log.error(f"Message Gateway Error: {e}")
             raise ValueError("Message Gateway Error") from e
+        finally:
+            if speculation is not None:
+                # not committed: rejected, client command or AI response disabled by the events
+                await speculation.cancel()
+            if rt is not None:
+                rt.end()
+                rt.post()
+
+    async def enqueue_message(self, message: Message, mode: StreamMode = StreamMode.SENTENCE):
+        """Queue a message to be processed by the gateway scheduler in fire and forget mode.
+        Messages of the same session are processed in order, one at a time, and the
+        number of sessions processed at the same time is bounded by max_concurrent_sessions.
+        Waits only when the scheduler is full (backpressure).
+        
+        Args:
+            - message (Message): The message to process.
+            - mode (StreamMode, optional): The mode for streaming the response. Defaults to StreamMode.SENTENCE.
+        
+        Returns:
+            asyncio.Task: The task processing the message.
+        """
+        assert isinstance(message, Message), "Message is not of type Message"
+        
+        async def handler():
+            async for _ in self.process_message(message, mode=mode):
+                pass
+        
+        return await self.scheduler.submit(message.lead.get_session_id(), handler)
+
 
     @staticmethod
     async def send_text_message(lead: ConversationLead, 
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+from loguru import logger as log
+
+
+# Field wildcard: reads or writes the whole message
+ALL_FIELDS = "*"
+
+
+def middleware_fields(middleware) -> tuple[frozenset, frozenset]:
+    """Return the (reads, writes) declared by a middleware.
+
+    Middlewares declare the Message fields they read and mutate with the `reads` and
+    `writes` attributes, e.g. reads = {"attachments"}, writes = {"text"}. Dotted names
+    narrow the declaration to a key, e.g. "metadata.moderation". Middlewares that are
+    not parallel_safe, or that do not declare their fields, read and write everything.
+    """
+    if not getattr(middleware, "parallel_safe", False):
+        return frozenset([ALL_FIELDS]), frozenset([ALL_FIELDS])
+    reads = getattr(middleware, "reads", None)
+    writes = getattr(middleware, "writes", None)
+    return (frozenset([ALL_FIELDS]) if reads is None else frozenset(reads),
+            frozenset([ALL_FIELDS]) if writes is None else frozenset(writes))
+
+
+def _overlaps(a: str, b: str) -> bool:
+    if a == ALL_FIELDS or b == ALL_FIELDS or a == b:
+        return True
+    return a.startswith(b + ".") or b.startswith(a + ".")
+
+
+def fields_conflict(a: frozenset, b: frozenset) -> bool:
+    return any(_overlaps(x, y) for x in a for y in b)
+
+
+def plan_middlewares(middlewares: list) -> list[list[int]]:
+    """Return, for each middleware, the indexes of the earlier middlewares it must wait for.
+
+    A middleware waits for an earlier one when the earlier one writes a field it reads or
+    writes, or reads a field it writes. Otherwise both run concurrently.
+    """
+    fields = [middleware_fields(m) for m in middlewares]
+    plan = []
+    for j, (reads_j, writes_j) in enumerate(fields):
+        deps = []
+        for i in range(j):
+            reads_i, writes_i = fields[i]
+            if fields_conflict(writes_i, reads_j | writes_j) or fields_conflict(reads_i, writes_j):
+                deps.append(i)
+        plan.append(deps)
+    return plan
+
+
+async def run_middlewares_concurrently(middlewares: list,
+                                       call: Callable[[Any], Awaitable[bool]]) -> tuple[bool, Any]:
+    """Run the middlewares honoring their dependencies (see plan_middlewares).
+
+    Independent middlewares run concurrently. As soon as one of them rejects the message
+    (falsy result or exception) the pending ones are cancelled.
+
+    Returns:
+        (accepted, rejected_by): rejected_by is the middleware that rejected the message, if any.
+    """
+    plan = plan_middlewares(middlewares)
+    tasks: list[asyncio.Task] = []
+
+    async def run(middleware, deps: list[asyncio.Task]):
+        if deps:
+            await asyncio.wait(deps)
+            if any(d.cancelled() or d.exception() or not d.result() for d in deps):
+                # a dependency rejected the message, skip
+                return None
+        return bool(await call(middleware))
+
+    for middleware, deps in zip(middlewares, plan):
+        tasks.append(asyncio.create_task(run(middleware, [tasks[i] for i in deps])))
+
+    owners = dict(zip(tasks, middlewares))
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            rejected_by = None
+            for task in done:
+                if task.exception():
+                    log.error(f"Middleware {type(owners[task])} error: {task.exception()}")
+                    rejected_by = rejected_by or owners[task]
+                elif task.result() is False:
+                    rejected_by = rejected_by or owners[task]
+            if rejected_by is not None:
+                return False, rejected_by
+        return True, None
+    finally:
+        for task in pending:
+            task.cancel()
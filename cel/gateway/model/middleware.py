@@ -8,6 +8,25 @@ from cel.gateway.model.outgoing.outgoing_message import OutgoingMessage
 
 
 class BaseMiddleware:
+    """Base class for middlewares with incoming and outgoing hooks.
+
+    Concurrency declarations, used by the gateway when concurrent_middlewares is enabled
+    (function and callable middlewares can declare the same attributes):
+        - parallel_safe: the middleware can run concurrently with others, and can be
+        cancelled if another middleware rejects the message. Defaults to False.
+        - reads / writes: the Message fields the middleware reads and mutates, e.g.
+        reads = {"attachments"}, writes = {"text"}. Use dotted names for keys,
+        e.g. "metadata.moderation". None means all the fields.
+        
+    Speculative declaration, used by the gateway when speculative_llm is enabled:
+        - advisory: the middleware only annotates the message (its writes are not used by 
+        the assistant) and rarely rejects it, so the assistant response can start while
+        it runs. Defaults to False.
+    """
+    parallel_safe: bool = False
+    advisory: bool = False
+    reads: set[str] = None
+    writes: set[str] = None
 
     @abstractmethod
     async def incoming_message(self,  
@@ -34,4 +53,7 @@ class BaseMiddleware:
     
     @abstractmethod
     async def startup(self, ctx: MessageGatewayContext):
-        pass
\ No newline at end of file
+        pass
+    
+    async def shutdown(self, ctx: MessageGatewayContext):
+        pass
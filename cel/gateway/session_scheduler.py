@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+from loguru import logger as log
+
+
+DEFAULT_MAX_CONCURRENT_SESSIONS = 32
+DEFAULT_MAX_PENDING_MESSAGES = 1000
+
+
+class SessionScheduler:
+    """Per-session message scheduler with bounded concurrency.
+
+    Messages that belong to the same session are processed one at a time, in the
+    order they were submitted (strict FIFO per session). Messages of different
+    sessions are processed concurrently, but no more than `max_concurrent_sessions`
+    sessions are processed at the same time across the whole process.
+
+    Backpressure: `submit` waits when there are `max_pending_messages` messages
+    submitted and not yet finished. Connectors awaiting `submit` will slow down
+    instead of piling up unbounded work in the event loop.
+
+    Args:
+        - max_concurrent_sessions (int, optional): Max number of sessions processed
+        at the same time. Defaults to 32.
+        - max_pending_messages (int, optional): Max number of submitted messages
+        waiting or running before `submit` blocks. Defaults to 1000.
+    """
+
+    def __init__(self,
+                 max_concurrent_sessions: int = DEFAULT_MAX_CONCURRENT_SESSIONS,
+                 max_pending_messages: int = DEFAULT_MAX_PENDING_MESSAGES):
+        assert max_concurrent_sessions > 0, "max_concurrent_sessions must be greater than 0"
+        assert max_pending_messages > 0, "max_pending_messages must be greater than 0"
+
+        self.max_concurrent_sessions = max_concurrent_sessions
+        self.max_pending_messages = max_pending_messages
+        self._semaphore = asyncio.Semaphore(max_concurrent_sessions)
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        # session_id -> lock, session_id -> depth (waiting + running)
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._depths: dict[str, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._running = 0
+        self._processed = 0
+        self._failed = 0
+
+
+    @asynccontextmanager
+    async def slot(self, session_id: str):
+        """Wait for the session turn and a free processing slot.
+        Use this context manager when the caller needs to consume the response
+        in place (e.g. streaming connectors with capture_response=True).
+
+        Example:
+            ```python
+            async with gateway.scheduler.slot(msg.lead.get_session_id()):
+                async for chunk in gateway.process_message(msg, capture_response=True):
+                    ...
+            ```
+        """
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        self._depths[session_id] = self._depths.get(session_id, 0) + 1
+
+        try:
+            async with lock:
+                async with self._semaphore:
+                    self._running += 1
+                    try:
+                        yield
+                    finally:
+                        self._running -= 1
+                        self._processed += 1
+        finally:
+            self._depths[session_id] -= 1
+            if self._depths[session_id] == 0:
+                del self._depths[session_id]
+                del self._locks[session_id]
+
+
+    async def submit(self, session_id: str, handler: Callable[[], Awaitable]) -> asyncio.Task:
+        """Schedule `handler` to run in the session turn. Returns as soon as the message
+        is queued, waiting only when the scheduler is full (backpressure).
+
+        Args:
+            - session_id (str): The session key, usually lead.get_session_id()
+            - handler (Callable[[], Awaitable]): A function that returns the coroutine to run
+
+        Returns:
+            asyncio.Task: The task running the handler
+        """
+        while len(self._tasks) >= self.max_pending_messages:
+            log.warning(f"Session scheduler full ({len(self._tasks)} pending), waiting for room")
+            self._has_room.clear()
+            await self._has_room.wait()
+
+        task = asyncio.create_task(self._run(session_id, handler))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+
+    async def _run(self, session_id: str, handler: Callable[[], Awaitable]):
+        async with self.slot(session_id):
+            try:
+                await handler()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                log.exception(f"Session scheduler: error processing message for session {session_id}: {e}")
+
+
+    def _on_task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if len(self._tasks) < self.max_pending_messages:
+            self._has_room.set()
+
+
+    def queue_depth(self, session_id: str) -> int:
+        """Number of messages waiting or running for the given session"""
+        return self._depths.get(session_id, 0)
+
+
+    def stats(self) -> dict:
+        """Scheduler metrics: sessions with queued work, running sessions,
+        queued messages, per-session max depth and counters."""
+        depth = sum(self._depths.values())
+        return {
+            "sessions": len(self._depths),
+            "running": self._running,
+            "queued": depth - self._running,
+            "pending": len(self._tasks),
+            "max_session_depth": max(self._depths.values(), default=0),
+            "processed": self._processed,
+            "failed": self._failed,
+            "max_concurrent_sessions": self.max_concurrent_sessions,
+            "max_pending_messages": self.max_pending_messages
+        }
+
+
+    def shutdown(self):
+        """Cancel all the pending messages"""
+        for task in list(self._tasks):
+            task.cancel()
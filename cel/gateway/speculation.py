@@ -0,0 +1,155 @@
+import asyncio
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+
+_current: ContextVar["SpeculationGate"] = ContextVar("cel_speculation_gate", default=None)
+
+
+class SpeculationGate:
+    """Commit gate of a speculative assistant response.
+
+    When the gateway starts the LLM before the advisory middlewares have finished,
+    the assistant runs under a gate. Assistants call wait_for_commit() before doing
+    anything that can not be undone (running tools, persisting history): it returns
+    True once the middlewares accepted the message, False if they rejected it.
+    Outside a speculative run, wait_for_commit() returns True immediately.
+    """
+
+    def __init__(self):
+        self._verdict = asyncio.get_running_loop().create_future()
+
+    @staticmethod
+    def current() -> "SpeculationGate":
+        return _current.get()
+
+    def activate(self):
+        return _current.set(self)
+
+    def deactivate(self, token):
+        _current.reset(token)
+
+    def release(self):
+        if not self._verdict.done():
+            self._verdict.set_result(True)
+
+    def reject(self):
+        if not self._verdict.done():
+            self._verdict.set_result(False)
+
+    @property
+    def decided(self) -> bool:
+        return self._verdict.done()
+
+    async def wait(self) -> bool:
+        return await asyncio.shield(self._verdict)
+
+
+async def wait_for_commit() -> bool:
+    """Wait for the verdict of the running speculation, if any"""
+    gate = SpeculationGate.current()
+    if gate is None:
+        return True
+    return await gate.wait()
+
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class SpeculativeStream:
+    """Consume an assistant stream in the background and buffer its chunks.
+
+    The stream is pumped by a task created with the caller context, so the
+    active SpeculationGate is visible to the assistant. Iterate the
+    SpeculativeStream to replay the buffered chunks and the rest of the stream,
+    or call aclose() to cancel the generation.
+    """
+
+    def __init__(self, stream: AsyncIterator):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self.__pump(stream))
+
+    async def __pump(self, stream: AsyncIterator):
+        try:
+            async for chunk in stream:
+                self._queue.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._queue.put_nowait(_Failure(e))
+        self._queue.put_nowait(_END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._queue.get()
+        if item is _END:
+            raise StopAsyncIteration
+        if isinstance(item, _Failure):
+            raise item.error
+        return item
+
+    async def aclose(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class Speculation:
+    """Assistant response started while the advisory middlewares run.
+
+    verdict is the task of the advisory middlewares. The response stream, if any, is
+    pumped under a SpeculationGate: commit() releases it, cancel() rejects it and stops
+    the generation.
+
+    Args:
+        verdict (asyncio.Task): Advisory middlewares, resolves to True if they accept the message.
+        stream (AsyncIterator, optional): Assistant response to start. Defaults to None.
+    """
+
+    def __init__(self, verdict: asyncio.Task, stream: AsyncIterator = None):
+        self.verdict = verdict
+        self.committed = False
+        self.gate = SpeculationGate()
+        self.stream: SpeculativeStream = None
+        if stream is not None:
+            token = self.gate.activate()
+            try:
+                self.stream = SpeculativeStream(stream)
+            finally:
+                self.gate.deactivate(token)
+
+    async def accepted(self) -> bool:
+        """Wait for the advisory middlewares, the response is cancelled if they reject the message"""
+        try:
+            accepted = await self.verdict
+        except BaseException:
+            await self.cancel()
+            raise
+        if not accepted:
+            await self.cancel()
+        return accepted
+
+    def commit(self) -> SpeculativeStream:
+        """Release the response and return its buffered stream"""
+        self.committed = True
+        self.gate.release()
+        return self.stream
+
+    async def cancel(self):
+        """Reject the response unless it was committed, and stop the advisory middlewares"""
+        if not self.verdict.done():
+            self.verdict.cancel()
+        if self.committed:
+            return
+        self.gate.reject()
+        if self.stream is not None:
+            await self.stream.aclose()
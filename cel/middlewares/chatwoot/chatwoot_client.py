@@ -1,8 +1,8 @@
-import aiohttp
 from loguru import logger as log
 from typing import Optional, Dict
 from loguru import logger as log    
 from typing import Any, Dict, Optional
+from cel.comms.http_session import HttpSessionPool
 
 
 class ChatwootClient:
@@ -12,7 +12,10 @@ class ChatwootClient:
                  account_id: str,
                  access_key: str,
                  headers: Optional[Dict[str, str]] = None,
-                 ssl: bool = False):
+                 ssl: bool = False,
+                 http: HttpSessionPool = None):
+        """ Chatwoot API client. All requests share a pooled keep-alive session, 
+        pass http to share it with other clients. Call close() when done. """
         self.base_url = base_url
         self.account_id = account_id
         self.access_key = access_key
@@ -21,15 +24,19 @@ class ChatwootClient:
             'api_access_token': access_key
         })
         self.ssl = ssl
+        self.http = http or HttpSessionPool(ssl=ssl)
+
+    async def close(self):
+        await self.http.close()
 
     async def list_agent_bots(self) -> Dict[str, Any]:
         url = f"{self.base_url}/api/v1/accounts/{self.account_id}/agent_bots"
         log.debug(f"Listing agent bots from Chatwoot url: {url}")
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.get(url, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.get(url, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
 
     async def create_contact(self,
@@ -59,10 +66,10 @@ class ChatwootClient:
 
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(url, json=payload, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.post(url, json=payload, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
             
     async def update_contact(self,
                                 contact_id: int,
@@ -91,19 +98,19 @@ class ChatwootClient:
 
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.put(url, json=payload, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.put(url, json=payload, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
             
     async def get_contact(self, contact_id: int) -> Dict[str, Any]:
         url = f"{self.base_url}/api/v1/accounts/{self.account_id}/contacts/{contact_id}"
         log.debug(f"Getting contact from Chatwoot url: {url}")
         
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.get(url, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.get(url, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
     
             
 
@@ -114,10 +121,10 @@ class ChatwootClient:
         log.debug(f"Searching contact at Chatwoot url: {url}")
         url = f"{url}?q={query}"
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.get(url, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.get(url, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
 
 
@@ -150,10 +157,10 @@ class ChatwootClient:
 
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(url, json=payload, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.post(url, json=payload, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
     async def create_message(self,
                                 account_id: int,
@@ -184,28 +191,28 @@ class ChatwootClient:
 
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(url, json=payload, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.post(url, json=payload, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
     async def get_inbox(self, account_id: int, inbox_id: int) -> Dict[str, Any]:
         url = f"{self.base_url}/api/v1/accounts/{account_id}/inboxes/{inbox_id}"
         log.debug(f"Getting inbox from Chatwoot url: {url}")
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.get(url, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.get(url, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
     async def get_inboxes(self, account_id: int) -> Dict[str, Any]:
         url = f"{self.base_url}/api/v1/accounts/{account_id}/inboxes"
         log.debug(f"Getting inboxes from Chatwoot url: {url}")
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.get(url, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.get(url, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
     async def get_inbox_by_name(self, account_id: int, name: str) -> Dict[str, Any]:
         payload = await self.get_inboxes(account_id)
@@ -228,10 +235,10 @@ class ChatwootClient:
             }
         }
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.post(url, json=payload, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
+        session = self.http.session()
+        async with session.post(url, json=payload, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
 
 
     async def update_api_inbox(self, account_id: int, inbox_id: int, webhook_url: str) -> Dict[str, Any]:
@@ -245,7 +252,7 @@ class ChatwootClient:
             }
         }
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl)) as session:
-            async with session.put(url, json=payload, headers=self.headers) as response:
-                response_data = await response.json()
-                return response_data
\ No newline at end of file
+        session = self.http.session()
+        async with session.put(url, json=payload, headers=self.headers) as response:
+            response_data = await response.json()
+            return response_data
\ No newline at end of file
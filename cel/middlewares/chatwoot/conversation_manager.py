@@ -26,6 +26,9 @@ class ConversationManager:
         self.inbox = None
         self.conversations = {}
 
+    async def close(self):
+        await self.client.close()
+
     def __set_inbox(self, inbox):
         self.inbox = InboxRef(
             id=inbox.get("id"),
@@ -18,6 +18,10 @@ from loguru import logger as log
 
 
 class ChatwootMiddleware(BaseMiddleware):
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"lead", "text"}
+    writes = set()
 
     def __init__(self, base_url: str, access_key: str, account_id: str, inbox_name: str, auto_create_inbox: bool = True):
         self.conversation_manager = None
@@ -56,6 +60,10 @@ class ChatwootMiddleware(BaseMiddleware):
         await self.conversation_manager.init(auto_create_inbox=self.auto_create_inbox)
         
         
+    async def shutdown(self, ctx: MessageGatewayContext):
+        if self.conversation_manager:
+            await self.conversation_manager.close()
+        
     async def setup_routes(self, app):
         log.debug("Setting up Chatwoot middleware routes")
         prefix = "/middleware/chatwoot"
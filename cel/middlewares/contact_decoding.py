@@ -8,6 +8,10 @@ from cel.gateway.model.attachment import ContactAttachment
 
 
 class ContactDecodingMiddleware:
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"attachments"}
+    writes = {"text"}
     
     
     def __init__(self, 
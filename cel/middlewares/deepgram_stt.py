@@ -18,6 +18,10 @@ class DeepgramSTTMiddleware:
         on_fail_message (str, optional): Message to set in Message.text on fail STT. Defaults to None.
         this message will go to the LLM if the STT fails.
     """    
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"attachments"}
+    writes = {"text", "isSTT"}
     
     def __init__(self,
                 model: str = None,
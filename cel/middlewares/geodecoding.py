@@ -12,6 +12,10 @@ class GeodecodingMiddleware:
     """ Middleware to decode meesages with 'location' attachments and add the address to the message text.
     It uses Google Geocoding API to decode the location. 
     """
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"attachments"}
+    writes = {"text", "attachments"}
     
     def __init__(self, location_prefix_msg: str = "My location: "):
         log.debug("GeodecodingMiddleware initialized")
@@ -14,6 +14,10 @@ class BlackListEntry(ABC):
 
 class InMemBlackListMiddleware:
     """Middleware to block users based on a blacklist. The blacklist is stored in memory."""
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"lead"}
+    writes = set()
     
     def __init__(self, 
                  black_list: dict[str, BlackListEntry] = None,
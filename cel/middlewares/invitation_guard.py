@@ -11,6 +11,8 @@ from cel.assistants.base_assistant import BaseAssistant
 from cel.gateway.model.base_connector import BaseConnector
 from cel.gateway.model.conversation_lead import ConversationLead
 from cel.gateway.model.message import Message
+from cel.stores.common import redis_batch
+from cel.stores.common.redis_batch import RedisBatch
 from loguru import logger as log
 
 Redis = aioredis.Redis
@@ -76,7 +78,14 @@ class InvitationGuardMiddleware(ABC):
         backdoor_invite_code: The backdoor invite code
         allow_only_invited: Allow only invited users to access the service
         
+    Inside the gateway, the auth entry and the invitation found in the message are prefetched
+    with the other middlewares reads, and writes go to the per-message RedisBatch, flushed
+    after the middleware chain.
     """
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"lead", "text"}
+    writes = {"lead", "text", "metadata.time_since_last_request", "metadata.invitation"}
     
     events: InvitationGuardMiddlewareEvents = InvitationGuardMiddlewareEvents()
     
@@ -173,6 +182,12 @@ class InvitationGuardMiddleware(ABC):
             await self.revoke_invitation(code)
             return {"message": "Invitation revoked successfully"}
 
+    def prefetch(self, message: Message, batch: RedisBatch):
+        batch.prefetch_hget(self.client, self.key_prefix, message.lead.get_session_id())
+        code = self.__search_invitation_code(message.text)
+        if code:
+            batch.prefetch_hget(self.client, self.key_prefix, code)
+
     # MAIN METHOD - Handle the message
     async def __call__(self, message: Message, connector: BaseConnector, assistant: BaseAssistant):
         try:
@@ -328,11 +343,11 @@ class InvitationGuardMiddleware(ABC):
                                 expires_at=expires_at, 
                                 metadata=metadata,
                                 name=name)
-        await self.client.hset(self.key_prefix, code, json.dumps(asdict(entry)))
+        await redis_batch.hset(self.client, self.key_prefix, code, json.dumps(asdict(entry)))
         return entry
     
     async def get_invitation(self, code: str):
-        entry = await self.client.hget(self.key_prefix, code)
+        entry = await redis_batch.hget(self.client, self.key_prefix, code)
         if entry:
             entry = json.loads(entry)
             return InvitationEntry(invite_code=entry.get('invite_code'), 
@@ -347,16 +362,16 @@ class InvitationGuardMiddleware(ABC):
         inv = await self.get_invitation(code)
         if inv:
             inv.used = True
-            await self.client.hset(self.key_prefix, code, json.dumps(asdict(inv)))
+            await redis_batch.hset(self.client, self.key_prefix, code, json.dumps(asdict(inv)))
             return inv
         return None
     
     async def revoke_invitation(self, code: str):
-        await self.client.hdel(self.key_prefix, code)
+        await redis_batch.hdel(self.client, self.key_prefix, code)
 
     async def clear_invitations(self):
         log.warning(f"Clearing invitations from Redis, all keys with prefix {self.key_prefix} will be deleted")
-        await self.client.delete(self.key_prefix)
+        await redis_batch.delete(self.client, self.key_prefix)
         log.debug("Invitations cleared successfully")
     
     # Handle login/logout commands and secure client commands
@@ -478,14 +493,14 @@ class InvitationGuardMiddleware(ABC):
                           invite_code=invite_code,
                           last_request=time.time()
                         )
-        await self.client.hset(self.key_prefix, session_id, json.dumps(asdict(entry)))
+        await redis_batch.hset(self.client, self.key_prefix, session_id, json.dumps(asdict(entry)))
         return entry
         
     async def clear_auth(self, id: str):
-        await self.client.hdel(self.key_prefix, id)
+        await redis_batch.hdel(self.client, self.key_prefix, id)
         
     async def get_auth_entry(self, id: str):
-        entry = await self.client.hget(self.key_prefix, id)
+        entry = await redis_batch.hget(self.client, self.key_prefix, id)
         if entry:
             entry = json.loads(entry)
             return AuthEntry(session_id=entry.get('session_id'),
@@ -500,6 +515,6 @@ class InvitationGuardMiddleware(ABC):
         entry = await self.get_auth_entry(id)
         if entry:
             entry.client_cmd_enabled = True
-            await self.client.hset(self.key_prefix, id, json.dumps(asdict(entry)))
+            await redis_batch.hset(self.client, self.key_prefix, id, json.dumps(asdict(entry)))
             return entry
         return None
\ No newline at end of file
@@ -0,0 +1,122 @@
+import heapq
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from redis import asyncio as aioredis
+
+Redis = aioredis.Redis
+
+
+@dataclass
+class RedFlagEntry(ABC):
+    count: int = 0
+    updated_at: float = 0
+
+
+class BaseFlagCounter(ABC):
+    """Store of the moderation red flags per session.
+
+    Flags expire expire_after seconds after the first flag of the session
+    (fixed window). If expire_after is None, flags never expire.
+    """
+
+    @abstractmethod
+    async def incr(self, session_id: str) -> int:
+        """Add a flag to the session, returns the current count"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, session_id: str) -> RedFlagEntry:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reset(self, session_id: str):
+        raise NotImplementedError
+
+
+class InMemoryFlagCounter(BaseFlagCounter):
+    """Process-local flag counter.
+
+    Expirations are kept in a heap ordered by deadline and purged lazily on each
+    operation, in O(log n) per expired session, without a background task.
+
+    Args:
+        expire_after (float, optional): Seconds the flags are kept. Defaults to None (never expire).
+        timer (Callable, optional): Clock. Defaults to time.time.
+    """
+
+    def __init__(self, expire_after: float = None, timer=time.time):
+        self.expire_after = expire_after
+        self.timer = timer
+        self._entries: dict[str, RedFlagEntry] = {}
+        self._deadlines: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+
+    def __purge(self, now: float):
+        while self._heap and self._heap[0][0] <= now:
+            deadline, session_id = heapq.heappop(self._heap)
+            # skip heap items left by a reset session
+            if self._deadlines.get(session_id) == deadline:
+                del self._deadlines[session_id]
+                del self._entries[session_id]
+
+    async def incr(self, session_id: str) -> int:
+        now = self.timer()
+        self.__purge(now)
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._entries[session_id] = RedFlagEntry()
+            if self.expire_after:
+                deadline = now + self.expire_after
+                self._deadlines[session_id] = deadline
+                heapq.heappush(self._heap, (deadline, session_id))
+        entry.count += 1
+        entry.updated_at = now
+        return entry.count
+
+    async def get(self, session_id: str) -> RedFlagEntry:
+        self.__purge(self.timer())
+        return self._entries.get(session_id)
+
+    async def reset(self, session_id: str):
+        self._entries.pop(session_id, None)
+        self._deadlines.pop(session_id, None)
+
+
+class RedisFlagCounter(BaseFlagCounter):
+    """Flag counter shared by all the gateway workers, stored in a Redis hash per session
+    (HINCRBY + EXPIRE NX in one transaction), Redis expires the flags.
+
+    Args:
+        redis (str | Redis): Redis url or asyncio Redis client.
+        key_prefix (str, optional): Prefix for the keys. Defaults to "modflags".
+        expire_after (int, optional): Seconds the flags are kept, requires Redis 7 (EXPIRE NX). Defaults to None (never expire).
+    """
+
+    def __init__(self, redis: str | Redis = None, key_prefix: str = "modflags", expire_after: int = None):
+        self.client = redis if isinstance(redis, Redis) else aioredis.from_url(redis or 'redis://localhost:6379/0')
+        self.key_prefix = key_prefix
+        self.expire_after = expire_after
+
+    def get_key(self, session_id: str):
+        return f"{self.key_prefix}:{session_id}"
+
+    async def incr(self, session_id: str) -> int:
+        key = self.get_key(session_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "count", 1)
+            pipe.hset(key, "updated_at", time.time())
+            if self.expire_after:
+                # the window starts with the first flag, NX keeps the TTL of the next ones
+                pipe.expire(key, int(self.expire_after), nx=True)
+            count = (await pipe.execute())[0]
+        return count
+
+    async def get(self, session_id: str) -> RedFlagEntry:
+        entry = await self.client.hgetall(self.get_key(session_id))
+        if not entry:
+            return None
+        return RedFlagEntry(count=int(entry[b"count"]), updated_at=float(entry[b"updated_at"]))
+
+    async def reset(self, session_id: str):
+        await self.client.unlink(self.get_key(session_id))
@@ -47,19 +47,17 @@ In this example, the `classify` function takes a response as input and returns a
 Llama3Guard Moderation is a powerful tool for detecting and classifying toxic messages within the Cel.ai platform. By leveraging the Llama Guard 3 model, it ensures content safety across multiple languages and a comprehensive hazard taxonomy.
 """
 
-from abc import ABC
 import asyncio
-from dataclasses import dataclass
 import os
-import threading
-import time
 from typing import Callable
-from together import Together
+from together import AsyncTogether
 from cel.assistants.base_assistant import BaseAssistant
 from cel.gateway.model.base_connector import BaseConnector
 from cel.gateway.model.message import Message
 from loguru import logger as log
 
+from cel.middlewares.moderation.moderation_client import AsyncModerationClient, ModerationResult
+from cel.middlewares.moderation.flag_counter import BaseFlagCounter, InMemoryFlagCounter, RedFlagEntry
 from cel.middlewares.moderation.moderation_events import ModMiddlewareEvents
 
 hazard_categories = {
@@ -79,15 +77,44 @@ hazard_categories = {
     "S14": "Code Interpreter Abuse"
 }
 
-class RedFlagEntry(ABC):
-    count: int = 0
-    updated_at: int = 0
+class LlamaGuardModerationClient(AsyncModerationClient):
+    """Async Llama Guard client on Together. Each text is a chat completion, so there is
+    no request batching: verdicts are cached and concurrent identical texts coalesced
+    (see AsyncModerationClient).
 
-@dataclass
-class ModerationResult(ABC):
-    flagged: bool = False
-    category: str = None
-    description: str = None
+    Args:
+        client (AsyncTogether, optional): Together async client. Defaults to AsyncTogether
+        with the TOGETHER_API_KEY environment variable.
+        model (str, optional): Guard model. Defaults to "meta-llama/Meta-Llama-Guard-3-8B".
+    """
+    supports_batching = False
+
+    def __init__(self, client: AsyncTogether = None, model: str = "meta-llama/Meta-Llama-Guard-3-8B", **kwargs):
+        super().__init__(**kwargs)
+        self.client = client or AsyncTogether(api_key=os.environ.get('TOGETHER_API_KEY'))
+        self.model = model
+
+    async def moderate_batch(self, texts: list[str]) -> list[ModerationResult]:
+        return await asyncio.gather(*[self.__evaluate(text) for text in texts])
+
+    async def __evaluate(self, text: str) -> ModerationResult:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": text}],
+        )
+        res = response.choices[0].message.content
+        # res = "safe" then flagged = False
+        # if res = "unsafe" then flagged = True
+        # when res = "unsafe" the next line will be the category of the hazard
+        # for example:
+        #  "unsafe"
+        #  "S12"
+        if res.startswith("unsafe"):
+            category = res.split("\n")[1]
+            desc=hazard_categories[category]
+            return ModerationResult(flagged=True, category=category, description=desc)
+        else:
+            return ModerationResult(flagged=False)
 
 
 class Llama3GuardModerationMiddleware():
@@ -104,78 +131,49 @@ class Llama3GuardModerationMiddleware():
     Args:
         - custom_evaluation_function: A custom function that accepts a message and returns a Moderation object.
         - on_mod_fail_continue: A boolean that determines if the middleware should continue processing if the moderation fails.
+        - enable_expiration: If True, the user flags expire expire_after seconds after the first flag.
         - expire_after: An integer that determines the time in seconds after which the user flags should be reset.
+        - flag_counter: Store of the user flags. Defaults to an InMemoryFlagCounter (per process),
+        use a RedisFlagCounter to share the flags between gateway workers.
+        - cache_size: Max number of cached verdicts (LRU), 0 disables the cache. Defaults to 10000.
+        - cache_ttl: Seconds a verdict is cached. Defaults to 3600.
+        - moderation_client: Custom LlamaGuardModerationClient, overrides the cache arguments.
         
         For more info follow https://huggingface.co/meta-llama/Llama-Guard-3-8B
     """
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"lead", "text"}
+    writes = {"metadata.moderation"}
+    # speculative LLM start, see BaseMiddleware
+    advisory = True
     
     def __init__(self,
                  custom_evaluation_function: Callable[[str], ModerationResult] = None,
                  enable_expiration: bool = False,
                  expire_after: int = 86400,
-                 prunning_interval: int = 60,
-                 on_mod_fail_continue: bool = True):
+                 prunning_interval: int = None,
+                 on_mod_fail_continue: bool = True,
+                 cache_size: int = 10000,
+                 cache_ttl: float = 3600,
+                 moderation_client: LlamaGuardModerationClient = None,
+                 flag_counter: BaseFlagCounter = None):
         
         self.custom_evaluation_function = custom_evaluation_function
         self.on_mod_fail_continue = on_mod_fail_continue
         
-        assert os.environ.get('TOGETHER_API_KEY'), "TOGETHER_API_KEY is not set in the environment variables"
-        self.client = Together(api_key=os.environ.get('TOGETHER_API_KEY'))
+        if moderation_client is None:
+            assert os.environ.get('TOGETHER_API_KEY'), "TOGETHER_API_KEY is not set in the environment variables"
+        self.moderation = moderation_client or LlamaGuardModerationClient(cache_size=cache_size, cache_ttl=cache_ttl)
+        self.client = self.moderation.client
         
-        self.user_flags = {}
         self.expire_after = expire_after
-        self.prunning_interval = prunning_interval
-        
-        if enable_expiration:
-            # Asegúrate de que el bucle de eventos esté corriendo
-            self.loop = asyncio.get_event_loop()
-            if not self.loop.is_running():
-                threading.Thread(target=self._start_event_loop, daemon=True).start()
-            
-            # Inicia la coroutine en segundo plano
-            self.loop.call_soon_threadsafe(asyncio.create_task, self.reset_user_flags_loop()) 
+        # flags expire lazily in the counter, prunning_interval is no longer used
+        self.flags = flag_counter or InMemoryFlagCounter(expire_after=expire_after if enable_expiration else None)
                            
         
-    def _start_event_loop(self):
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_forever()
-        
-        
-        
-    async def reset_user_flags_loop(self):
-        while True:
-            await asyncio.sleep(self.prunning_interval)
-            log.debug(f"Llama3GuardModerationMiddleware: Prunning user flags each {self.prunning_interval} seconds")
-            current_time = time.time()
-            expired_sessions = [
-                session_id for session_id, flags in self.user_flags.items()
-                if current_time - flags.updated_at > self.expire_after
-            ]
-
-            for session_id in expired_sessions:
-                self.reset_user_flags(session_id)
-        
-        
-        
-        
-    async def evaluate(self, text: str):
-        response = self.client.chat.completions.create(
-            model="meta-llama/Meta-Llama-Guard-3-8B",
-            messages=[{"role": "user", "content": text}],
-        )        
-        res = response.choices[0].message.content
-        # res = "safe" then flagged = False
-        # if res = "unsafe" then flagged = True
-        # when res = "unsafe" the next line will be the category of the hazard
-        # for example:
-        #  "unsafe"
-        #  "S12"
-        if res.startswith("unsafe"):
-            category = res.split("\n")[1]
-            desc=hazard_categories[category]
-            return ModerationResult(flagged=True, category=category, description=desc)
-        else:
-            return ModerationResult(flagged=False)
+    async def evaluate(self, text: str) -> ModerationResult:
+        return await self.moderation.moderate(text)
 
 
 
@@ -225,24 +223,11 @@ class Llama3GuardModerationMiddleware():
             
             
     async def __count_flagged(self, session_id: str):
-        if session_id in self.user_flags:
-            self.user_flags[session_id].count += 1
-        else:
-            self.user_flags[session_id] = RedFlagEntry()
-            self.user_flags[session_id].count = 1
-            self.user_flags[session_id].updated_at = time.time()
-            
-        return self.user_flags[session_id].count
-    
+        return await self.flags.incr(session_id)
     
-    def reset_user_flags(self, session_id: str):
-        if session_id in self.user_flags:
-            del self.user_flags[session_id]
+    async def reset_user_flags(self, session_id: str):
+        await self.flags.reset(session_id)
         return True
     
-    
-    def get_user_flags(self, session_id: str):
-        if session_id in self.user_flags:
-            return self.user_flags[session_id]
-        return None
-    
+    async def get_user_flags(self, session_id: str) -> RedFlagEntry:
+        return await self.flags.get(session_id)
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+import cachetools
+from loguru import logger as log
+
+
+@dataclass
+class ModerationResult(ABC):
+    flagged: bool = False
+    category: str = None
+    description: str = None
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def moderation_key(text: str) -> str:
+    """Cache key of a text: sha256 of the text normalized (NFKC, casefold, collapsed whitespace)"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AsyncModerationClient(ABC):
+    """Base async moderation client with a verdict cache and request coalescing.
+
+    - Verdicts are cached in an LRU + TTL cache keyed by the normalized text hash,
+    so repeated texts ("hi", "ok", button payloads) are moderated once.
+    - Concurrent requests for the same text share a single provider call.
+    - Providers that moderate several inputs in one request (supports_batching) get
+    the texts requested within batch_window seconds in a single call, up to max_batch_size.
+
+    Subclasses implement moderate_batch(texts), returning one verdict per text, in order.
+
+    Args:
+        cache_size (int, optional): Max number of cached verdicts, 0 disables the cache. Defaults to 10000.
+        cache_ttl (float, optional): Seconds a verdict is cached. Defaults to 3600.
+        batch_window (float, optional): Seconds to wait for more texts before sending a batch. Defaults to 0.01.
+        max_batch_size (int, optional): Max number of texts per provider request. Defaults to 32.
+    """
+
+    supports_batching: bool = False
+
+    def __init__(self,
+                 cache_size: int = 10000,
+                 cache_ttl: float = 3600,
+                 batch_window: float = 0.01,
+                 max_batch_size: int = 32):
+        assert max_batch_size > 0, "max_batch_size must be greater than 0"
+        self.cache = cachetools.TTLCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._pending: list[tuple[str, str]] = []
+        self._flush_handle: asyncio.TimerHandle = None
+        self._tasks = set()
+        self._hits = 0
+        self._misses = 0
+        self._requests = 0
+
+    @abstractmethod
+    async def moderate_batch(self, texts: list[str]) -> list[Any]:
+        raise NotImplementedError
+
+    async def moderate(self, text: str) -> Any:
+        """Moderate a text, served from the cache when possible"""
+        key = moderation_key(text)
+        if self.cache is not None:
+            verdict = self.cache.get(key)
+            if verdict is not None:
+                self._hits += 1
+                return verdict
+
+        fut = self._inflight.get(key)
+        if fut is None:
+            self._misses += 1
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            # avoid "exception never retrieved" when every waiter was cancelled
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[key] = fut
+            if self.supports_batching and self.max_batch_size > 1:
+                self._pending.append((key, text))
+                if len(self._pending) >= self.max_batch_size:
+                    self.__flush()
+                elif self._flush_handle is None:
+                    self._flush_handle = loop.call_later(self.batch_window, self.__flush)
+            else:
+                self.__start([(key, text)])
+        return await asyncio.shield(fut)
+
+    def __flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.__start(batch)
+
+    def __start(self, batch: list[tuple[str, str]]):
+        task = asyncio.create_task(self.__run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def __run(self, batch: list[tuple[str, str]]):
+        self._requests += 1
+        try:
+            verdicts = await self.moderate_batch([text for _, text in batch])
+            assert len(verdicts) == len(batch), "moderate_batch must return one verdict per text"
+        except Exception as e:
+            log.error(f"{type(self).__name__}: moderation of {len(batch)} texts failed: {e}")
+            for key, _ in batch:
+                fut = self._inflight.pop(key, None)
+                if fut and not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for (key, _), verdict in zip(batch, verdicts):
+            if self.cache is not None:
+                self.cache[key] = verdict
+            fut = self._inflight.pop(key, None)
+            if fut and not fut.done():
+                fut.set_result(verdict)
+
+    def stats(self) -> dict:
+        """Client metrics: cache hits/misses, provider requests and cached verdicts"""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "requests": self._requests,
+            "cached": len(self.cache) if self.cache is not None else 0,
+            "inflight": len(self._inflight)
+        }
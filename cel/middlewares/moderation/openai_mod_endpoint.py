@@ -1,23 +1,35 @@
-from abc import ABC
-import asyncio
-import threading
-import time
 from typing import Callable
-from openai import OpenAI
+from openai import AsyncOpenAI
 from openai.types.moderation import Moderation
 from cel.assistants.base_assistant import BaseAssistant
 from cel.gateway.model.base_connector import BaseConnector
 from cel.gateway.model.message import Message
 from loguru import logger as log
-from dataclasses import dataclass
 
+from cel.middlewares.moderation.moderation_client import AsyncModerationClient
+from cel.middlewares.moderation.flag_counter import BaseFlagCounter, InMemoryFlagCounter, RedFlagEntry
 from cel.middlewares.moderation.moderation_events import ModMiddlewareEvents
 
-@dataclass
-class RedFlagEntry(ABC):
-    count: int = 0
-    updated_at: int = 0
-    
+class OpenAIModerationClient(AsyncModerationClient):
+    """Async OpenAI moderation endpoint client. The endpoint accepts several inputs per
+    request, so concurrent texts are sent in micro-batches (see AsyncModerationClient).
+
+    Args:
+        client (AsyncOpenAI, optional): OpenAI async client. Defaults to AsyncOpenAI().
+        model (str, optional): Moderation model. Defaults to the endpoint default.
+    """
+    supports_batching = True
+
+    def __init__(self, client: AsyncOpenAI = None, model: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client or AsyncOpenAI()
+        self.model = model
+
+    async def moderate_batch(self, texts: list[str]) -> list[Moderation]:
+        kwargs = {"model": self.model} if self.model else {}
+        moderation = await self.client.moderations.create(input=texts, **kwargs)
+        return moderation.results
+
 
 class OpenAIEndpointModerationMiddleware():
     """ OpenAIEndpointModerationMiddleware is a middleware that uses OpenAI API to moderate messages.
@@ -30,63 +42,57 @@ class OpenAIEndpointModerationMiddleware():
     Args:
         - custom_evaluation_function: A custom function that accepts a message and returns a Moderation object.
         - on_mod_fail_continue: A boolean that determines if the middleware should continue processing if the moderation fails.
+        - enable_expiration: If True, the user flags expire expire_after seconds after the first flag.
         - expire_after: An integer that determines the time in seconds after which the user flags should be reset.
+        - flag_counter: Store of the user flags. Defaults to an InMemoryFlagCounter (per process),
+        use a RedisFlagCounter to share the flags between gateway workers.
+        - cache_size: Max number of cached verdicts (LRU), 0 disables the cache. Defaults to 10000.
+        - cache_ttl: Seconds a verdict is cached. Defaults to 3600.
+        - batch_window: Seconds to wait for concurrent messages to moderate them in a single request. Defaults to 0.01.
+        - max_batch_size: Max number of messages per moderation request. Defaults to 32.
+        - moderation_client: Custom OpenAIModerationClient, overrides the cache and batch arguments.
         
         For more info follow https://platform.openai.com/docs/guides/moderation
     """
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"lead", "text"}
+    writes = {"metadata.moderation"}
+    # speculative LLM start, see BaseMiddleware
+    advisory = True
     
     def __init__(self,
                  custom_evaluation_function: Callable[[str], Moderation] = None,
                  enable_expiration: bool = False,
                  expire_after: int = 86400,
-                 prunning_interval: int = 60,
-                 on_mod_fail_continue: bool = True):
+                 prunning_interval: int = None,
+                 on_mod_fail_continue: bool = True,
+                 cache_size: int = 10000,
+                 cache_ttl: float = 3600,
+                 batch_window: float = 0.01,
+                 max_batch_size: int = 32,
+                 moderation_client: OpenAIModerationClient = None,
+                 flag_counter: BaseFlagCounter = None):
         
         self.custom_evaluation_function = custom_evaluation_function
         self.on_mod_fail_continue = on_mod_fail_continue
-        self.client = OpenAI()
-        self.user_flags = {}
+        self.moderation = moderation_client or OpenAIModerationClient(cache_size=cache_size,
+                                                                      cache_ttl=cache_ttl,
+                                                                      batch_window=batch_window,
+                                                                      max_batch_size=max_batch_size)
+        self.client = self.moderation.client
         self.expire_after = expire_after
-        self.prunning_interval = prunning_interval
-        
-        
-        if enable_expiration:
-            # Asegúrate de que el bucle de eventos esté corriendo
-            self.loop = asyncio.get_event_loop()
-            if not self.loop.is_running():
-                threading.Thread(target=self._start_event_loop, daemon=True).start()
-            
-            # Inicia la coroutine en segundo plano
-            self.loop.call_soon_threadsafe(asyncio.create_task, self.reset_user_flags_loop()) 
+        # flags expire lazily in the counter, prunning_interval is no longer used
+        self.flags = flag_counter or InMemoryFlagCounter(expire_after=expire_after if enable_expiration else None)
                            
         
-    def _start_event_loop(self):
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_forever()
-        
-        
-    async def reset_user_flags_loop(self):
-        while True:            
-            await asyncio.sleep(self.prunning_interval)
-            log.debug(f"OpenAIEndpointModerationMiddleware: Prunning user flags each {self.prunning_interval} seconds")
-            current_time = time.time()
-            expired_sessions = [
-                session_id for session_id, flags in self.user_flags.items()
-                if current_time - flags.updated_at > self.expire_after
-            ]
-
-            for session_id in expired_sessions:
-                self.reset_user_flags(session_id)
-        
-
     async def __call__(self, message: Message, connector: BaseConnector, assistant: BaseAssistant):
         
         try:
             text = message.text
             log.debug(f"OpenAIEndpointModerationMiddleware: {text}")
             
-            moderation = self.client.moderations.create(input=text)
-            result = moderation.results[0]
+            result = await self.moderation.moderate(text)
             assert isinstance(result, Moderation)
             
             log.debug(f"OpenAIEndpointModerationMiddleware: {text} -> {result.flagged}")
@@ -126,23 +132,11 @@ class OpenAIEndpointModerationMiddleware():
             
             
     async def __count_flagged(self, session_id: str):
-        if session_id in self.user_flags:
-            self.user_flags[session_id].count += 1
-        else:
-            self.user_flags[session_id] = RedFlagEntry(count=1, updated_at=time.time())
-            # self.user_flags[session_id].count = 1
-            # self.user_flags[session_id].updated_at = time.time()
-            
-        return self.user_flags[session_id].count
+        return await self.flags.incr(session_id)
     
-    
-    def reset_user_flags(self, session_id: str):
-        if session_id in self.user_flags:
-            del self.user_flags[session_id]
+    async def reset_user_flags(self, session_id: str):
+        await self.flags.reset(session_id)
         return True
     
-    
-    def get_user_flags(self, session_id: str):
-        if session_id in self.user_flags:
-            return self.user_flags[session_id]
-        return None
\ No newline at end of file
+    async def get_user_flags(self, session_id: str) -> RedFlagEntry:
+        return await self.flags.get(session_id)
@@ -7,22 +7,33 @@ from cel.assistants.base_assistant import BaseAssistant
 from cel.gateway.model.base_connector import BaseConnector
 from cel.gateway.model.message import Message
 from cel.middlewares.in_mem_blacklist import BlackListEntry
+from cel.stores.common import redis_batch
+from cel.stores.common.redis_batch import RedisBatch
 
 
 
 class RedisBlackListMiddleware:
-    """Middleware to block users based on a blacklist. The blacklist is stored in a Redis database."""
+    """Middleware to block users based on a blacklist. The blacklist is stored in a Redis database.
+    The lookup runs in a worker thread (sync client), inside the gateway it is prefetched with
+    the other middlewares reads. Prefer RedisBlackListAsyncMiddleware."""
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    reads = {"lead"}
+    writes = set()
     
     def __init__(self, redis: str | Redis = None, key_prefix: str = "blacklistmw"):
         self.client = Redis.from_url(redis or 'redis://localhost:6379/0') if isinstance(redis, str) else redis
         self.black_list_key = key_prefix
         
+    def prefetch(self, message: Message, batch: RedisBatch):
+        batch.prefetch_hget(self.client, self.black_list_key, message.lead.get_session_id())
+
     async def __call__(self, message: Message, connector: BaseConnector, assistant: BaseAssistant):
         assert isinstance(message, Message), "Message must be a Message object"
         
         id =  message.lead.get_session_id()
         source = message.lead.connector_name
-        entry = self.client.hget(self.black_list_key, id)
+        entry = await redis_batch.hget(self.client, self.black_list_key, id)
         if entry:
             entry = json.loads(entry)
             log.critical(f"User {id} from {source} is blacklisted. Reason: {entry['reason']}")
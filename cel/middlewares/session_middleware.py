@@ -6,6 +6,8 @@ from dataclasses import asdict, dataclass
 from cel.assistants.base_assistant import BaseAssistant
 from cel.gateway.model.base_connector import BaseConnector
 from cel.gateway.model.message import Message
+from cel.stores.common import redis_batch
+from cel.stores.common.redis_batch import RedisBatch
 from loguru import logger as log
 
 Redis = aioredis.Redis
@@ -35,7 +37,15 @@ class SessionMiddleware(ABC):
     Message extended metadata:
         - time_since_last_request: Time since last request in seconds.
         
+    Inside the gateway, the session entry is prefetched with the other middlewares reads
+    and written in the per-message RedisBatch, flushed after the middleware chain.
     """
+    # concurrent middlewares, see BaseMiddleware
+    parallel_safe = True
+    # the session entry stores the whole message metadata
+    reads = {"lead", "text", "metadata"}
+    writes = {"metadata.time_since_last_request"}
+
     events: SessionMiddlewareEvents = SessionMiddlewareEvents()
     
     def __init__(self, redis: str | Redis = None, key_prefix: str = "authmw", master_key: str = None):
@@ -44,6 +54,9 @@ class SessionMiddleware(ABC):
         log.critical("No master key provided. Using default key") if not master_key else None
         self.master_key = master_key or DEFUALT_MASTER_KEY
         
+    def prefetch(self, message: Message, batch: RedisBatch):
+        batch.prefetch_hget(self.client, self.key_prefix, message.lead.get_session_id())
+
     async def __call__(self, message: Message, connector: BaseConnector, assistant: BaseAssistant):
         assert isinstance(message, Message), "Message must be a Message object"
         assert isinstance(connector, BaseConnector), "Connector must be a BaseConnector object"
@@ -123,14 +136,14 @@ class SessionMiddleware(ABC):
                           metadata=metadata,
                           last_request=time.time()
                         )
-        await self.client.hset(self.key_prefix, id, json.dumps(asdict(entry)))
+        await redis_batch.hset(self.client, self.key_prefix, id, json.dumps(asdict(entry)))
         return entry
         
     async def clear_auth(self, id: str):
-        await self.client.hdel(self.key_prefix, id)
+        await redis_batch.hdel(self.client, self.key_prefix, id)
         
     async def get_entry(self, id: str):
-        entry = await self.client.hget(self.key_prefix, id)
+        entry = await redis_batch.hget(self.client, self.key_prefix, id)
         if entry:
             entry = json.loads(entry)
             return AuthEntry(id=entry.get('id'), 
@@ -0,0 +1,80 @@
+import math
+import re
+from typing import Callable
+from cel.rag.stores.vector_store import VectorRegister
+
+
+DEFAULT_CONTEXT_HEADER = "Use the following information to answer the user, if relevant:"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def approx_token_count(text: str) -> int:
+    """Approximate number of tokens of a text (~4 characters per token for English text)"""
+    return math.ceil(len(text) / 4)
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def select_passages(results: list[VectorRegister],
+                    max_tokens: int = 1000,
+                    max_distance: float = None,
+                    token_counter: Callable[[str], int] = approx_token_count) -> list[VectorRegister]:
+    """Select the retrieved passages to be injected in the prompt.
+
+    Passages are ordered by distance (most relevant first), passages without a
+    distance keep the retrieval order after the scored ones. Passages further than
+    max_distance, empty passages and duplicates (same id, or a text contained in an
+    already selected passage, as overlapping slices do) are dropped. Passages are
+    added while they fit in max_tokens; a passage that does not fit is skipped so a
+    shorter, less relevant one can still be used.
+
+    Args:
+        results (list[VectorRegister]): Retrieval results, SearchResult has a distance.
+        max_tokens (int, optional): Token budget of the passages. Defaults to 1000.
+        max_distance (float, optional): Relevance cutoff, None disables it. Defaults to None.
+        token_counter (Callable, optional): Counts the tokens of a text. Defaults to approx_token_count.
+    """
+    def sort_key(item):
+        index, vr = item
+        distance = getattr(vr, "distance", None)
+        return (distance is None, distance if distance is not None else 0, index)
+
+    selected = []
+    seen_ids = set()
+    texts = []
+    used = 0
+    for _, vr in sorted(enumerate(results or []), key=sort_key):
+        distance = getattr(vr, "distance", None)
+        if max_distance is not None and distance is not None and distance > max_distance:
+            continue
+        text = _normalize(vr.text or "")
+        if not text or vr.id in seen_ids:
+            continue
+        if any(text in t or t in text for t in texts):
+            continue
+        tokens = token_counter(vr.text)
+        if used + tokens > max_tokens:
+            continue
+        used += tokens
+        seen_ids.add(vr.id)
+        texts.append(text)
+        selected.append(vr)
+    return selected
+
+
+def build_rag_context(results: list[VectorRegister],
+                      max_tokens: int = 1000,
+                      max_distance: float = None,
+                      token_counter: Callable[[str], int] = approx_token_count,
+                      header: str = DEFAULT_CONTEXT_HEADER,
+                      separator: str = "\n\n") -> str:
+    """Build the context block appended to the system message from the retrieval
+    results, see select_passages. Returns an empty string if no passage is selected."""
+    passages = select_passages(results, max_tokens, max_distance, token_counter)
+    if not passages:
+        return ""
+    body = separator.join(vr.text.strip() for vr in passages)
+    return f"{header}\n{body}" if header else body
@@ -0,0 +1,465 @@
+""" Markdown knowledge base ingestion
+
+Slice a directory (or glob) of markdown documents in a process pool, embed the slices
+in batches with rate limited concurrency and bulk upsert them into a VectorStore.
+
+Progress, throughput and per document checkpoints are written to a JSON manifest:
+an interrupted run resumes with the documents that were not completed, and unchanged
+documents are skipped on later runs. Slices already stored with the same content hash
+are not embedded again.
+
+Usage:
+    python -m cel.rag.ingest docs/ --store numpy --store-path ./kb --collection support
+    python -m cel.rag.ingest "docs/**/*.md" --store chroma --store-path ./chroma --rpm 3000 --tpm 1000000
+"""
+import argparse
+import asyncio
+import glob
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from loguru import logger as log
+from cel.rag.context_builder import approx_token_count
+from cel.rag.slicers.base_slicer import Slice
+from cel.rag.slicers.markdown import MarkdownSlicer
+from cel.rag.stores.vector_store import CONTENT_HASH_KEY, VectorStore, content_hash
+from cel.rag.text2vec.utils import Text2VectorProvider
+from cel.stores.common import fast_json
+
+
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+
+
+def collect_documents(paths: list[str]) -> list[tuple[Path, str]]:
+    """Expand files, directories (recursively) and glob patterns into (path, key) pairs.
+    The key identifies the document in the manifest and the slice ids: the path relative
+    to the directory or glob root, without the suffix."""
+    found = {}
+    for p in paths:
+        path = Path(p)
+        if path.is_dir():
+            for f in sorted(path.rglob("*")):
+                if f.is_file() and f.suffix.lower() in MARKDOWN_SUFFIXES:
+                    found[f] = f.relative_to(path)
+        elif path.is_file():
+            found[path] = Path(path.name)
+        else:
+            # keys are relative to the directory before the first wildcard
+            root_parts = []
+            for part in path.parts:
+                if any(c in part for c in "*?["):
+                    break
+                root_parts.append(part)
+            root = Path(*root_parts) if root_parts else Path(".")
+            for f in sorted(glob.glob(p, recursive=True)):
+                f = Path(f)
+                if f.is_file():
+                    found[f] = f.relative_to(root) if f.is_relative_to(root) else Path(f.name)
+    return [(path, key.with_suffix("").as_posix()) for path, key in found.items()]
+
+
+def slice_document(path: str, name: str, split_table_rows: bool = False, encoding: str = None) -> tuple[str, list[Slice]]:
+    """Process pool worker: (file hash, slices) of a markdown document"""
+    with open(path, "rb") as f:
+        data = f.read()
+    text = data.decode(encoding or "utf-8")
+    slices = MarkdownSlicer(name=name, content=text, split_table_rows=split_table_rows).slice() if text.strip() else []
+    return hashlib.sha256(data).hexdigest(), slices
+
+
+class RateLimiter:
+    """Requests and tokens per minute budgets, as token buckets refilled continuously.
+
+    Args:
+        rpm (int, optional): Max requests per minute. Defaults to None (unlimited).
+        tpm (int, optional): Max tokens per minute. Defaults to None (unlimited).
+    """
+
+    def __init__(self, rpm: int = None, tpm: int = None, timer=time.monotonic):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.timer = timer
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = timer()
+
+    def __refill(self):
+        now = self.timer()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until a request of tokens fits in the budgets"""
+        # a request bigger than the bucket waits for a full bucket
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        while True:
+            self.__refill()
+            wait = 0
+            if self.rpm and self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+            if self.tpm and self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+            if wait == 0:
+                self._requests -= 1 if self.rpm else 0
+                self._tokens -= tokens
+                return
+            await asyncio.sleep(wait)
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    return getattr(e, "status_code", None) == 429 or type(e).__name__ == "RateLimitError"
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    skipped_documents: int = 0
+    completed_documents: int = 0
+    failed_documents: int = 0
+    slices: int = 0
+    cached_slices: int = 0
+    embedded_slices: int = 0
+    tokens: int = 0
+    requests: int = 0
+    retries: int = 0
+    elapsed: float = 0
+    slices_per_sec: float = 0
+    tokens_per_sec: float = 0
+
+
+class IngestManifest:
+    """Checkpoints of an ingestion, stored as JSON.
+
+    documents maps each document key to its file hash, slice count and status
+    ("done" or "failed"). A document is marked done once all its slices are saved in the
+    store, at the checkpoint following its last batch.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | Path = None):
+        self.path = Path(path) if path else None
+        self.documents: dict[str, dict] = {}
+        self.stats: dict = {}
+        if self.path and self.path.exists():
+            with open(self.path, "rb") as f:
+                data = fast_json.loads(f.read())
+            if data.get("version") == self.VERSION:
+                self.documents = data.get("documents", {})
+
+    def is_done(self, key: str, file_hash: str) -> bool:
+        doc = self.documents.get(key)
+        return bool(doc) and doc.get("status") == "done" and doc.get("hash") == file_hash
+
+    def mark_done(self, key: str, file_hash: str, slices: int):
+        self.documents[key] = {"hash": file_hash, "slices": slices, "status": "done", "updated_at": time.time()}
+
+    def mark_failed(self, key: str, file_hash: str, error: str):
+        previous = self.documents.get(key, {})
+        self.documents[key] = {**previous, "hash": file_hash, "status": "failed", "error": error, "updated_at": time.time()}
+
+    def save(self, stats: IngestStats = None):
+        if stats is not None:
+            self.stats = asdict(stats)
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        data = fast_json.dumps({"version": self.VERSION, "stats": self.stats, "documents": self.documents})
+        with open(tmp, "wb") as f:
+            f.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class _Document:
+    key: str
+    file_hash: str
+    slices: int
+    pending: int
+    sliced: bool = False
+    error: str = None
+
+
+async def aingest(paths: list[str],
+                  store: VectorStore,
+                  text2vec: Text2VectorProvider,
+                  manifest_path: str | Path = None,
+                  split_table_rows: bool = False,
+                  encoding: str = None,
+                  metadata: dict = None,
+                  batch_size: int = 100,
+                  max_concurrency: int = 4,
+                  workers: int = None,
+                  rpm: int = None,
+                  tpm: int = None,
+                  max_retries: int = 5,
+                  retry_delay: float = 1,
+                  prune: bool = False,
+                  checkpoint_every: int = 10000) -> IngestStats:
+    """Ingest markdown documents into a vector store.
+
+    Documents are sliced in a process pool and their slices are streamed into
+    batches of batch_size texts. Up to max_concurrency atexts2vec calls run at once,
+    within the rpm/tpm budgets; failed calls are retried with exponential backoff.
+    Each embedded batch is stored with a bulk upsert_many. Every checkpoint_every
+    embedded slices, and at the end, the store is saved and then the completed
+    documents are marked done in the manifest, so a resumed run never skips a
+    document whose slices were not persisted.
+
+    Args:
+        paths (list[str]): Markdown files, directories or glob patterns.
+        store (VectorStore): Destination store.
+        text2vec (Text2VectorProvider): Embeddings provider.
+        manifest_path (str | Path, optional): JSON manifest with progress and checkpoints. Defaults to None.
+        split_table_rows (bool, optional): See MarkdownSlicer. Defaults to False.
+        encoding (str, optional): Documents encoding. Defaults to None (utf-8).
+        metadata (dict, optional): Metadata added to every slice. Defaults to None.
+        batch_size (int, optional): Texts per embeddings request. Defaults to 100.
+        max_concurrency (int, optional): Embeddings requests in flight. Defaults to 4.
+        workers (int, optional): Slicing processes. Defaults to None (cpu count).
+        rpm (int, optional): Embeddings requests per minute. Defaults to None (unlimited).
+        tpm (int, optional): Embeddings tokens per minute. Defaults to None (unlimited).
+        max_retries (int, optional): Retries of a failed embeddings request. Defaults to 5.
+        retry_delay (float, optional): First retry delay in seconds, doubled on each retry
+        and x4 on rate limit errors. Defaults to 1.
+        prune (bool, optional): Delete the slices of documents that are no longer found. Defaults to False.
+        checkpoint_every (int, optional): Embedded slices between two checkpoints. Defaults to 10000.
+    """
+    assert batch_size > 0, "batch_size must be greater than 0"
+    assert max_concurrency > 0, "max_concurrency must be greater than 0"
+    assert checkpoint_every > 0, "checkpoint_every must be greater than 0"
+
+    start = time.perf_counter()
+    manifest = IngestManifest(manifest_path)
+    stats = IngestStats()
+    limiter = RateLimiter(rpm=rpm, tpm=tpm)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    upsert_lock = asyncio.Lock()
+    model = getattr(text2vec, "model", None)
+    base_meta = {**(metadata or {}), "slicer": "markdown"}
+
+    documents = collect_documents(paths)
+    stats.documents = len(documents)
+    log.info(f"Ingest: {len(documents)} documents")
+    stored_hashes = await asyncio.to_thread(store.get_content_hashes) or {}
+
+    tasks: set[asyncio.Task] = set()
+    batch: list[tuple[_Document, str, str, dict]] = []
+    # documents completed since the last checkpoint
+    finished: list[_Document] = []
+    last_checkpoint = 0
+
+    def update_throughput():
+        stats.elapsed = time.perf_counter() - start
+        if stats.elapsed > 0:
+            stats.slices_per_sec = stats.embedded_slices / stats.elapsed
+            stats.tokens_per_sec = stats.tokens / stats.elapsed
+
+    def complete(doc: _Document):
+        if not doc.sliced or doc.pending > 0:
+            return
+        if doc.error:
+            stats.failed_documents += 1
+            log.error(f"Ingest: {doc.key} failed: {doc.error}")
+        else:
+            stats.completed_documents += 1
+        finished.append(doc)
+        update_throughput()
+        log.info(f"Ingest: [{stats.completed_documents + stats.failed_documents + stats.skipped_documents}/{stats.documents}] "
+                 f"{doc.key}: {doc.slices} slices, {stats.slices_per_sec:.1f} slices/s, {stats.tokens_per_sec:.0f} tokens/s")
+
+    async def checkpoint():
+        nonlocal last_checkpoint
+        last_checkpoint = stats.embedded_slices
+        # the slices of these documents were upserted before the save
+        docs = finished[:]
+        del finished[:len(docs)]
+        async with upsert_lock:
+            await asyncio.to_thread(store.save)
+        for doc in docs:
+            if doc.error:
+                manifest.mark_failed(doc.key, doc.file_hash, doc.error)
+            else:
+                manifest.mark_done(doc.key, doc.file_hash, doc.slices)
+        update_throughput()
+        manifest.save(stats)
+
+    async def embed(items: list[tuple[_Document, str, str, dict]]):
+        try:
+            texts = [text for _, _, text, _ in items]
+            tokens = sum(approx_token_count(t) for t in texts)
+            for attempt in range(max_retries + 1):
+                await limiter.acquire(tokens)
+                try:
+                    stats.requests += 1
+                    vectors = await text2vec.atexts2vec(texts)
+                    break
+                except Exception as e:
+                    if attempt == max_retries:
+                        raise
+                    stats.retries += 1
+                    delay = min(60, retry_delay * 2 ** attempt * (4 if is_rate_limit_error(e) else 1))
+                    log.warning(f"Ingest: embeddings request failed ({e}), retry in {delay}s")
+                    await asyncio.sleep(delay)
+            async with upsert_lock:
+                await asyncio.to_thread(store.upsert_many,
+                                        [id for _, id, _, _ in items],
+                                        vectors,
+                                        texts,
+                                        [meta for _, _, _, meta in items])
+            stats.embedded_slices += len(items)
+            stats.tokens += tokens
+        except Exception as e:
+            for doc, _, _, _ in items:
+                doc.error = doc.error or str(e)
+        finally:
+            semaphore.release()
+        for doc, _, _, _ in items:
+            doc.pending -= 1
+        for doc in {id(doc): doc for doc, _, _, _ in items}.values():
+            complete(doc)
+        if stats.embedded_slices - last_checkpoint >= checkpoint_every:
+            await checkpoint()
+
+    async def flush():
+        nonlocal batch
+        items, batch = batch, []
+        # backpressure: slicing waits while max_concurrency batches are in flight
+        await semaphore.acquire()
+        task = asyncio.create_task(embed(items))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        async def slice_one(path: Path, key: str):
+            try:
+                return key, await loop.run_in_executor(pool, slice_document, str(path), key, split_table_rows, encoding), None
+            except Exception as e:
+                return key, None, e
+
+        for next_done in asyncio.as_completed([slice_one(path, key) for path, key in documents]):
+            key, result, error = await next_done
+            if error is not None:
+                stats.failed_documents += 1
+                manifest.mark_failed(key, None, f"slicing failed: {error}")
+                log.error(f"Ingest: {key} slicing failed: {error}")
+                continue
+            file_hash, slices = result
+            if manifest.is_done(key, file_hash):
+                stats.skipped_documents += 1
+                continue
+
+            doc = _Document(key=key, file_hash=file_hash, slices=len(slices), pending=0)
+            previous = manifest.documents.get(key, {}).get("slices", 0)
+            stale = [f"{key}-{i}" for i in range(len(slices), previous)]
+            if stale:
+                async with upsert_lock:
+                    await asyncio.to_thread(store.delete_many, stale)
+
+            stats.slices += len(slices)
+            for slice in slices:
+                h = content_hash(slice.text, model)
+                if stored_hashes.get(slice.id) == h:
+                    stats.cached_slices += 1
+                    continue
+                doc.pending += 1
+                meta = {**base_meta, **slice.metadata, "source": key, CONTENT_HASH_KEY: h}
+                batch.append((doc, slice.id, slice.text, meta))
+                if len(batch) >= batch_size:
+                    await flush()
+            doc.sliced = True
+            complete(doc)
+
+    if batch:
+        await flush()
+    while tasks:
+        await asyncio.gather(*list(tasks))
+
+    if prune:
+        found = {key for _, key in documents}
+        for key in [k for k in manifest.documents if k not in found]:
+            ids = [f"{key}-{i}" for i in range(manifest.documents[key].get("slices", 0))]
+            async with upsert_lock:
+                await asyncio.to_thread(store.delete_many, ids)
+            del manifest.documents[key]
+            log.info(f"Ingest: pruned {key}: {len(ids)} slices")
+
+    await checkpoint()
+    log.info(f"Ingest: {stats.completed_documents} documents ingested, {stats.skipped_documents} unchanged, "
+             f"{stats.failed_documents} failed. {stats.embedded_slices} slices embedded "
+             f"({stats.cached_slices} already stored) in {stats.elapsed:.1f}s, "
+             f"{stats.slices_per_sec:.1f} slices/s, {stats.tokens_per_sec:.0f} tokens/s")
+    return stats
+
+
+def ingest(paths: list[str], store: VectorStore, text2vec: Text2VectorProvider, **kwargs) -> IngestStats:
+    """Sync version of aingest"""
+    return asyncio.run(aingest(paths, store, text2vec, **kwargs))
+
+
+def build_text2vec(provider: str, model: str = None) -> Text2VectorProvider:
+    if provider == "ollama":
+        from cel.rag.text2vec.cached_ollama import CachedOllamaEmbedding
+        return CachedOllamaEmbedding(model=model) if model else CachedOllamaEmbedding()
+    from cel.rag.text2vec.cached_openai import CachedOpenAIEmbedding
+    return CachedOpenAIEmbedding(model=model) if model else CachedOpenAIEmbedding()
+
+
+def build_store(kind: str, text2vec: Text2VectorProvider, collection: str, path: str = None) -> VectorStore:
+    if kind == "chroma":
+        from cel.rag.stores.chroma.chroma_store import ChromaStore
+        return ChromaStore(text2vec, collection_name=collection, path=path)
+    from cel.rag.stores.numpy.numpy_store import NumpyStore
+    return NumpyStore(text2vec, collection_name=collection, path=path)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m cel.rag.ingest",
+                                     description="Ingest markdown documents into a vector store")
+    parser.add_argument("paths", nargs="+", help="Markdown files, directories or glob patterns")
+    parser.add_argument("--store", choices=["numpy", "chroma"], default="numpy")
+    parser.add_argument("--store-path", required=True, help="Directory of the persistent store")
+    parser.add_argument("--collection", default="knowledge_base")
+    parser.add_argument("--embeddings", choices=["openai", "ollama"], default="openai")
+    parser.add_argument("--model", default=None, help="Embeddings model")
+    parser.add_argument("--manifest", default=None, help="Manifest path. Defaults to <store-path>/<collection>.manifest.json")
+    parser.add_argument("--split-table-rows", action="store_true")
+    parser.add_argument("--encoding", default=None)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rpm", type=int, default=None, help="Embeddings requests per minute")
+    parser.add_argument("--tpm", type=int, default=None, help="Embeddings tokens per minute")
+    parser.add_argument("--prune", action="store_true", help="Delete the slices of removed documents")
+    parser.add_argument("--checkpoint-every", type=int, default=10000, help="Embedded slices between two store saves")
+    args = parser.parse_args(argv)
+
+    text2vec = build_text2vec(args.embeddings, args.model)
+    store = build_store(args.store, text2vec, args.collection, args.store_path)
+    manifest = args.manifest or Path(args.store_path) / f"{args.collection}.manifest.json"
+    stats = ingest(args.paths, store, text2vec,
+                   manifest_path=manifest,
+                   split_table_rows=args.split_table_rows,
+                   encoding=args.encoding,
+                   batch_size=args.batch_size,
+                   max_concurrency=args.max_concurrency,
+                   workers=args.workers,
+                   rpm=args.rpm,
+                   tpm=args.tpm,
+                   prune=args.prune,
+                   checkpoint_every=args.checkpoint_every)
+    return 1 if stats.failed_documents else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
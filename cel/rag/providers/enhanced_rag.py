@@ -31,18 +31,31 @@ class QueryRefiner:
             max_tokens=self.max_tokens
         )
 
+    def build_prompt(self, query: str, history: List[ContextMessage]) -> str:
+        history_context = "\n".join(
+            [f"User: {msg.content}" for msg in history[-self.n_history_messages:]])
+        return f"{self.custom_prompt}\n\nHistory:\n{history_context}\n\nUser Query: {query}\n\nEnhanced Query:"
+
     def enhance_query(self, query: str, history: List[ContextMessage]) -> str:
 
         enhanced_query = query
 
         if history:
-            history_context = "\n".join(
-                [f"User: {msg.content}" for msg in history[-self.n_history_messages:]])
-            prompt = f"{self.custom_prompt}\n\nHistory:\n{history_context}\n\nUser Query: {query}\n\nEnhanced Query:"
+            response = self.llm.invoke([SystemMessage(content=self.build_prompt(query, history))])
+
+            if response and response.content:
+                enhanced_query = response.content
+
+        return enhanced_query
+
+    async def aenhance_query(self, query: str, history: List[ContextMessage]) -> str:
+
+        enhanced_query = query
 
-            response = self.llm.invoke([SystemMessage(content=prompt)])
+        if history:
+            response = await self.llm.ainvoke([SystemMessage(content=self.build_prompt(query, history))])
 
-            if response and isinstance(response, SystemMessage):
+            if response and response.content:
                 enhanced_query = response.content
 
         return enhanced_query
@@ -62,3 +75,11 @@ class EnhancedRetriever(RAGRetriever):
         enhanced_query = self.query_builder.enhance_query(query, history)
         # Call the base retriever with the enhanced query
         return self.base_retriever.search(enhanced_query, top_k)
+
+    async def asearch(self,
+               query: str,
+               top_k: int = 1,
+               history: List[ContextMessage] = None,
+               state: dict = {}) -> List[VectorRegister]:
+        enhanced_query = await self.query_builder.aenhance_query(query, history)
+        return await self.base_retriever.asearch(enhanced_query, top_k)
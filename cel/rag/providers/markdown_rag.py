@@ -1,4 +1,5 @@
 from pathlib import Path
+import re
 import time
 from halo import Halo
 from loguru import logger as log
@@ -7,7 +8,7 @@ from cel.rag.providers.rag_retriever import RAGRetriever
 from cel.rag.slicers.base_slicer import Slice
 from cel.rag.slicers.markdown.markdown import MarkdownSlicer
 from cel.rag.stores.chroma.chroma_store import ChromaStore
-from cel.rag.stores.vector_store import VectorRegister, VectorStore
+from cel.rag.stores.vector_store import CONTENT_HASH_KEY, VectorRegister, VectorStore, content_hash
 from cel.rag.text2vec.cached_openai import CachedOpenAIEmbedding
 from cel.rag.text2vec.utils import Text2VectorProvider
 
@@ -24,9 +25,12 @@ class MarkdownRAG(RAGRetriever):
         split_table_rows (bool): Split table rows into separate slices
         text2vec (Text2VectorProvider): A text to vector provider
         store (VectorStore): A store to save the vectors. By default, it uses ChromaStore
-        which runs on process memory.
+        which runs on process memory. Persistent stores (NumpyStore or ChromaStore with a path)
+        keep the vectors between restarts.
         collection (str): The name of the collection
         metadata (dict): Metadata to add to the stored vectors
+        store_path (str | Path): Directory of the persistent ChromaStore created by default.
+        On load, only new or changed slices are embedded and the removed slices of the document are deleted.
     """
     
     def __init__(self,
@@ -39,7 +43,8 @@ class MarkdownRAG(RAGRetriever):
         text2vec: Text2VectorProvider = None,
         store: VectorStore = None,
         collection: str = None,
-        metadata: dict = None
+        metadata: dict = None,
+        store_path: str | Path = None
         ):
             self.name = name
             self.file_path = file_path
@@ -49,7 +54,7 @@ class MarkdownRAG(RAGRetriever):
             self.split_table_rows = split_table_rows
             self.collection_name = collection or name
             self.text2vec = text2vec or CachedOpenAIEmbedding()
-            self.store = store or ChromaStore(self.text2vec, collection_name=self.collection_name)
+            self.store = store if store is not None else ChromaStore(self.text2vec, collection_name=self.collection_name, path=store_path)
             self.metadata = metadata or {}
             
 
@@ -79,14 +84,31 @@ class MarkdownRAG(RAGRetriever):
         
 
         spinner.start()
-        spinner.text = 'Embedding markdown slices...'
-        for slice in slices:
-            idx = slices.index(slice) + 1
-            spinner.text = f'Processing slice {idx}/{len(slices)}'
-            self.__embed_slice(slice)
-            
+        spinner.text = 'Checking stored slices...'
+        hashes = [content_hash(slice.text, getattr(self.text2vec, 'model', None)) for slice in slices]
+        changed, removed = self.__diff_slices(slices, hashes)
+        log.debug(f'Changed slices: {len(changed)}, removed slices: {len(removed)}')
+        if removed:
+            self.store.delete_many(removed)
+
+        spinner.text = f'Embedding {len(changed)} markdown slices...'
+        self.__embed_slices([slices[i] for i in changed], [hashes[i] for i in changed])
+        if changed or removed:
+            self.store.save()
         spinner.succeed('Processing complete')
         spinner.stop()
+
+    def __diff_slices(self, slices: list[Slice], hashes: list[str]) -> tuple[list[int], list[str]]:
+        """Indexes of the slices to embed and ids of the stored slices that no longer exist"""
+        stored = self.store.get_content_hashes()
+        if stored is None:
+            return list(range(len(slices))), []
+        changed = [i for i, (slice, h) in enumerate(zip(slices, hashes)) if stored.get(slice.id) != h]
+        ids = {slice.id for slice in slices}
+        # the store may be shared with other documents, only delete the slices of this one
+        owned = re.compile(rf"{re.escape(self.name)}-\d+")
+        removed = [id for id in stored if id not in ids and owned.fullmatch(id)]
+        return changed, removed
         
         
     def search(self, 
@@ -97,23 +119,30 @@ class MarkdownRAG(RAGRetriever):
         
         res = self.store.search(query, top_k)
         return res
+
+    async def asearch(self, 
+               query: str, 
+               top_k: int = 1, 
+               history: list[ContextMessage] = None,
+               state: dict = {}) -> list[VectorRegister]:
+        
+        return await self.store.asearch(query, top_k)
     
     
     
-    def __embed_slice(self, slice: Slice):
-        clip = slice.text[:30]
-        # log.debug(f'Embedding slice {slice.id}: {clip}...')
-        
-        vector = self.text2vec.text2vec(slice.text)
-        # log.debug(f'Vector: {vector}')
+    def __embed_slices(self, slices: list[Slice], hashes: list[str]):
+        """Embed the slices with batched text2vec calls and store them with a bulk upsert"""
+        if not slices:
+            return
+        texts = [slice.text for slice in slices]
+        vectors = self.text2vec.texts2vec(texts)
         
-        # log.debug(f'Storing vector for slice {slice.id}...')
         meta = {
             **self.metadata,
             'slicer': 'markdown',
             'timestamp': time.time(),
         }
-        self.store.upsert_text(slice.id, slice.text, meta)
-        
-        
-            
+        self.store.upsert_many([slice.id for slice in slices],
+                               vectors,
+                               texts,
+                               [{**meta, CONTENT_HASH_KEY: h} for h in hashes])
@@ -1,3 +1,4 @@
+import asyncio
 from cel.model.common import ContextMessage
 from cel.rag.stores.vector_store import VectorRegister
 
@@ -12,4 +13,13 @@ class RAGRetriever:
                 top_k: int = 1,
                 history: list[ContextMessage] = None,
                 state: dict = {}) -> list[VectorRegister]:
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+    async def asearch(self,
+                query: str,
+                top_k: int = 1,
+                history: list[ContextMessage] = None,
+                state: dict = {}) -> list[VectorRegister]:
+        """Async search. By default the sync search runs in the default thread pool,
+        retrievers backed by async stores or clients should override it"""
+        return await asyncio.to_thread(self.search, query, top_k, history, state)
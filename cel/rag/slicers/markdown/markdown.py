@@ -1,6 +1,7 @@
 from pathlib import Path
+from typing import Iterator
 
-from cel.rag.slicers.markdown.utils import parse_markdown, Block
+from cel.rag.slicers.markdown.utils import iter_markdown, parse_markdown, Block
 from ..base_slicer import Slicer, Slice
 from loguru import logger as log
 
@@ -91,19 +92,15 @@ class MarkdownSlicer(Slicer):
         return self.__load_from_disk()
         
         
-    def slice(self) -> list[Slice]:
-        slices=[]
-        text = self.__load()        
-        blocks = parse_markdown(text, split_table_rows=self.split_table_rows)
-        
-        for i, block in enumerate(blocks):
-            log.debug(f"Block: {block}")
-            log.debug('------------------------------------------')
-        
+    def iter_slices(self) -> Iterator[Slice]:
+        """Yield the slices as the markdown is parsed"""
+        text = self.__load()
+        count = 0
+        for i, block in enumerate(iter_markdown(text, split_table_rows=self.split_table_rows)):
             # concatenate breadcrumbs in a string
             bc_str = " > ".join(block.breadcrumbs or [])
         
-            slice = Slice(
+            yield Slice(
                 id= f"{self.name}-{i}",
                 text= f"{bc_str}\n{block.text}",
                 metadata={
@@ -112,6 +109,8 @@ class MarkdownSlicer(Slicer):
                 },
                 source=self.name
             )
-            slices.append(slice)
-            
-        return slices
\ No newline at end of file
+            count += 1
+        log.debug(f"MarkdownSlicer {self.name}: {count} slices")
+        
+    def slice(self) -> list[Slice]:
+        return list(self.iter_slices())
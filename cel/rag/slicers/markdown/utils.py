@@ -2,6 +2,10 @@ import marko
 from marko.block import Document
 from abc import ABC
 from dataclasses import dataclass, field
+from typing import Iterator
+
+BLOCK_TYPES = frozenset(['paragraph', 'code', 'blockquote', 'html', 'hr', 'list', 'listitem', 'table', 'tablerow', 'tablecell', 'strong', 'em', 'codespan', 'br', 'del', 'link', 'image', 'text'])
+
 
 @dataclass
 class Block(ABC):
@@ -10,65 +14,80 @@ class Block(ABC):
     index: int
     breadcrumbs: list[str]
 
+
 def build_breadcrumbs(doc: Document, current_index: int) -> list[str]:
+    """Headings above the block at current_index, from the outermost level.
+    Walks back from the block, prefer the running heading stack of iter_markdown
+    when all the blocks are needed."""
     breadcrumbs = []
     current_level = float('inf')
     # iterate from current_index to the beginning of the document
-    for block in reversed(doc.children[:current_index]):
-        if doc.children.index(block) >= current_index:
-            break
+    for i in range(current_index - 1, -1, -1):
+        block = doc.children[i]
         if block.get_type().lower() == 'heading':
             level = block.level
             if level < current_level:
                 current_level = level
-                breadcrumbs.append(block.children[0].children)
+                breadcrumbs.append(_heading_text(block))
+                if level <= 1:
+                    break
     breadcrumbs.reverse()
     return breadcrumbs
 
 
-def parse_markdown(md: str, split_table_rows: bool = False) -> list[Block]:
+def _block_text(child):
+    """Text of the first inline element, None for blocks without children (hr, html)"""
+    children = getattr(child, 'children', None)
+    if not children or isinstance(children, str):
+        return None
+    return getattr(children[0], 'children', None)
+
+
+def _heading_text(heading) -> str:
+    return _block_text(heading) or ''
+
+
+def iter_markdown(md: str, split_table_rows: bool = False) -> Iterator[Block]:
+    """Parse markdown and yield its blocks with their breadcrumbs in a single pass.
+
+    Breadcrumbs come from a running stack of (level, heading) updated on each heading,
+    so the cost is linear in the number of blocks. Blocks are yielded as they are
+    found, slices can be streamed to the embeddings without building the whole list.
+    """
     from marko.md_renderer import MarkdownRenderer
     mdr = marko.Markdown(extensions=['gfm'], renderer=MarkdownRenderer)
     doc = mdr.parse(md)
-    block_types = ['paragraph', 'code', 'blockquote', 'html', 'hr', 'list', 'listitem', 'table', 'tablerow', 'tablecell', 'strong', 'em', 'codespan', 'br', 'del', 'link', 'image', 'text'];
 
-    blocks = []
-
-    for child in doc.children:
+    headings: list[tuple[int, str]] = []
+    for child_index, child in enumerate(doc.children):
 
         type = child.get_type().lower()
-        
-        if (type) in block_types:
-            text = child.children[0].children
-            child_index = doc.children.index(child)
-            bc = build_breadcrumbs(doc, child_index)
-            blocks.append(Block(type=type, text=text, index=child_index, breadcrumbs=bc))
-            
+
+        if type == 'heading':
+            while headings and headings[-1][0] >= child.level:
+                headings.pop()
+            headings.append((child.level, _heading_text(child)))
+            continue
+
+        if type in BLOCK_TYPES:
+            text = _block_text(child)
+            if text is not None:
+                yield Block(type=type, text=text, index=child_index, breadcrumbs=[h for _, h in headings])
+
         if type == 'table':
-            table = []
-            header = child.children[0].children
-            rows = child.children[1:]
-            
             if split_table_rows:
+                header = child.children[0].children
                 header_text = ' | '.join([cell.children[0].children for cell in header])
                 header_sepator = ' | '.join(['---' for cell in header])
-                child_index = doc.children.index(child)
-                bc = build_breadcrumbs(doc, child_index)            
-                
-                for row in rows:
+                for row in child.children[1:]:
                     row_text = ' | '.join([cell.children[0].children for cell in row.children])
-                    # print(row_text)
-                    table.append(f"{header_text}\n{header_sepator}\n{row_text}")
-                    
-                for row in table:
-                    child_index = doc.children.index(child)
-                    bc = build_breadcrumbs(doc, child_index)
-                    blocks.append(Block(type='table', text=row, index=child_index, breadcrumbs=bc))
+                    yield Block(type='table',
+                                text=f"{header_text}\n{header_sepator}\n{row_text}",
+                                index=child_index,
+                                breadcrumbs=[h for _, h in headings])
             else:
-                table_text = mdr.render(child)
-                bc = build_breadcrumbs(doc, child_index)
-                blocks.append(Block(type='table', text=table_text, index=doc.children.index(child), breadcrumbs=bc))
+                yield Block(type='table', text=mdr.render(child), index=child_index, breadcrumbs=[h for _, h in headings])
 
-                
 
-    return blocks
\ No newline at end of file
+def parse_markdown(md: str, split_table_rows: bool = False) -> list[Block]:
+    return list(iter_markdown(md, split_table_rows=split_table_rows))
@@ -1,39 +1,49 @@
 
 from abc import ABC
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
 from loguru import logger as log
 import chromadb
-from cel.rag.stores.vector_store import VectorRegister, VectorStore
-from cel.rag.text2vec.utils import Embedding, Text2VectorProvider
+from cel.rag.stores.vector_store import (CONTENT_HASH_KEY, DEFAULT_INCLUDE, SEARCH_FIELDS, SearchResult,
+                                         VectorRegister, VectorStore, search_fields)
+from cel.rag.text2vec.utils import Embedding, Text2VectorProvider, to_float_vector
 
 
 
-@dataclass
-class VectorRegisterResult(VectorRegister):
-    """Vector register for ChromaDB"""
-    distance: float
-    
+# kept for compatibility, search results are lean SearchResult tuples
+VectorRegisterResult = SearchResult
+
+# search field -> chromadb include
+CHROMA_FIELDS = {
+    'text': 'documents',
+    'metadata': 'metadatas',
+    'distance': 'distances',
+    'vector': 'embeddings',
+}
+
 
 class ChromaStore(VectorStore):
+    """ChromaDB vector store.
+
+    Args:
+        text2vec_provider (Text2VectorProvider): Embeddings of the texts and queries.
+        collection_name (str, optional): Name of the collection. Defaults to "my_collection".
+        path (str | Path, optional): Directory of a persistent chromadb client. The collection
+        survives restarts and MarkdownRAG only embeds the slices that changed. Defaults to None
+        (in-memory client).
+    """
     
-    def __init__(self, text2vec_provider: Text2VectorProvider, collection_name: str = "my_collection"):
+    def __init__(self, text2vec_provider: Text2VectorProvider, collection_name: str = "my_collection", path: str | Path = None):
         log.debug(f"Instantiate ChromaStore with collection_name: {collection_name}")
         self.text2vec = text2vec_provider
-        self.client = chromadb.Client()
+        self.path = path
+        self.client = chromadb.PersistentClient(path=str(path)) if path else chromadb.Client()
         self.collection_name = collection_name
         
         # create collection if not exists
-        collections = self.client.list_collections()
-        for collection in collections:
-            if collection.name == collection_name:
-                self.collection = collection
-                log.debug(f"Collection {collection_name} already exists")
-                break
-        else:
-            log.debug(f"Creating collection {collection_name}")
-            self.collection = self.client.create_collection(
-                            name=collection_name,
-                        )
+        self.collection = self.client.get_or_create_collection(name=collection_name)
+        log.debug(f"Collection {collection_name}: {self.collection.count()} vectors")
 
     def get_vector(self, id: str) -> VectorRegister:
         """Get a vector chromadb by id"""
@@ -45,69 +55,61 @@ class ChromaStore(VectorStore):
                                 metadata=v['metadatas'][0])
         
 
-    def get_similar(self, vector: Embedding, top_k) -> list[VectorRegisterResult]:
-        """Get the most similar vectors to the given vector"""
+    def get_similar(self, vector: Embedding, top_k, include: Iterable[str] = DEFAULT_INCLUDE) -> list[VectorRegisterResult]:
+        """Get the most similar vectors to the given vector, only the fields in include are read"""
+        fields = search_fields(include)
         res = self.collection.query(
             query_embeddings=[vector],
             n_results=top_k,
-            include=['documents', 'metadatas', 'distances', 'embeddings']
-        )
-        
-        return [VectorRegisterResult(id=id, 
-                               vector=embedding, 
-                               distance=distance,
-                               text=text,
-                               metadata=metadata) for id, embedding, distance, text, metadata in zip(res['ids'][0],
-                                                                                        res['embeddings'][0],
-                                                                                        res['distances'][0],
-                                                                                        res['documents'][0], 
-                                                                                        res['metadatas'][0])]   
-                
-
-    def search(self, query: str, top_k: int = 1) -> list[VectorRegisterResult]:
-        """Search for vectors by a query"""
-        
-        vector = self.text2vec.text2vec(query)
-        res = self.collection.query(
-            query_embeddings=[vector],
-            n_results=top_k,
-            include=['documents', 'metadatas', 'distances', 'embeddings']
+            include=[CHROMA_FIELDS[f] for f in fields]
         )
+        # res sample: {'distances': [[0.77, 1.63]], 'documents': [['This is a document about parrots', ...]], 'ids': [['4', '0']], 'metadatas': [[{'metadata': 'metadata'}, ...]]}
+        ids = res['ids'][0]
+        columns = {f: res[CHROMA_FIELDS[f]][0] if f in fields else [None] * len(ids) for f in SEARCH_FIELDS}
+        return [VectorRegisterResult(id, text, metadata, distance, embedding)
+                for id, text, metadata, distance, embedding in zip(ids,
+                                                                   columns['text'],
+                                                                   columns['metadata'],
+                                                                   columns['distance'],
+                                                                   columns['vector'])]
 
-        # convert QueryResult to VectorRegister
-        # res sample: {'data': None, 'distances': [[0.7714858651161194, 1.6371256113052368]], 'documents': [['This is a document about parrots', 'This is a document about pineapple']], 'ids': [['4', '0']], 'metadatas': [[{'metadata': 'metadata'}, {'metadata': 'metadata'}]]}
-        return [VectorRegisterResult(id=id, 
-                               vector=embedding, 
-                               distance=distance,
-                               text=text,
-                               metadata=metadata) for id, embedding, distance, text, metadata in zip(res['ids'][0],
-                                                                                        res['embeddings'][0],
-                                                                                        res['distances'][0],
-                                                                                        res['documents'][0], 
-                                                                                        res['metadatas'][0])]   
-        
+    def search(self, query: str, top_k: int = 1, include: Iterable[str] = DEFAULT_INCLUDE) -> list[VectorRegisterResult]:
+        """Search for vectors by a query"""
+        return self.get_similar(self.text2vec.text2vec(query), top_k, include)
 
+    async def asearch(self, query: str, top_k: int = 1, include: Iterable[str] = DEFAULT_INCLUDE) -> list[VectorRegisterResult]:
+        """Search for vectors by a query, the query is embedded with the async text2vec
+        and the collection is queried in the default thread pool"""
+        vector = await self.text2vec.atext2vec(query)
+        return await self.aget_similar(vector, top_k, include=include)
         
         
 
     def upsert(self, id: str, vector: Embedding, text: str, metadata: dict):
         """Upsert a vector to the store"""
-        self.collection.add(
+        self.collection.upsert(
             documents=text,
             ids=[id],
-            metadatas=metadata
+            metadatas=metadata,
+            embeddings=to_float_vector(vector)
         )
         
+    def upsert_many(self, ids: list[str], vectors: list[Embedding], texts: list[str], metadatas: list[dict]):
+        """Upsert several vectors with bulk collection.upsert calls"""
+        batch_size = self.client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            self.collection.upsert(
+                ids=ids[i:i + batch_size],
+                documents=texts[i:i + batch_size],
+                metadatas=metadatas[i:i + batch_size],
+                embeddings=[to_float_vector(v) for v in vectors[i:i + batch_size]]
+            )
+        
+
     def upsert_text(self, id: str, text: str, metadata: dict):
         """Upsert a vector to the store"""
         try:
-            vector =  self.text2vec.text2vec(text)
-            ## if vector is a string '[n,n,n.....]', convert it to a list
-            if isinstance(vector, str):
-                vector = [float(i) for i in vector[1:-1].split(',')]
-            ## if vector is a list of strings ['n','n','n'.....], convert it to a list of floats
-            if isinstance(vector[0], str):
-                vector = [float(i) for i in vector] 
+            vector = to_float_vector(self.text2vec.text2vec(text))
         except Exception as e:
             log.error(f"Error converting vector: {e}")
             vector = None
@@ -122,4 +124,23 @@ class ChromaStore(VectorStore):
 
     def delete(self, id):
         """Delete a vector from the store"""
-        self.collection.delete(id)
\ No newline at end of file
+        self.collection.delete(id)
+
+    def delete_many(self, ids: list[str]):
+        """Delete several vectors with bulk collection.delete calls"""
+        batch_size = self.client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[i:i + batch_size])
+
+    def get_content_hashes(self) -> dict[str, str]:
+        """Content hash of every vector in the collection, read in pages without the embeddings"""
+        hashes = {}
+        page_size = self.client.get_max_batch_size()
+        offset = 0
+        while True:
+            res = self.collection.get(include=['metadatas'], limit=page_size, offset=offset)
+            for id, metadata in zip(res['ids'], res['metadatas']):
+                hashes[id] = (metadata or {}).get(CONTENT_HASH_KEY)
+            if len(res['ids']) < page_size:
+                return hashes
+            offset += page_size
\ No newline at end of file
@@ -1,20 +1,25 @@
 from abc import ABC
-from dataclasses import dataclass
 from loguru import logger as log
 from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
 from pymongo.operations import SearchIndexModel
-from cel.rag.stores.vector_store import VectorRegister, VectorStore
+from cel.rag.stores.vector_store import DEFAULT_INCLUDE, SearchResult, VectorRegister, VectorStore, search_fields
 from cel.rag.text2vec.utils import Embedding, Text2VectorProvider
 from cel.rag.text2vec.cached_openai import CachedOpenAIEmbedding
-from typing import Optional
+from typing import Iterable, Optional
 
 
-@dataclass
-class VectorRegisterResult(VectorRegister):
-    """Vector register result with distance for MongoDB Atlas Search"""
-    distance: float
+# kept for compatibility, search results are lean SearchResult tuples
+VectorRegisterResult = SearchResult
+
+# search field -> document field projected by the aggregation
+ATLAS_FIELDS = {
+    'text': 'text',
+    'metadata': 'metadata',
+    'distance': 'score',
+    'vector': 'embedding',
+}
 
 
 class AtlasStore(VectorStore):
@@ -109,8 +114,12 @@ class AtlasStore(VectorStore):
 
         return VectorRegister(id=id, vector=vector, text=text, metadata=metadata)
 
-    def get_similar(self, vector: Embedding, top_k: int) -> list[VectorRegisterResult]:
-        """Retrieve the most similar vectors to the given vector"""
+    def get_similar(self, vector: Embedding, top_k: int, include: Iterable[str] = DEFAULT_INCLUDE) -> list[VectorRegisterResult]:
+        """Retrieve the most similar vectors to the given vector, only the fields in include are projected"""
+        fields = search_fields(include)
+        project = {'_id': 1}
+        for f in fields:
+            project[ATLAS_FIELDS[f]] = {'$meta': 'searchScore'} if f == 'distance' else 1
         pipeline = [
             {
                 '$search': {
@@ -122,13 +131,7 @@ class AtlasStore(VectorStore):
                 }
             },
             {
-                '$project': {
-                    '_id': 1,
-                    'text': 1,
-                    'metadata': 1,
-                    'embedding': 1,
-                    'score': {'$meta': 'searchScore'}
-                }
+                '$project': project
             },
             {
                 '$limit': top_k
@@ -141,15 +144,21 @@ class AtlasStore(VectorStore):
                 vector=result.get('embedding'),
                 text=result.get('text'),
                 metadata=result.get('metadata'),
-                distance=result.get('score')
+                # searchScore is a similarity in [0, 1], higher is better
+                distance=1 - result['score'] if result.get('score') is not None else None
             )
             for result in results
         ]
 
-    def search(self, query: str, top_k: int = 1) -> list[VectorRegisterResult]:
+    def search(self, query: str, top_k: int = 1, include: Iterable[str] = DEFAULT_INCLUDE) -> list[VectorRegisterResult]:
         """Search for vectors similar to the query text"""
         vector = self.text2vec.text2vec(query)
-        return self.get_similar(vector, top_k)
+        return self.get_similar(vector, top_k, include)
+
+    async def asearch(self, query: str, top_k: int = 1, include: Iterable[str] = DEFAULT_INCLUDE) -> list[VectorRegisterResult]:
+        """Search for vectors similar to the query text, the aggregation runs in the default thread pool"""
+        vector = await self.text2vec.atext2vec(query)
+        return await self.aget_similar(vector, top_k, include=include)
 
     def upsert(self, id: str, vector: Embedding, text: str, metadata: dict):
         """Insert or update a vector in the store"""
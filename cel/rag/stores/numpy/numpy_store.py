@@ -0,0 +1,317 @@
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Any, Hashable, Iterable
+import numpy as np
+from loguru import logger as log
+from cel.rag.stores.vector_store import (CONTENT_HASH_KEY, DEFAULT_INCLUDE, SearchResult, VectorRegister,
+                                         VectorStore, search_fields)
+from cel.rag.text2vec.utils import Embedding, Text2VectorProvider, to_float_vector
+from cel.stores.common import fast_json
+
+
+# search results are lean SearchResult tuples, distance is the cosine distance
+VectorRegisterResult = SearchResult
+
+
+class NumpyStore(VectorStore):
+    """In-process vector store backed by a contiguous float32 matrix of normalized rows.
+
+    Search is a single matrix-vector product (cosine similarity) followed by an
+    argpartition for the top-k, fast enough for knowledge bases up to a few hundred
+    thousand slices without any external service.
+
+    - New vectors go to an append buffer (amortized O(1) growth); updated and deleted
+    rows are tombstoned. compact() merges the buffer and drops the tombstones.
+    - With a path, save() writes the compacted matrix to <collection>.npy and the ids,
+    texts and metadata to a <collection>.meta.json sidecar. The next instance with the
+    same path memory-maps the matrix, so it boots without re-embedding. Writes are not
+    saved implicitly, save() rewrites the whole collection: call it after bulk loads.
+    - search and get_similar accept a where dict of metadata equality filters.
+
+    Args:
+        text2vec_provider (Text2VectorProvider): Embeddings of the texts and queries.
+        collection_name (str, optional): Name of the collection files. Defaults to "my_collection".
+        path (str | Path, optional): Directory of the persisted collection, None keeps it in memory. Defaults to None.
+        compact_ratio (float, optional): Compact when tombstones exceed this ratio of the rows. Defaults to 0.25.
+    """
+
+    def __init__(self,
+                 text2vec_provider: Text2VectorProvider,
+                 collection_name: str = "my_collection",
+                 path: str | Path = None,
+                 compact_ratio: float = 0.25):
+        self.text2vec = text2vec_provider
+        self.collection_name = collection_name
+        self.path = Path(path) if path else None
+        self.compact_ratio = compact_ratio
+        self.lock = threading.RLock()
+
+        self._matrix: np.ndarray = None
+        self._buffer: np.ndarray = None
+        self._buffer_len = 0
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadatas: list[dict] = []
+        self._alive: np.ndarray = np.zeros(0, dtype=bool)
+        self._rows: dict[str, int] = {}
+        self._filters: dict[tuple[str, Hashable], list[int]] = None
+        self._tombstones = 0
+
+        if self.path and self.matrix_path.exists():
+            self.__load()
+
+    @property
+    def matrix_path(self) -> Path:
+        return self.path / f"{self.collection_name}.npy"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.path / f"{self.collection_name}.meta.json"
+
+    @property
+    def dimensions(self) -> int:
+        if self._matrix is not None:
+            return self._matrix.shape[1]
+        if self._buffer is not None:
+            return self._buffer.shape[1]
+        return None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __load(self):
+        with open(self.meta_path, "rb") as f:
+            meta = fast_json.loads(f.read())
+        self._ids = meta["ids"]
+        self._texts = meta["texts"]
+        self._metadatas = meta["metadatas"]
+        if self._ids:
+            self._matrix = np.load(self.matrix_path, mmap_mode="r")
+            assert len(self._ids) == self._matrix.shape[0], \
+                f"NumpyStore: {self.meta_path} does not match {self.matrix_path}"
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        log.debug(f"NumpyStore: loaded {len(self._ids)} vectors from {self.matrix_path}")
+
+    def save(self):
+        """Compact the store and write it to path, nothing to do without a path"""
+        if not self.path:
+            return
+        with self.lock:
+            self.compact()
+            self.path.mkdir(parents=True, exist_ok=True)
+            matrix = self._matrix if self._matrix is not None \
+                else np.zeros((0, self.dimensions or 0), dtype=np.float32)
+            tmp_matrix = self.path / f".{self.collection_name}.npy.tmp"
+            tmp_meta = self.path / f".{self.collection_name}.meta.json.tmp"
+            with open(tmp_matrix, "wb") as f:
+                np.save(f, matrix)
+            with open(tmp_meta, "wb") as f:
+                meta = fast_json.dumps({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas})
+                f.write(meta if isinstance(meta, bytes) else meta.encode("utf-8"))
+            # the metadata is replaced last, a reader never sees a sidecar of another matrix
+            os.replace(tmp_matrix, self.matrix_path)
+            os.replace(tmp_meta, self.meta_path)
+            if len(self._ids):
+                self._matrix = np.load(self.matrix_path, mmap_mode="r")
+
+    def compact(self):
+        """Merge the append buffer into the matrix and drop the tombstoned rows"""
+        with self.lock:
+            if self._buffer_len == 0 and self._tombstones == 0:
+                return
+            parts = [m for m in (self._matrix, self._buffer[:self._buffer_len] if self._buffer is not None else None)
+                     if m is not None and len(m)]
+            matrix = np.concatenate(parts) if parts else None
+            keep = np.flatnonzero(self._alive)
+            if matrix is not None and len(keep) != len(matrix):
+                matrix = matrix[keep]
+            self._matrix = np.ascontiguousarray(matrix, dtype=np.float32) if matrix is not None and len(matrix) else None
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._alive = np.ones(len(self._ids), dtype=bool)
+            self._rows = {id: row for row, id in enumerate(self._ids)}
+            self._buffer = None
+            self._buffer_len = 0
+            self._tombstones = 0
+            self._filters = None
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        if not isinstance(vectors, np.ndarray):
+            vectors = [to_float_vector(v) if not isinstance(v, np.ndarray) else v for v in vectors]
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def __append(self, vectors: np.ndarray):
+        n, dims = vectors.shape
+        assert self.dimensions is None or dims == self.dimensions, \
+            f"NumpyStore: expected vectors of {self.dimensions} dimensions, got {dims}"
+        if self._buffer is None or self._buffer_len + n > len(self._buffer):
+            capacity = max(64, 2 * (self._buffer_len + n))
+            buffer = np.empty((capacity, dims), dtype=np.float32)
+            if self._buffer is not None:
+                buffer[:self._buffer_len] = self._buffer[:self._buffer_len]
+            self._buffer = buffer
+        self._buffer[self._buffer_len:self._buffer_len + n] = vectors
+        self._buffer_len += n
+
+    def __tombstone(self, id: str):
+        row = self._rows.pop(id, None)
+        if row is not None:
+            self._alive[row] = False
+            self._tombstones += 1
+
+    def __upsert_rows(self, ids: list[str], vectors, texts: list[str], metadatas: list[dict]):
+        with self.lock:
+            for id in ids:
+                self.__tombstone(id)
+            first = len(self._ids)
+            self.__append(self._normalize(vectors))
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(m or {} for m in metadatas)
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            # a repeated id in the same call keeps its last row
+            for row, id in enumerate(ids, start=first):
+                if id in self._rows:
+                    self._alive[self._rows[id]] = False
+                    self._tombstones += 1
+                self._rows[id] = row
+                if self._filters is not None:
+                    self.__index_row(row)
+            if self._tombstones > self.compact_ratio * len(self._ids):
+                self.compact()
+
+    def __index_row(self, row: int):
+        for key, value in self._metadatas[row].items():
+            if isinstance(value, Hashable):
+                self._filters.setdefault((key, value), []).append(row)
+
+    def __filter_mask(self, where: dict[str, Any]) -> np.ndarray:
+        if self._filters is None:
+            # inverted index (key, value) -> rows, built on the first filtered search,
+            # tombstoned rows are excluded by the alive mask
+            self._filters = {}
+            for row in range(len(self._metadatas)):
+                self.__index_row(row)
+        mask = self._alive.copy()
+        for key, value in where.items():
+            key_mask = np.zeros(len(self._ids), dtype=bool)
+            key_mask[self._filters.get((key, value), [])] = True
+            mask &= key_mask
+        return mask
+
+    def get_vector(self, id: str) -> VectorRegister:
+        """Get a vector by id, None if it does not exist"""
+        with self.lock:
+            row = self._rows.get(id)
+            if row is None:
+                return None
+            return VectorRegister(id=id,
+                                  vector=self.__row_vector(row),
+                                  text=self._texts[row],
+                                  metadata=self._metadatas[row])
+
+    def __row_vector(self, row: int) -> np.ndarray:
+        base = len(self._matrix) if self._matrix is not None else 0
+        if row < base:
+            return np.array(self._matrix[row])
+        return self._buffer[row - base].copy()
+
+    def get_similar(self,
+                    vector: Embedding,
+                    top_k: int,
+                    include: Iterable[str] = DEFAULT_INCLUDE,
+                    where: dict = None) -> list[VectorRegisterResult]:
+        """Get the most similar vectors to the given vector, optionally filtered by metadata"""
+        fields = search_fields(include)
+        query = self._normalize([vector])[0]
+        with self.lock:
+            if not self._rows:
+                return []
+            scores = []
+            if self._matrix is not None:
+                scores.append(self._matrix @ query)
+            if self._buffer_len:
+                scores.append(self._buffer[:self._buffer_len] @ query)
+            scores = np.concatenate(scores) if len(scores) > 1 else scores[0]
+            mask = self.__filter_mask(where) if where else self._alive
+            candidates = np.flatnonzero(mask)
+            if not len(candidates):
+                return []
+            k = min(top_k, len(candidates))
+            if len(candidates) == len(scores):
+                top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            else:
+                masked = scores[candidates]
+                top = candidates[np.argpartition(-masked, k - 1)[:k] if k < len(masked) else np.arange(len(masked))]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [VectorRegisterResult(id=self._ids[row],
+                                         text=self._texts[row] if "text" in fields else None,
+                                         metadata=self._metadatas[row] if "metadata" in fields else None,
+                                         distance=float(1 - scores[row]) if "distance" in fields else None,
+                                         vector=self.__row_vector(row) if "vector" in fields else None)
+                    for row in top]
+
+    def search(self,
+               query: str,
+               top_k: int = 1,
+               include: Iterable[str] = DEFAULT_INCLUDE,
+               where: dict = None) -> list[VectorRegisterResult]:
+        """Search for vectors by a query, optionally filtered by metadata"""
+        return self.get_similar(self.text2vec.text2vec(query), top_k, include, where)
+
+    async def aget_similar(self,
+                           vector: Embedding,
+                           top_k: int,
+                           include: Iterable[str] = DEFAULT_INCLUDE,
+                           where: dict = None) -> list[VectorRegisterResult]:
+        """Async get_similar, numpy releases the GIL during the matrix product"""
+        return await asyncio.to_thread(self.get_similar, vector, top_k, include, where)
+
+    async def asearch(self,
+                      query: str,
+                      top_k: int = 1,
+                      include: Iterable[str] = DEFAULT_INCLUDE,
+                      where: dict = None) -> list[VectorRegisterResult]:
+        """Search for vectors by a query with the async text2vec"""
+        return await self.aget_similar(await self.text2vec.atext2vec(query), top_k, include, where)
+
+    def upsert(self, id: str, vector: Embedding, text: str, metadata: dict):
+        """Upsert a vector to the store"""
+        self.__upsert_rows([id], [vector], [text], [metadata])
+
+    def upsert_many(self, ids: list[str], vectors: list[Embedding], texts: list[str], metadatas: list[dict]):
+        """Upsert several vectors at once"""
+        if ids:
+            self.__upsert_rows(list(ids), vectors, list(texts), list(metadatas))
+
+    def upsert_text(self, id: str, text: str, metadata: dict):
+        """Upsert a text to the store"""
+        self.upsert(id, self.text2vec.text2vec(text), text, metadata)
+
+    def delete(self, id: str):
+        """Delete a vector from the store"""
+        with self.lock:
+            self.__tombstone(id)
+            if self._tombstones > self.compact_ratio * len(self._ids):
+                self.compact()
+
+    def delete_many(self, ids: list[str]):
+        """Delete several vectors at once"""
+        with self.lock:
+            for id in ids:
+                self.__tombstone(id)
+            if self._tombstones > self.compact_ratio * len(self._ids):
+                self.compact()
+
+    def get_content_hashes(self) -> dict[str, str]:
+        """Content hash of every stored vector by id"""
+        with self.lock:
+            return {id: self._metadatas[row].get(CONTENT_HASH_KEY) for id, row in self._rows.items()}
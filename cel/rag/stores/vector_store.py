@@ -1,13 +1,24 @@
 # Vector store abstract class
 
+import asyncio
+import hashlib
 from abc import ABC
 from abc import abstractmethod
 from dataclasses import dataclass
-from typing import Union
+from typing import Iterable, NamedTuple, Union
 import numpy as np
 from cel.rag.text2vec.utils import Embedding
 
 
+CONTENT_HASH_KEY = "content_hash"
+
+
+def content_hash(text: str, model: str = None) -> str:
+    """Hash of a text and the embedding model, stored in the metadata under CONTENT_HASH_KEY
+    to detect the slices that changed since they were embedded"""
+    return hashlib.sha256(f"{model or ''}\n{text}".encode("utf-8")).hexdigest()
+
+
 @dataclass
 class VectorRegister(ABC):
     id: str
@@ -19,6 +30,32 @@ class VectorRegister(ABC):
         return f"{self.text}"
 
 
+SEARCH_FIELDS = frozenset(("text", "metadata", "distance", "vector"))
+"""Fields a search can return besides the id"""
+
+DEFAULT_INCLUDE = ("text", "metadata", "distance")
+"""Search projection by default, vectors are only returned when requested"""
+
+
+def search_fields(include: Iterable[str] = None) -> frozenset[str]:
+    """Validate a search projection, None means DEFAULT_INCLUDE"""
+    fields = frozenset(DEFAULT_INCLUDE if include is None else include)
+    assert fields <= SEARCH_FIELDS, f"Unknown search fields: {sorted(fields - SEARCH_FIELDS)}"
+    return fields
+
+
+class SearchResult(NamedTuple):
+    """Vector search result, the fields not included in the search projection are None"""
+    id: str
+    text: str = None
+    metadata: dict = None
+    distance: float = None
+    vector: Embedding = None
+
+    def __str__(self):
+        return f"{self.text}"
+
+
 class VectorStore(ABC):
     """Base class for vector stores. A vector store is a class that stores and retrieves by similarity and id.
     For simplicity, the vector store will define the embedding model to be used.
@@ -32,15 +69,25 @@ class VectorStore(ABC):
         pass
     
     @abstractmethod
-    def get_similar(self, vector: Embedding, top_k: int) -> list[VectorRegister]:
-        """Get the most similar vectors to the given vector"""
+    def get_similar(self, vector: Embedding, top_k: int, include: Iterable[str] = DEFAULT_INCLUDE) -> list[SearchResult]:
+        """Get the most similar vectors to the given vector.
+        include selects the returned fields (see SEARCH_FIELDS), the id is always returned"""
         pass
     
     @abstractmethod
-    def search(self, query: str, top_k: int) -> list[VectorRegister]:
-        """Search for vectors by a query"""
+    def search(self, query: str, top_k: int, include: Iterable[str] = DEFAULT_INCLUDE) -> list[SearchResult]:
+        """Search for vectors by a query, include selects the returned fields"""
         pass
 
+    async def aget_similar(self, vector: Embedding, top_k: int, **kwargs) -> list[SearchResult]:
+        """Async get_similar. By default the sync get_similar runs in the default thread pool,
+        so blocking database clients do not block the event loop"""
+        return await asyncio.to_thread(self.get_similar, vector, top_k, **kwargs)
+
+    async def asearch(self, query: str, top_k: int, **kwargs) -> list[SearchResult]:
+        """Async search, runs the sync search in the default thread pool"""
+        return await asyncio.to_thread(self.search, query, top_k, **kwargs)
+
     @abstractmethod
     def upsert(self, id: str, vector: Embedding, text: str, metadata: dict):
         """Upsert a vector to the store"""
@@ -51,7 +98,26 @@ class VectorStore(ABC):
         """Upsert a text to the store"""
         pass
     
+    def upsert_many(self, ids: list[str], vectors: list[Embedding], texts: list[str], metadatas: list[dict]):
+        """Upsert several vectors at once. Stores should override it with a bulk write"""
+        for id, vector, text, metadata in zip(ids, vectors, texts, metadatas):
+            self.upsert(id, vector, text, metadata)
+    
     @abstractmethod
     def delete(self, id: str):
         """Delete a vector from the store"""
-        pass
\ No newline at end of file
+        pass
+
+    def delete_many(self, ids: list[str]):
+        """Delete several vectors at once. Stores should override it with a bulk delete"""
+        for id in ids:
+            self.delete(id)
+
+    def get_content_hashes(self) -> dict[str, str]:
+        """Content hash (metadata CONTENT_HASH_KEY) of every stored vector by id.
+        Stores that can not list their vectors return None, every slice is embedded on load"""
+        return None
+
+    def save(self):
+        """Persist the pending writes. Stores writing through to their backend do nothing"""
+        pass
@@ -3,4 +3,17 @@ from abc import ABC, abstractmethod
 class BaseCache(ABC):
     @abstractmethod
     def memoize(self, typed: bool, expire: int, tag: str):
-        pass
\ No newline at end of file
+        pass
+
+    def memoize_key(self, func, typed: bool, tag: str, *args):
+        """Key under which memoize stores func(*args), used for bulk lookups.
+        Caches without bulk support raise NotImplementedError."""
+        raise NotImplementedError
+
+    def get_many(self, keys: list) -> list:
+        """Get the cached values for keys, None for misses"""
+        raise NotImplementedError
+
+    def set_many(self, items: dict, expire: int = None, tag: str = None):
+        """Store several key/value pairs at once"""
+        raise NotImplementedError
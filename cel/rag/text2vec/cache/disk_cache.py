@@ -6,4 +6,15 @@ class DiskCache(BaseCache):
         self.cache = Cache(cache_dir)
 
     def memoize(self, typed: bool, expire: int, tag: str):
-        return self.cache.memoize(typed=typed, expire=expire, tag=tag)
\ No newline at end of file
+        return self.cache.memoize(typed=typed, expire=expire, tag=tag)
+
+    def memoize_key(self, func, typed: bool, tag: str, *args):
+        return self.cache.memoize(typed=typed, tag=tag)(func).__cache_key__(*args)
+
+    def get_many(self, keys: list) -> list:
+        return [self.cache.get(key) for key in keys]
+
+    def set_many(self, items: dict, expire: int = None, tag: str = None):
+        with self.cache.transact():
+            for key, value in items.items():
+                self.cache.set(key, value, expire=expire, tag=tag)
@@ -25,4 +25,21 @@ class RedisCache(BaseCache):
                 return result
                 
             return wrapper
-        return decorator
\ No newline at end of file
+        return decorator
+
+    def memoize_key(self, func, typed: bool, tag: str, *args):
+        # same key as memoize, called without kwargs
+        return f"{tag}:{args}:{{}}" if typed else f"{tag}:{args}"
+
+    def get_many(self, keys: list) -> list:
+        values = self.client.mget(keys) if keys else []
+        return [v.decode('utf-8') if v else None for v in values]
+
+    def set_many(self, items: dict, expire: int = None, tag: str = None):
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            if expire:
+                pipe.setex(key, expire, str(value))
+            else:
+                pipe.set(key, str(value))
+        pipe.execute()
@@ -1,6 +1,8 @@
+import asyncio
 from .cache.base_cache import BaseCache
 from .cache.disk_cache import DiskCache
-from .utils import Embedding, Text2VectorProvider
+from .coalescing import EmbeddingCoalescer
+from .utils import Embedding, Text2VectorProvider, acached_texts2vec, cached_texts2vec
 
 try:
     import ollama
@@ -27,25 +29,87 @@ class CachedOllamaEmbedding(Text2VectorProvider):
         default: "mxbai-embed-large"
     cache_backend: CacheBackend
         The cache backend to use. Default is DiskCacheBackend.
+    batch_size: int
+        Max number of texts per worker batch in texts2vec. Default is 32.
+    max_concurrency: int
+        Max number of concurrent workers in texts2vec and batches in atext2vec. Default is 2.
+    batch_window: float
+        Seconds atext2vec waits for more texts to embed them together. Default is 0.005.
+    host: str
+        Ollama host of the async client. Default is None (OLLAMA_HOST or localhost).
+
+    The async methods share one ollama.AsyncClient, concurrent atext2vec calls for the
+    same text share a single request and cache lookups are batched.
     """
     
-    def __init__(self, model: str = "mxbai-embed-large", cache_backend: BaseCache = None, CACHE_EXPIRE=86400):
+    def __init__(self, model: str = "mxbai-embed-large", cache_backend: BaseCache = None, CACHE_EXPIRE=86400,
+                 batch_size: int = 32, max_concurrency: int = 2, batch_window: float = 0.005, host: str = None):
         self.model = model
         self.cache_backend = cache_backend or DiskCache(cache_dir='/tmp/diskcache')
         self.cache_expire = CACHE_EXPIRE
         self.cache_tag= 'ollama'
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+        self.host = host
+        self._cached_text2vec = self.cache_backend.memoize(typed=True, expire=self.cache_expire, tag=self.cache_tag)(ollama_cached_text2vec)
+        self._aclient: ollama.AsyncClient = None
+        self.coalescer = EmbeddingCoalescer(self.__aembed_batch,
+                                            batch_window=batch_window,
+                                            max_batch_size=batch_size,
+                                            max_concurrency=max_concurrency)
 
     def text2vec(self, text: str) -> Embedding:
         return self._cached_text2vec(text, self.model)
+
+    async def atext2vec(self, text: str) -> Embedding:
+        """Embed a text with the async client, coalesced and micro-batched with the concurrent calls"""
+        return await self.coalescer.embed(text)
+
+    async def atexts2vec(self, texts: list[str]) -> list[Embedding]:
+        return await self.coalescer.embed_many(texts)
+
+    @property
+    def aclient(self) -> ollama.AsyncClient:
+        if self._aclient is None:
+            self._aclient = ollama.AsyncClient(host=self.host)
+        return self._aclient
+
+    async def __aembed_batch(self, texts: list[str]) -> list[Embedding]:
+        """Embed unique texts, cached texts are not sent to Ollama"""
+        return await acached_texts2vec(texts,
+                                       self.__aembed,
+                                       cache_backend=self.cache_backend,
+                                       cached_func=ollama_cached_text2vec,
+                                       cache_args=(self.model,),
+                                       cache_tag=self.cache_tag,
+                                       cache_expire=self.cache_expire)
+
+    async def __aembed(self, texts: list[str]) -> list[Embedding]:
+        # one request per text, see ollama_texts2vec
+        responses = await asyncio.gather(*[self.aclient.embeddings(model=self.model, prompt=text) for text in texts])
+        return [response["embedding"] for response in responses]
     
     def texts2vec(self, texts: list[str]) -> list[Embedding]:
-        return [self.text2vec(text) for text in texts]
+        """Embed texts with batched requests, cached texts are not sent to Ollama"""
+        return cached_texts2vec(texts,
+                                lambda batch: ollama_texts2vec(batch, self.model),
+                                cache_backend=self.cache_backend,
+                                cached_func=ollama_cached_text2vec,
+                                cache_args=(self.model,),
+                                cache_tag=self.cache_tag,
+                                cache_expire=self.cache_expire,
+                                batch_size=self.batch_size,
+                                max_concurrency=self.max_concurrency)
 
-    @property
-    def _cached_text2vec(self):
-        return self.cache_backend.memoize(typed=True, expire=self.cache_expire, tag=self.cache_tag)(ollama_cached_text2vec)
 
 def ollama_cached_text2vec(text: str, model: str) -> list[float]:
     response = ollama.embeddings(model=model, prompt=text)
     embedding = response["embedding"]
-    return embedding
\ No newline at end of file
+    return embedding
+
+
+def ollama_texts2vec(texts: list[str], model: str) -> list[list[float]]:
+    # ollama.embed (batch) returns normalized vectors, unlike ollama.embeddings.
+    # Keep using ollama.embeddings so batched and single results share the cache.
+    return [ollama_cached_text2vec(text, model) for text in texts]
@@ -1,4 +1,5 @@
 from abc import ABC
+from functools import lru_cache
 import os
 import time
 from typing import cast
@@ -6,10 +7,11 @@ from diskcache import Cache
 from cel.cache import get_cache
 from .cache.base_cache import BaseCache
 from .cache.disk_cache import DiskCache
-from .utils import Embedding, Text2VectorProvider
+from .coalescing import EmbeddingCoalescer
+from .utils import Embedding, Text2VectorProvider, acached_texts2vec, cached_texts2vec
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, OpenAI
 except ImportError:
     raise ValueError(
         "The openai python package is not installed. Please install it with `pip install openai`"
@@ -35,15 +37,28 @@ class CachedOpenAIEmbedding(Text2VectorProvider):
         The maximum number of retries to make when the API call fails. Default is 5.
     cache_expire: int
         The cache expiration time in milliseconds. Default is 12 hours (43200000 ms).
+    batch_size: int
+        Max number of texts per embeddings request in texts2vec. Default is 100.
+    max_concurrency: int
+        Max number of embeddings requests in flight in texts2vec and atext2vec. Default is 4.
+    batch_window: float
+        Seconds atext2vec waits for more texts to embed them in a single request. Default is 0.005.
+
+    The async methods share one AsyncOpenAI client. Concurrent atext2vec calls for the
+    same text share a single request, and the texts requested within batch_window
+    (e.g. RAG lookups of many conversations) are sent in one embeddings request.
     """
     
-    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small", cache_backend: BaseCache = None, max_retries: int = 5, CACHE_EXPIRE: int = 43200000):
+    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small", cache_backend: BaseCache = None, max_retries: int = 5, CACHE_EXPIRE: int = 43200000,
+                 batch_size: int = 100, max_concurrency: int = 4, batch_window: float = 0.005):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
         self.cache_backend = cache_backend or DiskCache(cache_dir='/tmp/diskcache')
         self.max_retries = max_retries
         self.cache_expire = CACHE_EXPIRE
         self.cache_tag = 'openai_embedding'
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
 
         if self.api_key is not None:
             OpenAI.api_key = api_key
@@ -53,22 +68,80 @@ class CachedOpenAIEmbedding(Text2VectorProvider):
                 "Please provide an OpenAI API key. You can get one at https://platform.openai.com/account/api-keys"
             )
 
+        self._cached_text2vec = self.cache_backend.memoize(typed=True, expire=self.cache_expire, tag=self.cache_tag)(openai_cached_text2vec)
+        self._aclient: AsyncOpenAI = None
+        self.coalescer = EmbeddingCoalescer(self.__aembed_batch,
+                                            batch_window=batch_window,
+                                            max_batch_size=batch_size,
+                                            max_concurrency=max_concurrency)
+
     def text2vec(self, text: str) -> Embedding:
         return self._cached_text2vec(text, self.model, self.max_retries)
+
+    async def atext2vec(self, text: str) -> Embedding:
+        """Embed a text with the async client, coalesced and micro-batched with the concurrent calls"""
+        return await self.coalescer.embed(text)
+
+    async def atexts2vec(self, texts: list[str]) -> list[Embedding]:
+        return await self.coalescer.embed_many(texts)
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI(api_key=self.api_key, max_retries=self.max_retries)
+        return self._aclient
+
+    async def __aembed_batch(self, texts: list[str]) -> list[Embedding]:
+        """Embed unique texts, cached texts are not sent to the API"""
+        return await acached_texts2vec(texts,
+                                       self.__aembed,
+                                       cache_backend=self.cache_backend,
+                                       cached_func=openai_cached_text2vec,
+                                       cache_args=(self.model, self.max_retries),
+                                       cache_tag=self.cache_tag,
+                                       cache_expire=self.cache_expire)
+
+    async def __aembed(self, texts: list[str]) -> list[Embedding]:
+        # replace newlines, which can negatively affect performance.
+        response = await self.aclient.embeddings.create(input=[text.replace("\n", " ") for text in texts], model=self.model)
+        # keep the input order
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
     
     def texts2vec(self, texts: list[str]) -> list[Embedding]:
-        return [self.text2vec(text) for text in texts]
+        """Embed texts with batched requests, cached texts are not sent to the API"""
+        return cached_texts2vec(texts,
+                                lambda batch: openai_texts2vec(batch, self.model, self.max_retries),
+                                cache_backend=self.cache_backend,
+                                cached_func=openai_cached_text2vec,
+                                cache_args=(self.model, self.max_retries),
+                                cache_tag=self.cache_tag,
+                                cache_expire=self.cache_expire,
+                                batch_size=self.batch_size,
+                                max_concurrency=self.max_concurrency)
+
+@lru_cache(maxsize=None)
+def openai_client(max_retries: int = 3) -> OpenAI:
+    """Long-lived sync client shared by the embedding calls"""
+    return OpenAI(max_retries=max_retries)
 
-    @property
-    def _cached_text2vec(self):
-        return self.cache_backend.memoize(typed=True, expire=self.cache_expire, tag=self.cache_tag)(openai_cached_text2vec)
 
 def openai_cached_text2vec(text: str, model: str, max_retries: int = 3) -> list[float]:
-    client = OpenAI(max_retries=max_retries)
+    client = openai_client(max_retries)
 
     # replace newlines, which can negatively affect performance.
     text = text.replace("\n", " ")
 
     response = client.embeddings.create(input=[text], model=model)
     embeddings = response.data[0].embedding
-    return embeddings
\ No newline at end of file
+    return embeddings
+
+
+def openai_texts2vec(texts: list[str], model: str, max_retries: int = 3) -> list[list[float]]:
+    client = openai_client(max_retries)
+    
+    # replace newlines, which can negatively affect performance.
+    texts = [text.replace("\n", " ") for text in texts]
+    
+    response = client.embeddings.create(input=texts, model=model)
+    # keep the input order
+    return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Awaitable, Callable
+from loguru import logger as log
+from .utils import Embedding, Embeddings
+
+
+class EmbeddingCoalescer:
+    """Coalesce async embedding requests.
+
+    - Single-flight: concurrent requests for the same text share one future.
+    - Micro-batching: texts requested within batch_window seconds are embedded with a
+    single embed_batch call, up to max_batch_size texts per call and max_concurrency
+    calls in flight.
+
+    Used by the async text2vec of the embedding providers, so RAG lookups of many
+    conversations at once cost a few provider requests.
+
+    Args:
+        embed_batch (Callable): Async function embedding a list of unique texts, in order.
+        batch_window (float, optional): Seconds to wait for more texts before sending a batch. Defaults to 0.005.
+        max_batch_size (int, optional): Max number of texts per embed_batch call. Defaults to 64.
+        max_concurrency (int, optional): Max number of embed_batch calls in flight. Defaults to 4.
+    """
+
+    def __init__(self,
+                 embed_batch: Callable[[list[str]], Awaitable[Embeddings]],
+                 batch_window: float = 0.005,
+                 max_batch_size: int = 64,
+                 max_concurrency: int = 4):
+        assert max_batch_size > 0, "max_batch_size must be greater than 0"
+        assert max_concurrency > 0, "max_concurrency must be greater than 0"
+        self.embed_batch = embed_batch
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._pending: list[str] = []
+        self._flush_handle: asyncio.TimerHandle = None
+        self._semaphore: asyncio.Semaphore = None
+        self._tasks = set()
+        self._requests = 0
+        self._texts = 0
+        self._coalesced = 0
+
+    async def embed(self, text: str) -> Embedding:
+        fut = self._inflight.get(text)
+        if fut is not None:
+            self._coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            # avoid "exception never retrieved" when every waiter was cancelled
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[text] = fut
+            self._pending.append(text)
+            if len(self._pending) >= self.max_batch_size:
+                self.__flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self.__flush)
+        return await asyncio.shield(fut)
+
+    async def embed_many(self, texts: list[str]) -> Embeddings:
+        return list(await asyncio.gather(*[self.embed(text) for text in texts]))
+
+    def __flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self.__run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def __run(self, batch: list[str]):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            self._requests += 1
+            self._texts += len(batch)
+            try:
+                vectors = await self.embed_batch(batch)
+                assert len(vectors) == len(batch), "embed_batch must return one embedding per text"
+            except Exception as e:
+                log.error(f"EmbeddingCoalescer: embedding of {len(batch)} texts failed: {e}")
+                for text in batch:
+                    fut = self._inflight.pop(text, None)
+                    if fut and not fut.done():
+                        fut.set_exception(e)
+                return
+
+        for text, vector in zip(batch, vectors):
+            fut = self._inflight.pop(text, None)
+            if fut and not fut.done():
+                fut.set_result(vector)
+
+    def stats(self) -> dict:
+        """Coalescer metrics: provider requests, texts sent and requests served by an in-flight text"""
+        return {
+            "requests": self._requests,
+            "texts": self._texts,
+            "coalesced": self._coalesced,
+            "inflight": len(self._inflight)
+        }
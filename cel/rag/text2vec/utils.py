@@ -1,5 +1,7 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Sequence, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Sequence, Union
 import numpy as np
 
 
@@ -7,6 +9,16 @@ Embedding = Union[Sequence[float], Sequence[int]]
 Embeddings = Sequence[Embedding]
 
 
+def to_float_vector(vector) -> list[float]:
+    """Vectors read from string caches (e.g. RedisCache) come as '[n,n,n...]' or ['n','n'...]"""
+    ## if vector is a string '[n,n,n.....]', convert it to a list
+    if isinstance(vector, str):
+        vector = [float(i) for i in vector[1:-1].split(',')]
+    ## if vector is a list of strings ['n','n','n'.....], convert it to a list of floats
+    if isinstance(vector[0], str):
+        vector = [float(i) for i in vector] 
+    return vector
+
 
 class Text2VectorProvider(ABC):
 
@@ -16,4 +28,95 @@ class Text2VectorProvider(ABC):
 
     @abstractmethod
     def texts2vec(self, texts: list[str]) -> Embeddings:
-        pass
\ No newline at end of file
+        pass
+
+    async def atext2vec(self, text: str) -> Embedding:
+        """Async text2vec. By default the sync text2vec runs in the default thread pool,
+        providers with an async client should override it"""
+        return await asyncio.to_thread(self.text2vec, text)
+
+    async def atexts2vec(self, texts: list[str]) -> Embeddings:
+        """Async texts2vec, runs the sync texts2vec in the default thread pool"""
+        return await asyncio.to_thread(self.texts2vec, texts)
+
+
+def cached_texts2vec(texts: list[str],
+                     embed_batch: Callable[[list[str]], Embeddings],
+                     cache_backend=None,
+                     cached_func: Callable = None,
+                     cache_args: tuple = (),
+                     cache_tag: str = None,
+                     cache_expire: int = None,
+                     batch_size: int = 100,
+                     max_concurrency: int = 4) -> Embeddings:
+    """Embed texts in batches, reusing and filling the text2vec cache.
+    
+    Cache lookups for all the texts are done in bulk before any API call, with the same
+    keys used by the memoized single text2vec (cached_func(text, *cache_args)). Missing texts
+    are deduplicated, split in chunks of batch_size and sent to embed_batch with at most
+    max_concurrency requests in flight. If the cache backend has no bulk support, every
+    text is embedded and the cache is not used.
+    
+    Returns the embeddings in the same order as texts.
+    """
+    if not texts:
+        return []
+    
+    keys = None
+    cached = [None] * len(texts)
+    if cache_backend is not None and cached_func is not None:
+        try:
+            keys = [cache_backend.memoize_key(cached_func, True, cache_tag, text, *cache_args) for text in texts]
+            cached = cache_backend.get_many(keys)
+        except NotImplementedError:
+            keys = None
+    
+    missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    computed = {}
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as pool:
+            for batch, vectors in zip(batches, pool.map(embed_batch, batches)):
+                computed.update(zip(batch, vectors))
+    
+    if keys is not None and computed:
+        items = {key: computed[text] for key, text, v in zip(keys, texts, cached) if v is None}
+        cache_backend.set_many(items, expire=cache_expire, tag=cache_tag)
+    
+    # cached values read from string caches (RedisCache) are converted back to float vectors
+    return [to_float_vector(v) if v is not None else computed[t] for t, v in zip(texts, cached)]
+
+
+async def acached_texts2vec(texts: list[str],
+                            embed_batch: Callable[[list[str]], Awaitable[Embeddings]],
+                            cache_backend=None,
+                            cached_func: Callable = None,
+                            cache_args: tuple = (),
+                            cache_tag: str = None,
+                            cache_expire: int = None) -> Embeddings:
+    """Async version of cached_texts2vec for a single batch of texts.
+    
+    The bulk cache lookup and write run in the default thread pool (cache backends
+    are sync), the missing texts are deduplicated and sent in one embed_batch call.
+    Cached values read from string caches are converted back to float vectors.
+    """
+    if not texts:
+        return []
+    
+    keys = None
+    cached = [None] * len(texts)
+    if cache_backend is not None and cached_func is not None:
+        try:
+            keys = [cache_backend.memoize_key(cached_func, True, cache_tag, text, *cache_args) for text in texts]
+            cached = await asyncio.to_thread(cache_backend.get_many, keys)
+        except NotImplementedError:
+            keys = None
+    
+    missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+    computed = dict(zip(missing, await embed_batch(missing))) if missing else {}
+    
+    if keys is not None and computed:
+        items = {key: computed[text] for key, text, v in zip(keys, texts, cached) if v is None}
+        await asyncio.to_thread(cache_backend.set_many, items, expire=cache_expire, tag=cache_tag)
+    
+    return [to_float_vector(v) if v is not None else computed[t] for t, v in zip(texts, cached)]
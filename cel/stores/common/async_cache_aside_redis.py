@@ -91,7 +91,7 @@ class AsyncMemRedisCacheAside(KeyValueStore):
         if callback:
             data = await callback()
             if data is not None:
-                await self.set(k, data)
+                await self.set(key, data)
                 return data
 
         
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class BoundedSessionMap:
+    """In-process session map with LRU eviction, idle TTL and a global weight budget.
+
+    Sessions are kept in least recently used order. Every access moves the session to
+    the end, so idle sessions are always at the front: expired and least recently used
+    sessions are evicted from the front in amortized O(1).
+
+    Each session carries a weight (e.g. number of history entries or state keys) that
+    the owner updates with add_weight. When the total weight exceeds max_weight, the
+    least recently used sessions are evicted until it fits again.
+
+    All operations take a lock, so the map can be shared with worker threads.
+
+    Args:
+        max_sessions (int, optional): Max number of sessions. Defaults to 10000.
+        ttl (float, optional): Seconds a session is kept since its last access. Defaults to None (no expiry).
+        max_weight (int, optional): Max total weight across sessions. Defaults to None (no budget).
+        timer (Callable, optional): Clock used for the ttl. Defaults to time.monotonic.
+    """
+
+    def __init__(self,
+                 max_sessions: int = 10000,
+                 ttl: float = None,
+                 max_weight: int = None,
+                 timer: Callable[[], float] = time.monotonic):
+        assert max_sessions is None or max_sessions > 0, "max_sessions must be greater than 0"
+        assert ttl is None or ttl > 0, "ttl must be greater than 0"
+        assert max_weight is None or max_weight > 0, "max_weight must be greater than 0"
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.timer = timer
+        self._lock = threading.RLock()
+        # key -> [value, weight, expires_at]
+        self._items: OrderedDict[Hashable, list] = OrderedDict()
+        self._weight = 0
+        self._hits = 0
+        self._misses = 0
+        self._evicted_lru = 0
+        self._evicted_ttl = 0
+        self._evicted_budget = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Lock to hold while mutating a value in place"""
+        return self._lock
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the session value and mark it as recently used"""
+        with self._lock:
+            now = self.timer()
+            self.__purge_expired(now)
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            if item[2] is not None and item[2] <= now:
+                self.__remove(key)
+                self._evicted_ttl += 1
+                self._misses += 1
+                return default
+            self.__touch(key, item, now)
+            self._hits += 1
+            return item[0]
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any], ttl: float = None) -> Any:
+        """Return the session value, creating it with factory() if missing"""
+        with self._lock:
+            value = self.get(key)
+            if value is None:
+                value = factory()
+                self.set(key, value, ttl=ttl)
+            return value
+
+    def set(self, key: Hashable, value: Any, weight: int = 0, ttl: float = None):
+        """Set the session value and its weight.
+        ttl overrides the map ttl for this session, until the next set."""
+        with self._lock:
+            now = self.timer()
+            self.__purge_expired(now)
+            self.__remove(key)
+            ttl = ttl or self.ttl
+            self._items[key] = [value, weight, now + ttl if ttl else None]
+            self._weight += weight
+            self.__enforce(key)
+
+    def add_weight(self, key: Hashable, delta: int):
+        """Update the weight of a session after mutating its value in place"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return
+            item[1] += delta
+            self._weight += delta
+            self.__enforce(key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self.__remove(key)
+            return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._weight = 0
+
+    def purge_expired(self) -> int:
+        """Evict the expired sessions, returns the number of evicted sessions"""
+        with self._lock:
+            before = self._evicted_ttl
+            self.__purge_expired(self.timer())
+            return self._evicted_ttl - before
+
+    def stats(self) -> dict:
+        """Map metrics: size, weight, hits/misses and evictions by cause"""
+        with self._lock:
+            return {
+                "sessions": len(self._items),
+                "weight": self._weight,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evicted_lru": self._evicted_lru,
+                "evicted_ttl": self._evicted_ttl,
+                "evicted_budget": self._evicted_budget,
+                "max_sessions": self.max_sessions,
+                "max_weight": self.max_weight,
+                "ttl": self.ttl
+            }
+
+    def __touch(self, key, item, now):
+        self._items.move_to_end(key)
+        if self.ttl and item[2] is not None:
+            item[2] = max(item[2], now + self.ttl)
+
+    def __remove(self, key):
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._weight -= item[1]
+        return item
+
+    def __purge_expired(self, now):
+        if not self.ttl:
+            return
+        # Sessions are in access order, so the expired ones (idle ttl) are at the front.
+        # Sessions with a longer per-session ttl stop the scan and expire lazily on access.
+        while self._items:
+            key, item = next(iter(self._items.items()))
+            if item[2] is None or item[2] > now:
+                break
+            self.__remove(key)
+            self._evicted_ttl += 1
+
+    def __enforce(self, keep):
+        # Evict least recently used sessions, never the one being written
+        while self.max_sessions and len(self._items) > self.max_sessions:
+            if not self.__evict_lru(keep):
+                break
+            self._evicted_lru += 1
+        while self.max_weight and self._weight > self.max_weight:
+            if not self.__evict_lru(keep):
+                break
+            self._evicted_budget += 1
+
+    def __evict_lru(self, keep) -> bool:
+        for key in self._items:
+            if key != keep:
+                self.__remove(key)
+                return True
+        return False
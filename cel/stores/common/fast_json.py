@@ -0,0 +1,32 @@
+"""JSON encoding for store values, uses orjson when it is installed"""
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(value) -> str | bytes:
+    """Serialize value to JSON. Returns bytes with orjson, str otherwise.
+    Values orjson rejects (e.g. integers over 64 bits) are encoded with json"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(",", ":"))
+
+
+# integers of 19+ digits may not fit in 64 bits, orjson would decode them as floats
+_WIDE_INT = re.compile(r"\d{19,}")
+_WIDE_INT_BYTES = re.compile(rb"\d{19,}")
+
+
+def loads(data: str | bytes):
+    if orjson is not None:
+        wide = _WIDE_INT_BYTES if isinstance(data, (bytes, bytearray)) else _WIDE_INT
+        if not wide.search(data):
+            return orjson.loads(data)
+    return json.loads(data)
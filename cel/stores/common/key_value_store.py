@@ -28,7 +28,16 @@ class KeyValueStore(ABC):
 class ListStore(ABC):
     
     @abstractmethod
-    def list_append(self, key, value, ttl=None):
+    def list_append(self, key, value, ttl=None, max_length=None):
+        raise NotImplementedError()
+    
+    async def list_append_many(self, key, values: list, ttl=None, max_length=None):
+        """Append several values to the list, override it to do it in a single round-trip"""
+        for value in values:
+            await self.list_append(key, value, ttl, max_length)
+    
+    def list_trim(self, key, count: int):
+        """Keep only the last count values of the list"""
         raise NotImplementedError()
     
     @abstractmethod
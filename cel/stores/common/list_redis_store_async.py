@@ -1,4 +1,4 @@
-import json
+from cel.stores.common import fast_json
 from redis import asyncio as aioredis
 from cel.stores.common.key_value_store import ListStore
 
@@ -12,12 +12,43 @@ class ListRedisStoreAsync(ListStore):
         self.key_prefix = key_prefix
         self.ttl = ttl
 
-    async def list_append(self, key, entry, ttl=None):
+    async def list_append(self, key, entry, ttl=None, max_length=None):
         key = self.key_prefix + ":" + key
-        value = json.dumps(entry)
-        await self.redis_client.rpush(key, value)
-        if ttl:
-            await self.redis_client.expire(key, ttl)
+        value = fast_json.dumps(entry)
+        if not max_length:
+            await self.redis_client.rpush(key, value)
+            if ttl:
+                await self.redis_client.expire(key, ttl)
+            return
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, value)
+            pipe.ltrim(key, -max_length, -1)
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def list_append_many(self, key, entries: list, ttl=None, max_length=None):
+        """Append all entries with a single RPUSH (and EXPIRE) in a MULTI/EXEC pipeline.
+        If max_length is set, the list is capped to the last max_length entries (LTRIM)."""
+        if not entries:
+            return
+        key = self.key_prefix + ":" + key
+        values = [fast_json.dumps(entry) for entry in entries]
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *values)
+            if max_length:
+                pipe.ltrim(key, -max_length, -1)
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def list_trim(self, key, count: int):
+        """Keep only the last count entries"""
+        key = self.key_prefix + ":" + key
+        if count <= 0:
+            await self.redis_client.delete(key)
+        else:
+            await self.redis_client.ltrim(key, -count, -1)
 
     async def list_clear(self, key):
         key = self.key_prefix + ":" + key
@@ -27,10 +58,12 @@ class ListRedisStoreAsync(ListStore):
         key = self.key_prefix + ":" + key
         l = await self.redis_client.lrange(key, 0, -1)
         # decode
-        return [json.loads(v) for v in l]
+        return [fast_json.loads(v) for v in l]
 
     async def list_get_last(self, key, count: int):
+        if count <= 0:
+            return []
         key = self.key_prefix + ":" + key
         l = await self.redis_client.lrange(key, -count, -1)
         # decode
-        return [json.loads(v) for v in l]    
\ No newline at end of file
+        return [fast_json.loads(v) for v in l]    
\ No newline at end of file
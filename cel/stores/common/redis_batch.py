@@ -0,0 +1,180 @@
+import asyncio
+from contextvars import ContextVar
+from redis import asyncio as aioredis
+from loguru import logger as log
+
+
+_current: ContextVar["RedisBatch"] = ContextVar("cel_redis_batch", default=None)
+
+
+class RedisBatch:
+    """Per-message Redis batch shared by the middlewares.
+
+    The gateway opens a batch for each incoming message, asks the middlewares to register
+    the hash fields they are going to read (prefetch), loads all of them in one pipelined
+    round-trip per Redis client, runs the middlewares and flushes their writes in one
+    MULTI/EXEC pipeline per client at the end of the chain.
+
+    Reads see the writes queued in the same batch (read your writes), reads of fields
+    that were not prefetched go to Redis and are cached in the batch.
+
+    Middlewares use the module functions (hget, hset, hdel, delete): they use the active
+    batch if there is one, and call Redis directly otherwise, so middlewares keep working
+    outside the gateway. Both asyncio and sync Redis clients are supported, sync clients
+    run in a worker thread.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        # (client id, key, field) -> value, prefetched, read or written in this batch
+        self._values = {}
+        self._deleted = set()
+        self._prefetch = {}
+        self._writes = {}
+        self.closed = False
+        self.round_trips = 0
+
+    @staticmethod
+    def current() -> "RedisBatch":
+        """Return the batch of the message being processed, if any"""
+        batch = _current.get()
+        return batch if batch is not None and not batch.closed else None
+
+    def activate(self):
+        return _current.set(self)
+
+    def deactivate(self, token):
+        _current.reset(token)
+
+    def __client_id(self, client) -> int:
+        cid = id(client)
+        self._clients[cid] = client
+        return cid
+
+    def prefetch_hget(self, client, key: str, field: str):
+        """Register a hash field to be loaded by load()"""
+        cid = self.__client_id(client)
+        self._prefetch.setdefault(cid, set()).add((key, field))
+
+    async def load(self):
+        """Load the registered fields, one pipeline per client, concurrently"""
+        pending = {}
+        for cid, fields in self._prefetch.items():
+            fields = [f for f in fields if (cid, *f) not in self._values]
+            if fields:
+                pending[cid] = fields
+        self._prefetch = {}
+        if not pending:
+            return
+
+        async def load_client(cid, fields):
+            values = await self.__execute(self._clients[cid], [("hget", f) for f in fields])
+            for (key, field), value in zip(fields, values):
+                self._values[(cid, key, field)] = value
+
+        await asyncio.gather(*[load_client(cid, fields) for cid, fields in pending.items()])
+
+    async def hget(self, client, key: str, field: str):
+        cid = self.__client_id(client)
+        if (cid, key, field) in self._values:
+            return self._values[(cid, key, field)]
+        if (cid, key) in self._deleted:
+            return None
+        self.round_trips += 1
+        value = await call(client, "hget", key, field)
+        self._values[(cid, key, field)] = value
+        return value
+
+    def hset(self, client, key: str, field: str, value):
+        cid = self.__client_id(client)
+        self._values[(cid, key, field)] = value
+        self.__queue(cid, "hset", key, field, value)
+
+    def hdel(self, client, key: str, field: str):
+        cid = self.__client_id(client)
+        self._values[(cid, key, field)] = None
+        self.__queue(cid, "hdel", key, field)
+
+    def delete(self, client, key: str):
+        cid = self.__client_id(client)
+        self._values = {k: v for k, v in self._values.items() if k[:2] != (cid, key)}
+        self._deleted.add((cid, key))
+        self.__queue(cid, "delete", key)
+
+    def __queue(self, cid: int, name: str, *args):
+        self._writes.setdefault(cid, []).append((name, args))
+
+    async def flush(self):
+        """Write the queued commands, one MULTI/EXEC pipeline per client, and close the batch.
+        If a pipeline fails its commands are sent one by one, errors of these are raised"""
+        self.closed = True
+        writes, self._writes = self._writes, {}
+
+        async def flush_client(cid, ops):
+            client = self._clients[cid]
+            try:
+                await self.__execute(client, ops, transaction=True)
+                return
+            except Exception as e:
+                log.error(f"RedisBatch: error flushing {len(ops)} commands: {e}, sending them one by one")
+            # hset, hdel and delete can be replayed if the transaction was applied
+            for name, args in ops:
+                self.round_trips += 1
+                await call(client, name, *args)
+
+        await asyncio.gather(*[flush_client(cid, ops) for cid, ops in writes.items()])
+
+    async def __execute(self, client, ops: list, transaction: bool = False) -> list:
+        self.round_trips += 1
+        return await execute(client, ops, transaction)
+
+
+async def execute(client, ops: list, transaction: bool = False) -> list:
+    """Run [(command, args), ...] in a single pipeline on an asyncio or sync Redis client"""
+    if isinstance(client, aioredis.Redis):
+        async with client.pipeline(transaction=transaction) as pipe:
+            for name, args in ops:
+                getattr(pipe, name)(*args)
+            return await pipe.execute()
+
+    def run():
+        with client.pipeline(transaction=transaction) as pipe:
+            for name, args in ops:
+                getattr(pipe, name)(*args)
+            return pipe.execute()
+    return await asyncio.to_thread(run)
+
+
+async def call(client, name: str, *args):
+    """Run a single command on an asyncio or sync Redis client"""
+    if isinstance(client, aioredis.Redis):
+        return await getattr(client, name)(*args)
+    return await asyncio.to_thread(getattr(client, name), *args)
+
+
+async def hget(client, key: str, field: str):
+    batch = RedisBatch.current()
+    if batch:
+        return await batch.hget(client, key, field)
+    return await call(client, "hget", key, field)
+
+
+async def hset(client, key: str, field: str, value):
+    batch = RedisBatch.current()
+    if batch:
+        return batch.hset(client, key, field, value)
+    return await call(client, "hset", key, field, value)
+
+
+async def hdel(client, key: str, field: str):
+    batch = RedisBatch.current()
+    if batch:
+        return batch.hdel(client, key, field)
+    return await call(client, "hdel", key, field)
+
+
+async def delete(client, key: str):
+    batch = RedisBatch.current()
+    if batch:
+        return batch.delete(client, key)
+    return await call(client, "delete", key)
@@ -6,6 +6,12 @@ class BaseHistoryProvider(ABC):
     async def append_to_history(self, sessionId, entry, metadata=None, ttl=None):
         raise NotImplementedError
 
+    async def append_many(self, sessionId, entries: list, metadata=None, ttl=None):
+        """Append several entries to the session history at once.
+        Providers should override it to store the batch atomically in a single round-trip."""
+        for entry in entries:
+            await self.append_to_history(sessionId, entry, metadata, ttl)
+
     @abstractmethod
     async def get_history(self, sessionId) -> list:
         raise NotImplementedError
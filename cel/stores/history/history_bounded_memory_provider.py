@@ -0,0 +1,104 @@
+from collections import deque
+from itertools import islice
+from loguru import logger as log
+from cel.stores.common.bounded_session_map import BoundedSessionMap
+from cel.stores.history.base_history_provider import BaseHistoryProvider
+
+
+class BoundedInMemoryHistoryProvider(BaseHistoryProvider):
+    """In-process history provider with bounded memory, for high volume ephemeral sessions
+    (CLI, VAPI test traffic, load tests).
+
+    Each session history is a ring buffer (deque) of the entries as they were appended,
+    entries are not serialized, so reads do not parse anything and the last messages
+    are read in O(count). Entries are stored by reference, do not mutate them.
+
+    Idle sessions are evicted after ttl seconds, and the least recently used sessions are
+    evicted when there are more than max_sessions sessions or more than max_total_entries
+    entries across all sessions. Use stats() to monitor size and evictions.
+
+    Args:
+        key_prefix (str, optional): Prefix for the keys. Defaults to "h".
+        max_length (int, optional): Max number of entries kept per session. Defaults to 100.
+        max_sessions (int, optional): Max number of sessions kept. Defaults to 10000.
+        ttl (float, optional): Seconds a session is kept since its last access. Defaults to 3600.
+        max_total_entries (int, optional): Global budget of entries across sessions. Defaults to None.
+    """
+
+    def __init__(self,
+                 key_prefix: str = "h",
+                 max_length: int = 100,
+                 max_sessions: int = 10000,
+                 ttl: float = 3600,
+                 max_total_entries: int = None):
+        assert max_length is None or max_length > 0, "max_length must be greater than 0"
+        log.debug(f"Create: BoundedInMemoryHistoryProvider")
+        self.key_prefix = key_prefix
+        self.max_length = max_length
+        self.sessions = BoundedSessionMap(max_sessions=max_sessions,
+                                          ttl=ttl,
+                                          max_weight=max_total_entries)
+
+    def get_key(self, sessionId: str):
+        return f"{self.key_prefix}:{sessionId}"
+
+    async def append_to_history(self, sessionId: str, entry, metadata=None, ttl=None):
+        self.__extend(sessionId, (entry,), ttl)
+
+    async def append_many(self, sessionId: str, entries: list, metadata=None, ttl=None):
+        self.__extend(sessionId, entries, ttl)
+
+    def __extend(self, sessionId: str, entries, ttl=None):
+        key = self.get_key(sessionId)
+        with self.sessions.lock:
+            history = self.sessions.get_or_create(key, lambda: deque(maxlen=self.max_length), ttl=ttl)
+            size = len(history)
+            history.extend(entries)
+            self.sessions.add_weight(key, len(history) - size)
+
+    async def get_history(self, sessionId: str):
+        history = self.sessions.get(self.get_key(sessionId))
+        if history is None:
+            return []
+        with self.sessions.lock:
+            # remove None elements
+            return [h for h in history if h]
+
+    async def get_history_slice(self, sessionId: str, start, end):
+        history = self.sessions.get(self.get_key(sessionId))
+        if history is None:
+            return []
+        with self.sessions.lock:
+            return list(history)[start:end]
+
+    async def get_last_messages(self, sessionId: str, count):
+        if count <= 0:
+            return []
+        history = self.sessions.get(self.get_key(sessionId))
+        if history is None:
+            return []
+        with self.sessions.lock:
+            res = list(islice(reversed(history), count))
+        res.reverse()
+        return res
+
+    async def clear_history(self, sessionId: str, keep_last_messages=None):
+        key = self.get_key(sessionId)
+        if not keep_last_messages:
+            self.sessions.pop(key)
+            return
+        history = self.sessions.get(key)
+        if history is None:
+            return
+        with self.sessions.lock:
+            size = len(history)
+            while len(history) > keep_last_messages:
+                history.popleft()
+            self.sessions.add_weight(key, len(history) - size)
+
+    async def close_conversation(self, sessionId: str):
+        raise NotImplementedError("Method not implemented.")
+
+    def stats(self) -> dict:
+        """Store metrics: sessions, total entries (weight), hits/misses and evictions"""
+        return {**self.sessions.stats(), "max_length": self.max_length}
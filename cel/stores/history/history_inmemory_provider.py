@@ -5,9 +5,10 @@ from cel.stores.history.base_history_provider import BaseHistoryProvider
 
 class InMemoryHistoryProvider(BaseHistoryProvider):
 
-    def __init__(self, key_prefix: str = "h"):
+    def __init__(self, key_prefix: str = "h", max_length: int = None):
         self.store = {}
         self.key_prefix = key_prefix
+        self.max_length = max_length
         log.warning(f"Create: InMemoryHistoryProvider - Avoid using this in production.")
 
     def get_key(self, sessionId: str):
@@ -19,6 +20,16 @@ class InMemoryHistoryProvider(BaseHistoryProvider):
         if key not in self.store:
             self.store[key] = []
         self.store[key].append(value)
+        self.__trim(key)
+
+    async def append_many(self, sessionId: str, entries: list, metadata=None, ttl=None):
+        key = self.get_key(sessionId)
+        self.store.setdefault(key, []).extend(json.dumps(e) for e in entries)
+        self.__trim(key)
+
+    def __trim(self, key: str):
+        if self.max_length and len(self.store[key]) > self.max_length:
+            del self.store[key][:-self.max_length]
 
     async def get_history(self, sessionId: str):
         key = self.get_key(sessionId)
@@ -43,6 +54,8 @@ class InMemoryHistoryProvider(BaseHistoryProvider):
 
     async def get_last_messages(self, sessionId: str, count):
         key = self.get_key(sessionId)
+        if count <= 0:
+            return []
         history = self.store.get(key, [])[-count:]
         return [json.loads(h) for h in history]
 
@@ -4,33 +4,46 @@ from cel.stores.history.base_history_provider import BaseHistoryProvider
 
 
 
+def _decode(value):
+    # Entries written before the store encoded them only once were json strings
+    # wrapped by the list store, decode them the old way
+    return json.loads(value) if isinstance(value, str) else value
+
+
 class RedisHistoryProviderAsync(BaseHistoryProvider):
 
-    def __init__(self, store: ListStore, key_prefix: str = "h", ttl=None):
+    def __init__(self, store: ListStore, key_prefix: str = "h", ttl=None, max_length=None):
         """ Create a new RedisHistoryProviderAsync instance.
         :param store: Redis store
         :param key_prefix: Prefix for the keys
         :param ttl: Time to live in seconds for history. If None, it will never expire
+        :param max_length: Max number of entries kept per session, older entries are 
+        trimmed on append (LTRIM). If None, history is never trimmed
         """
         
         print(f"Create: RedisHistoryProviderAsync")
         self.store = store
         self.key_prefix = key_prefix
         self.ttl = ttl
+        self.max_length = max_length
 
     def get_key(self, sessionId: str):
         return f"{self.key_prefix}:{sessionId}"
 
     async def append_to_history(self, sessionId: str, entry, metadata=None, ttl=None):
         key = self.get_key(sessionId)
-        value = json.dumps(entry)
-        await self.store.list_append(key, value, self.ttl or ttl)
+        # Entries are encoded once, by the list store
+        await self.store.list_append(key, entry, self.ttl or ttl, self.max_length)
+
+    async def append_many(self, sessionId: str, entries: list, metadata=None, ttl=None):
+        key = self.get_key(sessionId)
+        await self.store.list_append_many(key, entries, self.ttl or ttl, self.max_length)
 
 
     async def get_history(self, sessionId: str):
         key = self.get_key(sessionId)
         values = await self.store.list_get(key)
-        res = [json.loads(v) for v in values]
+        res = [_decode(v) for v in values]
         # remove None elements
         res = [r for r in res if r]
         return res
@@ -40,12 +53,7 @@ class RedisHistoryProviderAsync(BaseHistoryProvider):
         key = self.get_key(sessionId)
 
         if keep_last_messages:
-            # self.client.ltrim(key, 0, keep_last_messages)
-            msgs = await self.store.list_get_last(key, keep_last_messages)
-            await self.store.list_clear(key)
-            for msg in msgs:
-                await self.store.list_append(key, msg)
-                
+            await self.store.list_trim(key, keep_last_messages)
         else:
             await self.store.list_clear(key)
 
@@ -54,7 +62,7 @@ class RedisHistoryProviderAsync(BaseHistoryProvider):
         key = self.get_key(sessionId)
         # history = self.client.lrange(key, -count, -1)
         history = await self.store.list_get_last(key, count)
-        return [json.loads(h) for h in history]
+        return [_decode(h) for h in history]
 
     async def close_conversation(self, sessionId: str):
         raise NotImplementedError("Method not implemented.")
@@ -0,0 +1,70 @@
+from loguru import logger as log
+from cel.stores.common.bounded_session_map import BoundedSessionMap
+from cel.stores.state.base_state_provider import BaseChatStateProvider
+
+
+class BoundedInMemoryStateProvider(BaseChatStateProvider):
+    """In-process chat state provider with bounded memory, for high volume ephemeral
+    sessions (CLI, VAPI test traffic, load tests).
+
+    Idle sessions are evicted after ttl seconds, and the least recently used sessions
+    are evicted when there are more than max_sessions sessions or more than
+    max_total_keys state keys across all sessions. Use stats() to monitor size and evictions.
+
+    Like InMemoryStateProvider, get_store returns the stored dict (not a copy).
+
+    Args:
+        key_prefix (str, optional): Prefix for the keys. Defaults to "s".
+        max_sessions (int, optional): Max number of sessions kept. Defaults to 10000.
+        ttl (float, optional): Seconds a session is kept since its last access. Defaults to 3600.
+        max_total_keys (int, optional): Global budget of state keys across sessions. Defaults to None.
+    """
+
+    def __init__(self,
+                 key_prefix: str = "s",
+                 max_sessions: int = 10000,
+                 ttl: float = 3600,
+                 max_total_keys: int = None):
+        super().__init__()
+        log.debug(f"Create: BoundedInMemoryStateProvider")
+        self.prefix = key_prefix
+        self.sessions = BoundedSessionMap(max_sessions=max_sessions,
+                                          ttl=ttl,
+                                          max_weight=max_total_keys)
+
+    def get_key(self, sessionId):
+        return f"{self.prefix}:{sessionId}"
+
+    async def set_key_value(self, sessionId: str, key: str, value, ttl_in_seconds=None):
+        hash_key = self.get_key(sessionId)
+        with self.sessions.lock:
+            store = self.sessions.get_or_create(hash_key, dict, ttl=ttl_in_seconds)
+            size = len(store)
+            store[key] = value
+            self.sessions.add_weight(hash_key, len(store) - size)
+
+    async def get_key_value(self, sessionId: str, key: str):
+        store = self.sessions.get(self.get_key(sessionId))
+        if store is None:
+            return None
+        return store.get(key)
+
+    async def clear_store(self, sessionId: str):
+        self.sessions.pop(self.get_key(sessionId))
+
+    async def clear_all_stores(self):
+        self.sessions.clear()
+
+    async def get_store(self, sessionId: str):
+        return self.sessions.get(self.get_key(sessionId))
+
+    async def set_store(self, sessionId: str, store, ttl=None):
+        hash_key = self.get_key(sessionId)
+        if store is None:
+            self.sessions.pop(hash_key)
+            return
+        self.sessions.set(hash_key, store, weight=len(store), ttl=ttl)
+
+    def stats(self) -> dict:
+        """Store metrics: sessions, total keys (weight), hits/misses and evictions"""
+        return self.sessions.stats()
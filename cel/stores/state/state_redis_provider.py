@@ -4,6 +4,8 @@ from loguru import logger as log
 from cel.stores.state.base_state_provider import BaseChatStateProvider
 
 class RedisChatStateProvider(BaseChatStateProvider):
+    """Redis chat state provider based on the sync Redis client. 
+    Calls block the event loop, prefer RedisChatStateProviderAsync."""
 
     def __init__(self, redis: str | Redis, key_prefix: str = "s"):
         super().__init__()
@@ -0,0 +1,106 @@
+import copy
+from redis import asyncio as aioredis
+from loguru import logger as log
+from cel.stores.common import fast_json
+from cel.stores.common.async_cache_aside_redis import AsyncMemRedisCacheAside
+from cel.stores.state.base_state_provider import BaseChatStateProvider
+
+Redis = aioredis.Redis
+
+
+class RedisChatStateProviderAsync(BaseChatStateProvider):
+    """Redis chat state provider based on the asyncio Redis client.
+
+    Each session state is stored in a Redis hash. The whole state is written with a
+    single multi-field HSET in a MULTI/EXEC pipeline, and clear_all_stores deletes
+    keys in batches with SCAN + UNLINK instead of KEYS.
+
+    Args:
+        redis (str | Redis): Redis url or asyncio Redis client.
+        key_prefix (str, optional): Prefix for the keys. Defaults to "s".
+        cache (AsyncMemRedisCacheAside, optional): Read-through cache for get_store. State
+        reads are served from memory until the cache ttl expires. Writes through this provider
+        update the cache, but writes from other instances are only seen after the ttl,
+        so keep the cache ttl short when running several instances. Defaults to None.
+        scan_batch_size (int, optional): Keys per SCAN/UNLINK batch. Defaults to 500.
+    """
+
+    def __init__(self,
+                 redis: str | Redis,
+                 key_prefix: str = "s",
+                 cache: AsyncMemRedisCacheAside = None,
+                 scan_batch_size: int = 500):
+        super().__init__()
+        log.debug("Create: RedisChatStateProviderAsync")
+        self.client = redis if isinstance(redis, Redis) else aioredis.from_url(redis)
+        self.prefix = key_prefix
+        self.cache = cache
+        self.scan_batch_size = scan_batch_size
+
+    def get_key(self, sessionId):
+        return f"{self.prefix}:{sessionId}"
+
+    async def set_key_value(self, sessionId: str, key: str, value, ttl_in_seconds=None):
+        hash_key = self.get_key(sessionId)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(hash_key, key, fast_json.dumps(value))
+            if ttl_in_seconds:
+                pipe.expire(hash_key, ttl_in_seconds)
+            await pipe.execute()
+        if self.cache:
+            await self.cache.delete_deep(sessionId)
+
+    async def get_key_value(self, sessionId: str, key: str):
+        hash_key = self.get_key(sessionId)
+        value = await self.client.hget(hash_key, key)
+        if not value:
+            return None
+        return fast_json.loads(value)
+
+    async def clear_store(self, sessionId: str):
+        hash_key = self.get_key(sessionId)
+        await self.client.unlink(hash_key)
+        if self.cache:
+            await self.cache.delete_deep(sessionId)
+
+    async def clear_all_stores(self):
+        batch = []
+        async for key in self.client.scan_iter(match=self.get_key("*"), count=self.scan_batch_size):
+            batch.append(key)
+            if len(batch) >= self.scan_batch_size:
+                await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            await self.client.unlink(*batch)
+        if self.cache:
+            await self.cache.clear_deep()
+
+    async def get_store(self, sessionId: str):
+        if self.cache:
+            # callers mutate the returned state, never hand out the cached object
+            store = await self.cache.get(sessionId, lambda: self.__load_store(sessionId))
+            return copy.deepcopy(store)
+        return await self.__load_store(sessionId)
+
+    async def set_store(self, sessionId: str, store, ttl=None):
+        """Replace the session state with store, atomically"""
+        hash_key = self.get_key(sessionId)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(hash_key)
+            if store:
+                pipe.hset(hash_key, mapping={k: fast_json.dumps(v) for k, v in store.items()})
+                if ttl:
+                    pipe.expire(hash_key, ttl)
+            await pipe.execute()
+        if self.cache:
+            if store:
+                await self.cache.set(sessionId, copy.deepcopy(store))
+            else:
+                await self.cache.delete_deep(sessionId)
+
+    async def __load_store(self, sessionId: str):
+        hash_key = self.get_key(sessionId)
+        store = await self.client.hgetall(hash_key)
+        if not store:
+            return None
+        return {k.decode('utf-8'): fast_json.loads(v) for k, v in store.items()}
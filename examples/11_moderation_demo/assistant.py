@@ -61,9 +61,6 @@ from cel.assistants.request_context import RequestContext
 # mod = Llama3GuardModerationMiddleware(
 #     # Allow accumulation of flags expiring
 #     # enable_expiration=True,
-#     # Prunning interval in seconds, each 5 seconds 
-#     # the middleware will check for expired flags
-#     # prunning_interval=5,
 #     # Expire after 5 seconds
 #     # expire_after=5
 # )
@@ -73,9 +70,8 @@ from cel.assistants.request_context import RequestContext
 mod = OpenAIEndpointModerationMiddleware(
     # Allow accumulation of flags expiring
     # enable_expiration=True,
-    # Prunning interval in seconds, each 5 seconds
-    # the middleware will check for expired flags
-    # prunning_interval=5,
+    # Share the flags between gateway workers
+    # flag_counter=RedisFlagCounter("redis://localhost:6379/0", expire_after=5),
     # Expire after 5 seconds
     # expire_after=5
 )
@@ -34,7 +34,7 @@ from cel.assistants.macaw.macaw_settings import MacawSettings
 from cel.assistants.request_context import RequestContext
 from cel.stores.common.list_redis_store_async import ListRedisStoreAsync
 from cel.stores.history.history_redis_provider_async import RedisHistoryProviderAsync
-from cel.stores.state.state_redis_provider import RedisChatStateProvider
+from cel.stores.state.state_redis_provider_async import RedisChatStateProviderAsync
 load_dotenv()
 
 
@@ -85,7 +85,7 @@ prompt_template = PromptTemplate(prompt, initial_state={
 
 
 
-state_store = RedisChatStateProvider(redis="redis://localhost:6379/0")
+state_store = RedisChatStateProviderAsync(redis="redis://localhost:6379/0")
 histoy_store = RedisHistoryProviderAsync(ListRedisStoreAsync(redis="redis://localhost:6379/0"))
 
 ast = MacawAssistant(
@@ -3,7 +3,7 @@ from cel.assistants.macaw.macaw_history_adapter import MacawHistoryAdapter
 from cel.assistants.macaw.macaw_utils import map_function_to_tool_message
 from cel.gateway.model.conversation_lead import ConversationLead
 from cel.stores.history.history_inmemory_provider import InMemoryHistoryProvider
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 
 @pytest.mark.asyncio
 async def test_macaw_history_store_adapter():
@@ -17,4 +17,40 @@ async def test_macaw_history_store_adapter():
     history = await adapter.get_history(lead)
     assert len(history) == 2
     assert isinstance(history[0], HumanMessage), "Expected HumanMessage"
-    assert isinstance(history[1], AIMessage), "Expected AIMessage"
\ No newline at end of file
+    assert isinstance(history[1], AIMessage), "Expected AIMessage"
+
+@pytest.mark.asyncio
+async def test_macaw_history_store_adapter_append_many():
+    adapter = MacawHistoryAdapter(store=InMemoryHistoryProvider())
+    
+    lead = ConversationLead()
+    await adapter.append_to_history(lead, HumanMessage("Hello"))
+    await adapter.append_many(lead, [AIMessage("Hi"), HumanMessage("Bye")])
+    
+    history = await adapter.get_history(lead)
+    assert [m.content for m in history] == ["Hello", "Hi", "Bye"]
+    assert isinstance(history[1], AIMessage), "Expected AIMessage"
+
+
+@pytest.mark.asyncio
+async def test_macaw_history_window_keeps_tool_calls():
+    adapter = MacawHistoryAdapter(store=InMemoryHistoryProvider())
+    
+    lead = ConversationLead()
+    tool_calls = [{"name": "f", "args": {}, "id": f"call_{i}"} for i in range(3)]
+    await adapter.append_many(lead, [
+        HumanMessage("Hello"),
+        AIMessage("", tool_calls=tool_calls),
+        *[ToolMessage("ok", tool_call_id=f"call_{i}") for i in range(3)],
+    ])
+    
+    # tail starts with ToolMessages, the read is extended to the AI tool call
+    window = await adapter.get_history_window(lead, 2)
+    assert [m.type for m in window] == ["ai", "tool", "tool", "tool"]
+    
+    # group does not fit in max_count, orphan ToolMessages are dropped
+    window = await adapter.get_history_window(lead, 2, max_count=2)
+    assert window == []
+    
+    window = await adapter.get_history_window(lead, 10)
+    assert len(window) == 5
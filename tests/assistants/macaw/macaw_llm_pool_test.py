@@ -0,0 +1,51 @@
+from cel.assistants.common import Param
+from cel.assistants.macaw.macaw_assistant import MacawAssistant
+from cel.assistants.macaw.macaw_llm_pool import MacawLLMPool
+
+
+class FakeLLM:
+    created = 0
+
+    def __init__(self, **kwargs):
+        FakeLLM.created += 1
+        self.kwargs = kwargs
+        self.tools = None
+
+    def bind_tools(self, tools):
+        bound = FakeLLM(**self.kwargs)
+        bound.tools = tools
+        return bound
+
+
+def test_llm_pool_reuses_clients():
+    pool = MacawLLMPool()
+    a = pool.get_llm(FakeLLM, {"model": "gpt-4o", "temperature": 0})
+    b = pool.get_llm(FakeLLM, {"temperature": 0, "model": "gpt-4o"})
+    c = pool.get_llm(FakeLLM, {"model": "gpt-4o-mini", "temperature": 0})
+    assert a is b
+    assert a is not c
+
+
+def test_llm_pool_tools_invalidation():
+    ast = MacawAssistant()
+
+    @ast.function('get_price', 'Get price', params=[Param(name='crypto', type='string', description='crypto')])
+    def get_price(session, params):
+        return "1"
+
+    settings = {"model": "gpt-4o"}
+    key1 = ast.get_functions_key()
+    r1 = ast.llm_pool.get_llm_with_tools(FakeLLM, settings, ast.get_functions(), key1)
+    r2 = ast.llm_pool.get_llm_with_tools(FakeLLM, settings, ast.get_functions(), key1)
+    assert r1 is r2
+    assert len(r1.tools) == 1
+
+    @ast.function('get_balance', 'Get balance', params=[])
+    def get_balance(session, params):
+        return "2"
+
+    key2 = ast.get_functions_key()
+    assert key1 != key2
+    r3 = ast.llm_pool.get_llm_with_tools(FakeLLM, settings, ast.get_functions(), key2)
+    assert r3 is not r1
+    assert len(r3.tools) == 2
@@ -0,0 +1,71 @@
+import json
+import pytest
+import fakeredis.aioredis
+from langchain_core.load import dumpd
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, ToolMessage
+from cel.assistants.macaw.macaw_history_adapter import MacawHistoryAdapter
+from cel.assistants.macaw.macaw_message_codec import decode_message, encode_message, is_tool_message
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.stores.common.list_redis_store_async import ListRedisStoreAsync
+from cel.stores.history.history_redis_provider_async import RedisHistoryProviderAsync
+
+
+tool_calls = [{"name": "get_price", "args": {"crypto": "BTC"}, "id": "call_1", "type": "tool_call"}]
+messages = [
+    SystemMessage("You are a helpful assistant."),
+    HumanMessage("BTC price?"),
+    AIMessage("", tool_calls=tool_calls),
+    ToolMessage("1000", tool_call_id="call_1"),
+    ToolMessage("boom", tool_call_id="call_2", status="error"),
+    AIMessage("BTC is 1000"),
+]
+
+
+def test_encode_decode_roundtrip():
+    for msg in messages:
+        entry = encode_message(msg)
+        assert entry["v"] == 1
+        # must survive a json roundtrip
+        decoded = decode_message(json.loads(json.dumps(entry)))
+        assert decoded.type == msg.type
+        assert decoded.content == msg.content
+        
+    assert decode_message(encode_message(messages[2])).tool_calls == tool_calls
+    assert decode_message(encode_message(messages[4])).status == "error"
+    assert [is_tool_message(encode_message(m)) for m in messages] == [False, False, False, True, True, False]
+
+
+def test_encode_chunk():
+    chunk = AIMessageChunk(content="Hi", tool_call_chunks=[
+        {"name": "get_price", "args": '{"crypto": "BTC"}', "id": "call_1", "index": 0}
+    ])
+    decoded = decode_message(encode_message(chunk))
+    assert isinstance(decoded, AIMessage)
+    assert decoded.tool_calls == tool_calls
+
+
+def test_decode_legacy_and_unknown_version():
+    for msg in messages:
+        entry = dumpd(msg)
+        assert decode_message(entry).content == msg.content
+        assert is_tool_message(entry) == (msg.type == "tool")
+    
+    with pytest.raises(ValueError):
+        decode_message({"v": 99, "t": "human", "c": "Hi"})
+
+
+@pytest.mark.asyncio
+async def test_read_legacy_redis_history():
+    redis = fakeredis.aioredis.FakeRedis()
+    provider = RedisHistoryProviderAsync(ListRedisStoreAsync(redis, key_prefix='h'))
+    adapter = MacawHistoryAdapter(provider)
+    lead = ConversationLead()
+    
+    # legacy entries: dumpd, json encoded by the provider and again by the list store
+    key = f"h:h:{lead.get_session_id()}"
+    await redis.rpush(key, *[json.dumps(json.dumps(dumpd(m))) for m in messages[1:3]])
+    await adapter.append_many(lead, messages[3:])
+    
+    history = await adapter.get_history(lead)
+    assert [m.type for m in history] == ["human", "ai", "tool", "tool", "ai"]
+    assert history[1].tool_calls == tool_calls
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import pytest
+from langchain_core.messages import AIMessageChunk, ToolMessage
+from cel.assistants.common import FunctionDefinition, Param
+from cel.assistants.function_response import FunctionResponse
+from cel.assistants.macaw.macaw_history_adapter import MacawHistoryAdapter
+from cel.assistants.macaw.macaw_inference_context import MacawNlpInferenceContext
+from cel.assistants.macaw.macaw_nlp import process_new_message
+from cel.assistants.macaw.macaw_settings import MacawSettings
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.prompt.prompt_template import PromptTemplate
+from cel.stores.history.history_inmemory_provider import InMemoryHistoryProvider
+from cel.stores.state.state_inmemory_provider import InMemoryStateProvider
+
+
+class FakeToolsLLM:
+    """First turn asks for two tool calls, second turn streams the answer"""
+
+    def __init__(self, **kwargs):
+        self.turn = 0
+
+    def bind_tools(self, tools):
+        return self
+
+    async def astream(self, messages):
+        self.turn += 1
+        if self.turn == 1:
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "get_price", "args": json.dumps({"crypto": "BTC"}), "id": "call_1", "index": 0},
+                {"name": "get_price", "args": json.dumps({"crypto": "ETH"}), "id": "call_2", "index": 1},
+            ])
+            return
+        for token in ["BTC is 1, ", "ETH is 2."]:
+            yield AIMessageChunk(content=token)
+
+
+func = FunctionDefinition(
+    name='get_price',
+    description='Get the current price of a cryptocurrency.',
+    parameters=[Param(name='crypto', type='string', description='The cryptocurrency')]
+)
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently_and_stream():
+    llm = FakeToolsLLM()
+    ctx = MacawNlpInferenceContext(
+        lead=ConversationLead(),
+        prompt=PromptTemplate("You are a helpful assistant."),
+        functions=[func],
+        history_store=InMemoryHistoryProvider(),
+        state_store=InMemoryStateProvider(),
+        settings=MacawSettings(core_max_parallel_function_calls=2),
+        llm=lambda **kwargs: llm
+    )
+
+    running = 0
+    max_running = 0
+
+    async def on_function_call(ctx, call):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return FunctionResponse(text="1" if call.args["crypto"] == "BTC" else "2")
+
+    chunks = [c.content async for c in process_new_message(ctx, "Prices?", on_function_call)]
+
+    assert max_running == 2
+    assert [c for c in chunks if c] == ["BTC is 1, ", "ETH is 2."]
+
+    history = await MacawHistoryAdapter(ctx.history_store).get_history(ctx.lead)
+    assert [m.type for m in history] == ["human", "ai", "tool", "tool", "ai"]
+    assert isinstance(history[2], ToolMessage) and history[2].tool_call_id == "call_1"
+    assert history[3].tool_call_id == "call_2"
+
+
+class EmptyFollowUpLLM(FakeToolsLLM):
+    """First turn asks for a tool call, the follow-up stream yields no chunk"""
+
+    async def astream(self, messages):
+        self.turn += 1
+        if self.turn == 1:
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "get_price", "args": json.dumps({"crypto": "BTC"}), "id": "call_1", "index": 0},
+            ])
+
+
+@pytest.mark.asyncio
+async def test_empty_follow_up_response():
+    llm = EmptyFollowUpLLM()
+    ctx = MacawNlpInferenceContext(
+        lead=ConversationLead(),
+        prompt=PromptTemplate("You are a helpful assistant."),
+        functions=[func],
+        history_store=InMemoryHistoryProvider(),
+        state_store=InMemoryStateProvider(),
+        settings=MacawSettings(),
+        llm=lambda **kwargs: llm
+    )
+
+    async def on_function_call(ctx, call):
+        return FunctionResponse(text="1")
+
+    chunks = [c.content async for c in process_new_message(ctx, "Price?", on_function_call)]
+    assert not any(chunks)
+    history = await MacawHistoryAdapter(ctx.history_store).get_history(ctx.lead)
+    assert [m.type for m in history] == ["human", "ai", "tool"]
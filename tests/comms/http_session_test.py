@@ -0,0 +1,21 @@
+import pytest
+from cel.comms.http_session import HttpSessionPool
+
+
+@pytest.mark.asyncio
+async def test_session_is_shared():
+    http = HttpSessionPool(limit=10, limit_per_host=2)
+    assert http.closed
+    
+    session = http.session()
+    assert http.session() is session
+    assert session.connector.limit == 10
+    assert session.connector.limit_per_host == 2
+    
+    await http.close()
+    assert http.closed
+    assert session.closed
+    
+    # reopened on next use
+    assert http.session() is not session
+    await http.close()
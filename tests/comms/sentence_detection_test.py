@@ -0,0 +1,46 @@
+import pysbd
+import pytest
+from cel.assistants.stream_content_chunk import StreamContentChunk
+from cel.comms.sentense_detection import StreamingSentenceSegmenter, streaming_sentence_detector_async
+
+
+TEXTS = [
+    "Hello world. How are you?",
+    "Dr. Smith is here. He said hi! OK? yes",
+    "Values 3.14 and e.g. this. Next one.\nNew line here",
+    'He said "Stop." Then left. ',
+    "List:\n1. one\n2. two",
+    "Wait... what? Yes.",
+    "A. B. C. Ok",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("use_pysbd", [False, True])
+def test_parity_with_pysbd(text, use_pysbd):
+    expected = pysbd.Segmenter(language="en", clean=False).segment(text)
+
+    seg = StreamingSentenceSegmenter(use_pysbd=use_pysbd)
+    sentences = []
+    for i in range(0, len(text), 3):
+        sentences.extend(seg.push(text[i:i + 3]))
+    sentences.append(seg.flush())
+
+    assert sentences == expected
+
+
+def test_push_many_sentences_at_once():
+    seg = StreamingSentenceSegmenter()
+    assert seg.push("One. Two. Three") == ["One. ", "Two. "]
+    assert seg.buffer == "Three"
+    assert seg.flush() == "Three"
+
+
+@pytest.mark.asyncio
+async def test_streaming_sentence_detector_async():
+    async def stream():
+        for token in ["Hel", "lo. ", "How ", "are ", "you?"]:
+            yield StreamContentChunk(content=token, is_partial=True)
+
+    sentences = [s.content async for s in streaming_sentence_detector_async(stream())]
+    assert sentences == ["Hello. ", "How are you?"]
@@ -0,0 +1,113 @@
+import asyncio
+import base64
+import hashlib
+import os
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cel.comms.http_session import HttpSessionPool
+from cel.connectors.whatsapp.model import media_client
+from cel.connectors.whatsapp.model.media_client import WhatsappMediaClient
+
+
+CONTENT = os.urandom(200 * 1024)
+SHA256 = base64.b64encode(hashlib.sha256(CONTENT).digest()).decode()
+
+
+@pytest_asyncio.fixture()
+async def server(monkeypatch):
+    calls = {"url": 0, "download": 0, "upload": 0}
+
+    async def media_url(request):
+        calls["url"] += 1
+        await asyncio.sleep(0.01)
+        return web.json_response({"url": str(request.url.with_path("/download/media"))})
+
+    async def download(request):
+        calls["download"] += 1
+        assert request.headers["Authorization"] == "Bearer token"
+        return web.Response(body=CONTENT, content_type="image/jpeg")
+
+    async def upload(request):
+        calls["upload"] += 1
+        form = await request.post()
+        assert form["file"].file.read() == CONTENT
+        return web.json_response({"id": "uploaded"})
+
+    async def slow_download(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for i in range(0, len(CONTENT), 50 * 1024):
+            await asyncio.sleep(0.1)
+            await response.write(CONTENT[i:i + 50 * 1024])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/download/slow", slow_download)
+    app.router.add_get("/download/media", download)
+    app.router.add_get("/{media_id}", media_url)
+    app.router.add_post("/phone/media", upload)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(media_client, "BASE_URL", str(server.make_url("")).rstrip("/"))
+    server.calls = calls
+    yield server
+    await server.close()
+
+
+@pytest_asyncio.fixture()
+async def client(tmp_path):
+    client = WhatsappMediaClient("token", "phone", chunk_size=16 * 1024, download_dir=str(tmp_path))
+    yield client
+    await client.http.close()
+
+
+@pytest.mark.asyncio
+async def test_query_media_url_cached(server, client):
+    urls = await asyncio.gather(*[client.query_media_url("123") for _ in range(5)])
+    assert len(set(urls)) == 1
+    await client.query_media_url("123")
+    assert server.calls["url"] == 1
+
+
+@pytest.mark.asyncio
+async def test_download_dedup_by_sha256(server, client):
+    paths = await asyncio.gather(*[client.download_media("123", "image/jpeg", SHA256) for _ in range(3)])
+    assert len(set(paths)) == 1
+    assert paths[0].endswith(".jpg")
+    with open(paths[0], "rb") as f:
+        assert f.read() == CONTENT
+    
+    # same media, new id: served from the downloaded file
+    assert await client.download_media("456", "image/jpeg", SHA256) == paths[0]
+    assert server.calls["download"] == 1
+
+
+@pytest.mark.asyncio
+async def test_download_checks_sha256(server, client):
+    assert await client.download_media("123", "image/jpeg", "bad-hash") is None
+    assert os.listdir(client.download_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_spool_and_upload(server, client):
+    url = await client.query_media_url("123")
+    with await client.download_to_spool(url, SHA256) as spool:
+        assert spool.read() == CONTENT
+        spool.seek(0)
+        res = await client.upload_media(spool, mime_type="image/jpeg", filename="image.jpg")
+    assert res == {"id": "uploaded"}
+
+
+@pytest.mark.asyncio
+async def test_transfers_are_not_bound_by_the_pool_timeout(server, tmp_path):
+    # the download takes longer than the pool total timeout, each read is fast
+    client = WhatsappMediaClient("token", "phone", http=HttpSessionPool(timeout=0.2), download_dir=str(tmp_path))
+    try:
+        spool = await client.download_to_spool(str(server.make_url("/download/slow")))
+        with spool:
+            assert spool.read() == CONTENT
+    finally:
+        await client.http.close()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import pytest
+from cel.gateway.middleware_runner import plan_middlewares, run_middlewares_concurrently
+
+
+class FakeMiddleware:
+    def __init__(self, name, reads=None, writes=None, parallel_safe=True, delay=0.05, result=True, log=None):
+        self.name = name
+        self.parallel_safe = parallel_safe
+        self.reads = reads
+        self.writes = writes
+        self.delay = delay
+        self.result = result
+        self.log = log if log is not None else []
+
+    async def __call__(self):
+        self.log.append(f"start:{self.name}")
+        await asyncio.sleep(self.delay)
+        self.log.append(f"end:{self.name}")
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def call(middleware):
+    return middleware()
+
+
+def test_plan():
+    stt = FakeMiddleware("stt", reads={"attachments"}, writes={"text"})
+    blacklist = FakeMiddleware("blacklist", reads={"lead"}, writes=set())
+    moderation = FakeMiddleware("moderation", reads={"text"}, writes={"metadata.moderation"})
+    session = FakeMiddleware("session", reads={"text"}, writes={"metadata.time_since_last_request"})
+    reader = FakeMiddleware("reader", reads={"metadata"}, writes=set())
+    legacy = FakeMiddleware("legacy", parallel_safe=False)
+    after = FakeMiddleware("after", reads={"lead"}, writes=set())
+
+    plan = plan_middlewares([stt, blacklist, moderation, session, reader, legacy, after])
+    assert plan == [
+        [],
+        [],
+        [0],
+        [0],
+        [2, 3],
+        [0, 1, 2, 3, 4],
+        [5],
+    ]
+
+
+def test_plan_session_middleware_after_moderation():
+    from cel.middlewares.session_middleware import SessionMiddleware
+    moderation = FakeMiddleware("moderation", reads={"text"}, writes={"metadata.moderation"})
+    # SessionMiddleware persists the whole metadata, it must see the moderation result
+    assert plan_middlewares([moderation, SessionMiddleware]) == [[], [0]]
+
+
+@pytest.mark.asyncio
+async def test_independent_middlewares_run_concurrently():
+    middlewares = [FakeMiddleware(f"m{i}", reads={"lead"}, writes=set(), delay=0.1) for i in range(4)]
+    start = time.perf_counter()
+    accepted, rejected_by = await run_middlewares_concurrently(middlewares, call)
+    elapsed = time.perf_counter() - start
+    assert accepted and rejected_by is None
+    assert elapsed < 0.3
+
+
+@pytest.mark.asyncio
+async def test_dependencies_keep_order():
+    log = []
+    stt = FakeMiddleware("stt", reads={"attachments"}, writes={"text"}, log=log)
+    moderation = FakeMiddleware("moderation", reads={"text"}, writes={"metadata.moderation"}, log=log)
+    accepted, _ = await run_middlewares_concurrently([stt, moderation], call)
+    assert accepted
+    assert log == ["start:stt", "end:stt", "start:moderation", "end:moderation"]
+
+
+@pytest.mark.asyncio
+async def test_reject_short_circuits():
+    log = []
+    slow = FakeMiddleware("slow", reads={"lead"}, writes=set(), delay=1, log=log)
+    blacklist = FakeMiddleware("blacklist", reads={"lead"}, writes=set(), delay=0.01, result=False, log=log)
+    dependent = FakeMiddleware("dependent", reads={"text"}, writes={"text"}, parallel_safe=False, log=log)
+    start = time.perf_counter()
+    accepted, rejected_by = await run_middlewares_concurrently([slow, blacklist, dependent], call)
+    assert not accepted
+    assert rejected_by is blacklist
+    assert time.perf_counter() - start < 0.5
+    await asyncio.sleep(0)
+    assert "end:slow" not in log
+    assert "start:dependent" not in log
+
+
+@pytest.mark.asyncio
+async def test_exception_rejects():
+    failing = FakeMiddleware("failing", reads={"lead"}, writes=set(), result=ValueError("boom"))
+    accepted, rejected_by = await run_middlewares_concurrently([failing], call)
+    assert not accepted
+    assert rejected_by is failing
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from cel.gateway.session_scheduler import SessionScheduler
+
+
+@pytest.mark.asyncio
+async def test_fifo_per_session():
+    scheduler = SessionScheduler(max_concurrent_sessions=4)
+    processed = []
+
+    def handler(i):
+        async def run():
+            # older messages take longer, order must be preserved anyway
+            await asyncio.sleep(0.01 * (5 - i))
+            processed.append(i)
+        return run
+
+    tasks = [await scheduler.submit("session", handler(i)) for i in range(5)]
+    await asyncio.gather(*tasks)
+
+    assert processed == [0, 1, 2, 3, 4]
+    assert scheduler.stats()["processed"] == 5
+    assert scheduler.queue_depth("session") == 0
+
+
+@pytest.mark.asyncio
+async def test_max_concurrent_sessions():
+    scheduler = SessionScheduler(max_concurrent_sessions=2)
+    running = 0
+    max_running = 0
+
+    async def handler():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    tasks = [await scheduler.submit(f"session-{i}", handler) for i in range(6)]
+    await asyncio.gather(*tasks)
+
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_backpressure():
+    scheduler = SessionScheduler(max_concurrent_sessions=1, max_pending_messages=2)
+    release = asyncio.Event()
+
+    async def handler():
+        await release.wait()
+
+    await scheduler.submit("a", handler)
+    await scheduler.submit("b", handler)
+    await asyncio.sleep(0.01)
+    assert scheduler.stats()["pending"] == 2
+    assert scheduler.stats()["queued"] == 1
+
+    # scheduler is full, submit must wait until a message is done
+    blocked = asyncio.create_task(scheduler.submit("c", handler))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    task = await asyncio.wait_for(blocked, timeout=1)
+    await task
+    assert scheduler.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_message_does_not_block_session():
+    scheduler = SessionScheduler()
+    processed = []
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def ok():
+        processed.append("ok")
+
+    await scheduler.submit("session", fail)
+    task = await scheduler.submit("session", ok)
+    await task
+
+    assert processed == ["ok"]
+    assert scheduler.stats()["failed"] == 1
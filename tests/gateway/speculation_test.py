@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from langchain_core.messages import AIMessageChunk
+from cel.assistants.macaw.macaw_history_adapter import MacawHistoryAdapter
+from cel.assistants.macaw.macaw_inference_context import MacawNlpInferenceContext
+from cel.assistants.macaw.macaw_nlp import process_new_message
+from cel.assistants.macaw.macaw_settings import MacawSettings
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.gateway.speculation import Speculation, SpeculationGate, SpeculativeStream, wait_for_commit
+from cel.prompt.prompt_template import PromptTemplate
+from cel.stores.history.history_inmemory_provider import InMemoryHistoryProvider
+from cel.stores.state.state_inmemory_provider import InMemoryStateProvider
+
+
+class FakeLLM:
+    def bind_tools(self, tools):
+        return self
+
+    async def astream(self, messages):
+        for token in ["Hello ", "world."]:
+            yield AIMessageChunk(content=token)
+
+
+def build_ctx():
+    return MacawNlpInferenceContext(
+        lead=ConversationLead(),
+        prompt=PromptTemplate("You are a helpful assistant."),
+        history_store=InMemoryHistoryProvider(),
+        state_store=InMemoryStateProvider(),
+        settings=MacawSettings(),
+        llm=lambda **kwargs: FakeLLM()
+    )
+
+
+def speculate(stream) -> tuple[SpeculationGate, SpeculativeStream]:
+    gate = SpeculationGate()
+    token = gate.activate()
+    try:
+        return gate, SpeculativeStream(stream)
+    finally:
+        gate.deactivate(token)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_commit_without_gate():
+    assert await wait_for_commit()
+
+
+@pytest.mark.asyncio
+async def test_released_response_is_replayed_and_stored():
+    ctx = build_ctx()
+    gate, stream = speculate(process_new_message(ctx, "Hi"))
+    # the response is generated while the middlewares run, history waits for the verdict
+    await asyncio.sleep(0.05)
+    assert await ctx.history_store.get_history(ctx.lead.get_session_id()) == []
+
+    gate.release()
+    chunks = [c.content async for c in stream]
+    assert "".join(chunks) == "Hello world."
+    history = await MacawHistoryAdapter(ctx.history_store).get_history(ctx.lead)
+    assert [m.type for m in history] == ["human", "ai"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_response_is_not_stored():
+    ctx = build_ctx()
+    gate, stream = speculate(process_new_message(ctx, "Hi"))
+    await asyncio.sleep(0.05)
+    gate.reject()
+    await stream.aclose()
+    assert await ctx.history_store.get_history(ctx.lead.get_session_id()) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_errors_are_raised_on_replay():
+    async def failing():
+        yield 1
+        raise ValueError("boom")
+
+    _, stream = speculate(failing())
+    assert await stream.__anext__() == 1
+    with pytest.raises(ValueError):
+        await stream.__anext__()
+
+
+async def verdict(result: bool, delay: float = 0.05):
+    await asyncio.sleep(delay)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_speculation_rejected_by_advisory_middlewares():
+    ctx = build_ctx()
+    speculation = Speculation(asyncio.create_task(verdict(False)), process_new_message(ctx, "Hi"))
+    assert not await speculation.accepted()
+    assert speculation.gate.decided and not speculation.committed
+    assert await ctx.history_store.get_history(ctx.lead.get_session_id()) == []
+
+
+@pytest.mark.asyncio
+async def test_speculation_cancelled_after_acceptance():
+    # accepted by the advisory middlewares, but the AI response is disabled by an event
+    ctx = build_ctx()
+    speculation = Speculation(asyncio.create_task(verdict(True)), process_new_message(ctx, "Hi"))
+    assert await speculation.accepted()
+    await speculation.cancel()
+    assert not await speculation.gate.wait()
+    assert await ctx.history_store.get_history(ctx.lead.get_session_id()) == []
+
+
+@pytest.mark.asyncio
+async def test_speculation_commit():
+    ctx = build_ctx()
+    speculation = Speculation(asyncio.create_task(verdict(True)), process_new_message(ctx, "Hi"))
+    assert await speculation.accepted()
+    stream = speculation.commit()
+    # cancel after commit keeps the response
+    await speculation.cancel()
+    assert "".join([c.content async for c in stream]) == "Hello world."
+
+
+@pytest.mark.asyncio
+async def test_speculation_without_stream_waits_for_the_verdict():
+    speculation = Speculation(asyncio.create_task(verdict(True)))
+    assert speculation.stream is None
+    assert await speculation.accepted()
+    await speculation.cancel()
@@ -0,0 +1,69 @@
+import fakeredis
+import pytest
+from cel.middlewares.moderation.flag_counter import InMemoryFlagCounter, RedisFlagCounter
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_in_memory_counter_expires():
+    timer = FakeTimer()
+    flags = InMemoryFlagCounter(expire_after=10, timer=timer)
+    assert await flags.incr("s1") == 1
+    timer.now += 5
+    assert await flags.incr("s1") == 2
+    assert await flags.incr("s2") == 1
+    assert (await flags.get("s1")).count == 2
+
+    # the window starts with the first flag
+    timer.now += 6
+    assert await flags.get("s1") is None
+    assert (await flags.get("s2")).count == 1
+    assert await flags.incr("s1") == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_counter_reset():
+    timer = FakeTimer()
+    flags = InMemoryFlagCounter(expire_after=10, timer=timer)
+    await flags.incr("s1")
+    await flags.reset("s1")
+    assert await flags.get("s1") is None
+    timer.now += 5
+    await flags.incr("s1")
+    # the heap item of the reset entry must not expire the new one
+    timer.now += 6
+    assert (await flags.get("s1")).count == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_counter_without_expiration():
+    flags = InMemoryFlagCounter()
+    for _ in range(3):
+        await flags.incr("s1")
+    assert (await flags.get("s1")).count == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_counter():
+    client = fakeredis.aioredis.FakeRedis()
+    flags = RedisFlagCounter(client, expire_after=60)
+    # shared between instances (gateway workers)
+    other = RedisFlagCounter(client, expire_after=60)
+    assert await flags.incr("s1") == 1
+    assert await other.incr("s1") == 2
+    entry = await flags.get("s1")
+    assert entry.count == 2 and entry.updated_at > 0
+    assert 0 < await client.ttl("modflags:s1") <= 60
+    # later flags do not extend the window
+    await client.expire("modflags:s1", 10)
+    await flags.incr("s1")
+    assert await client.ttl("modflags:s1") <= 10
+    await other.reset("s1")
+    assert await flags.get("s1") is None
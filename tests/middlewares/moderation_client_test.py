@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from cel.middlewares.moderation.moderation_client import AsyncModerationClient, moderation_key
+from cel.middlewares.moderation.openai_mod_endpoint import OpenAIModerationClient
+
+
+class FakeModerations:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, input, **kwargs):
+        self.calls.append(list(input))
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(results=[SimpleNamespace(flagged="kill" in t, text=t) for t in input])
+
+
+@pytest.fixture
+def client():
+    fake = SimpleNamespace(moderations=FakeModerations())
+    return OpenAIModerationClient(client=fake, batch_window=0.02)
+
+
+def test_moderation_key_normalizes():
+    assert moderation_key("  Hi\n there ") == moderation_key("hi there")
+    assert moderation_key("hi") != moderation_key("ho")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_texts_are_batched(client):
+    results = await asyncio.gather(*[client.moderate(t) for t in ["hi", "ok", "I will kill you"]])
+    assert [r.flagged for r in results] == [False, False, True]
+    assert client.client.moderations.calls == [["hi", "ok", "I will kill you"]]
+
+
+@pytest.mark.asyncio
+async def test_verdicts_are_cached_and_coalesced(client):
+    await asyncio.gather(client.moderate("hi"), client.moderate("Hi "), client.moderate("hi"))
+    await client.moderate("HI")
+    assert client.client.moderations.calls == [["hi"]]
+    stats = client.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size(client):
+    client.max_batch_size = 2
+    await asyncio.gather(*[client.moderate(f"text {i}") for i in range(5)])
+    assert [len(c) for c in client.client.moderations.calls] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    class FailingClient(AsyncModerationClient):
+        calls = 0
+
+        async def moderate_batch(self, texts):
+            self.calls += 1
+            raise ValueError("provider down")
+
+    client = FailingClient()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await client.moderate("hi")
+    assert client.calls == 2
@@ -89,13 +89,13 @@ async def test_expiration_flags():
     assert await middleware(message, None, assistant) == True
     assert assistant.count == 1
     
-    flags = middleware.get_user_flags(lead.get_session_id())
+    flags = await middleware.get_user_flags(lead.get_session_id())
     assert flags.count == 1
     
     # wait for 3 seconds
     await asyncio.sleep(3)
     
-    flags = middleware.get_user_flags(lead.get_session_id())
+    flags = await middleware.get_user_flags(lead.get_session_id())
     assert flags is None
 
 
@@ -118,10 +118,10 @@ async def test_reset_flags():
     assert await middleware(message, None, assistant) == True
     assert assistant.count == 1
     
-    flags = middleware.get_user_flags(lead.get_session_id())
+    flags = await middleware.get_user_flags(lead.get_session_id())
     assert flags.count == 1
     
-    middleware.reset_user_flags(lead.get_session_id())
+    await middleware.reset_user_flags(lead.get_session_id())
     
-    flags = middleware.get_user_flags(lead.get_session_id())
+    flags = await middleware.get_user_flags(lead.get_session_id())
     assert flags is None
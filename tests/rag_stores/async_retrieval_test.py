@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+import pytest
+from langchain_core.messages import AIMessageChunk
+from cel.assistants.macaw.macaw_inference_context import MacawNlpInferenceContext
+from cel.assistants.macaw.macaw_nlp import process_new_message
+from cel.assistants.macaw.macaw_settings import MacawSettings
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.prompt.prompt_template import PromptTemplate
+from cel.rag.providers.rag_retriever import RAGRetriever
+from cel.rag.stores.vector_store import VectorRegister
+from cel.rag.text2vec.utils import Text2VectorProvider
+from cel.stores.history.history_inmemory_provider import InMemoryHistoryProvider
+from cel.stores.state.state_inmemory_provider import InMemoryStateProvider
+
+
+class BlockingText2Vec(Text2VectorProvider):
+    def __init__(self):
+        self.threads = set()
+
+    def text2vec(self, text):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.1)
+        return [float(len(text))]
+
+    def texts2vec(self, texts):
+        return [self.text2vec(t) for t in texts]
+
+
+class BlockingRetriever(RAGRetriever):
+    def __init__(self):
+        self.calls = []
+
+    def search(self, query, top_k=1, history=None, state={}):
+        time.sleep(0.1)
+        self.calls.append((query, top_k, [m.content for m in history or []]))
+        return [VectorRegister(id="1", vector=None, text="Pineapples are yellow.", metadata={})]
+
+
+class SlowStateProvider(InMemoryStateProvider):
+    async def get_store(self, session_id):
+        await asyncio.sleep(0.1)
+        return await super().get_store(session_id)
+
+
+class FakeLLM:
+    def __init__(self):
+        self.messages = None
+
+    def bind_tools(self, tools):
+        return self
+
+    async def astream(self, messages):
+        self.messages = messages
+        yield AIMessageChunk(content="Hi!")
+
+
+@pytest.mark.asyncio
+async def test_atext2vec_runs_in_thread_pool():
+    provider = BlockingText2Vec()
+    start = time.perf_counter()
+    res = await asyncio.gather(*[provider.atext2vec(t) for t in ["a", "bb", "ccc"]])
+    assert res == [[1.0], [2.0], [3.0]]
+    assert threading.get_ident() not in provider.threads
+    assert time.perf_counter() - start < 0.25
+
+
+@pytest.mark.asyncio
+async def test_retrieval_overlaps_state_and_prompt():
+    retriever = BlockingRetriever()
+    llm = FakeLLM()
+    ctx = MacawNlpInferenceContext(
+        lead=ConversationLead(),
+        prompt=PromptTemplate("You are a helpful assistant."),
+        history_store=InMemoryHistoryProvider(),
+        state_store=SlowStateProvider(),
+        settings=MacawSettings(),
+        rag_retriever=retriever,
+        llm=lambda **kwargs: llm
+    )
+    start = time.perf_counter()
+    chunks = [c async for c in process_new_message(ctx, "Hello")]
+    elapsed = time.perf_counter() - start
+
+    assert chunks
+    assert retriever.calls == [("Hello", ctx.settings.core_rag_knn, ["Hello"])]
+    assert elapsed < 0.18
+    # the retrieved passage reaches the model in the system message
+    assert llm.messages[0].type == "system"
+    assert "Pineapples are yellow." in llm.messages[0].content
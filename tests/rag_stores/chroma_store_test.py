@@ -26,4 +26,28 @@ def client():
 def test_do2(client: CachedOpenAIEmbedding):
     # test with texts
     res = client.texts2vec(texts)
-    assert len(res) == len(texts)
\ No newline at end of file
+    assert len(res) == len(texts)
+
+class LengthText2Vec:
+    def text2vec(self, text):
+        return [float(len(text)), 1.0]
+
+    async def atext2vec(self, text):
+        return self.text2vec(text)
+
+
+def test_search_projection():
+    from cel.rag.stores.chroma.chroma_store import ChromaStore
+    
+    store = ChromaStore(LengthText2Vec(), collection_name="projection-test")
+    store.upsert_many(["a", "b"], [[5.0, 1.0], [50.0, 1.0]], ["short", "long"], [{"k": 1}, {"k": 2}])
+    
+    res = store.search("12345", top_k=1)
+    assert res[0].id == "a"
+    assert res[0].text == "short" and res[0].metadata == {"k": 1}
+    assert res[0].distance is not None
+    assert res[0].vector is None
+    
+    res = store.search("12345", top_k=1, include=["vector"])
+    assert list(res[0].vector) == [5.0, 1.0]
+    assert res[0].text is None
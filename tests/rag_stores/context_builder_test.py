@@ -0,0 +1,50 @@
+from cel.rag.context_builder import build_rag_context, select_passages
+from cel.rag.stores.chroma.chroma_store import VectorRegisterResult
+from cel.rag.stores.vector_store import VectorRegister
+
+
+def result(id, text, distance):
+    return VectorRegisterResult(id=id, vector=None, text=text, metadata={}, distance=distance)
+
+
+def test_ordered_by_distance_with_cutoff():
+    results = [
+        result("a", "Oranges are orange.", 0.4),
+        result("b", "Pineapples are yellow.", 0.1),
+        result("c", "Dogs bark.", 1.5),
+    ]
+    selected = select_passages(results, max_distance=1.0)
+    assert [vr.id for vr in selected] == ["b", "a"]
+
+
+def test_dedupe_overlapping_slices():
+    results = [
+        result("section", "## Fruits\nPineapples are yellow.\nOranges are orange.", 0.2),
+        result("row", "Pineapples  are yellow.", 0.3),
+        result("section-copy", "## Fruits\nPineapples are yellow.\nOranges are orange.", 0.25),
+        result("other", "Lemons are sour.", 0.5),
+    ]
+    assert [vr.id for vr in select_passages(results)] == ["section", "other"]
+
+
+def test_token_budget_skips_passages_that_do_not_fit():
+    results = [
+        result("long", "x" * 400, 0.1),
+        result("short", "Lemons are sour.", 0.2),
+    ]
+    selected = select_passages(results, max_tokens=50)
+    assert [vr.id for vr in selected] == ["short"]
+
+
+def test_registers_without_distance_keep_order():
+    results = [
+        VectorRegister(id="1", vector=None, text="first", metadata={}),
+        VectorRegister(id="2", vector=None, text="second", metadata={}),
+    ]
+    assert build_rag_context(results, header="Context:") == "Context:\nfirst\n\nsecond"
+
+
+def test_empty_context():
+    assert build_rag_context([]) == ""
+    assert build_rag_context(None) == ""
+    assert build_rag_context([result("a", "far", 2.0)], max_distance=1.0) == ""
@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from cel.rag.ingest import RateLimiter, aingest, collect_documents
+from cel.rag.stores.numpy.numpy_store import NumpyStore
+from cel.rag.text2vec.utils import Text2VectorProvider
+
+
+class FakeText2Vec(Text2VectorProvider):
+    model = "fake"
+
+    def __init__(self, fail_on: str = None, fail_times: int = 0):
+        self.embedded = []
+        self.fail_on = fail_on
+        self.fail_times = fail_times
+
+    def text2vec(self, text):
+        return [float(len(text)), float(text.count(" ")), 1.0]
+
+    def texts2vec(self, texts):
+        return [self.text2vec(t) for t in texts]
+
+    async def atexts2vec(self, texts):
+        if self.fail_on and any(self.fail_on in t for t in texts) and self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("embeddings unavailable")
+        self.embedded.extend(texts)
+        return self.texts2vec(texts)
+
+
+def write_docs(root, docs: dict):
+    for name, content in docs.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+DOCS = {
+    "billing.md": "# Billing\n\nInvoices are sent monthly.\n\n## Refunds\n\nRefunds take 5 days.\n",
+    "guides/setup.md": "# Setup\n\nInstall the app.\n\n# Login\n\nUse your email.\n",
+    "guides/faq.markdown": "# FAQ\n\nAsk support.\n",
+    "notes.txt": "not markdown",
+}
+
+
+def run(root, text2vec, **kwargs):
+    store = NumpyStore(text2vec, collection_name="kb", path=root / "store")
+    stats = asyncio.run(aingest([str(root / "docs")], store, text2vec,
+                                manifest_path=root / "store" / "manifest.json",
+                                batch_size=2, workers=2, retry_delay=0.01, **kwargs))
+    return stats, store
+
+
+def test_collect_documents(tmp_path):
+    write_docs(tmp_path / "docs", DOCS)
+    keys = sorted(key for _, key in collect_documents([str(tmp_path / "docs")]))
+    assert keys == ["billing", "guides/faq", "guides/setup"]
+    keys = sorted(key for _, key in collect_documents([str(tmp_path / "docs" / "**" / "*.md")]))
+    assert keys == ["billing", "guides/setup"]
+
+
+def test_ingest_and_resume(tmp_path):
+    write_docs(tmp_path / "docs", DOCS)
+    text2vec = FakeText2Vec()
+    stats, store = run(tmp_path, text2vec)
+    assert stats.completed_documents == 3
+    assert stats.embedded_slices == len(store) == 5
+    assert stats.slices_per_sec > 0
+    assert store.search("Refunds take 5 days")[0].metadata["source"] == "billing"
+
+    # unchanged documents are not sliced into embeddings again
+    text2vec = FakeText2Vec()
+    stats, _ = run(tmp_path, text2vec)
+    assert stats.skipped_documents == 3
+    assert text2vec.embedded == []
+
+    # only the changed slice of a changed document is embedded
+    write_docs(tmp_path / "docs", {"billing.md": DOCS["billing.md"].replace("5 days", "10 days")})
+    text2vec = FakeText2Vec()
+    stats, store = run(tmp_path, text2vec)
+    assert stats.completed_documents == 1 and stats.skipped_documents == 2
+    assert text2vec.embedded == ["Billing > Refunds\nRefunds take 10 days."]
+    assert len(store) == 5
+
+
+def test_failed_document_is_retried_on_next_run(tmp_path):
+    write_docs(tmp_path / "docs", DOCS)
+    stats, store = run(tmp_path, FakeText2Vec(fail_on="Ask support", fail_times=10), max_retries=1)
+    # the documents sharing the failed batch fail too
+    failed = stats.failed_documents
+    assert failed >= 1
+    assert stats.completed_documents == 3 - failed
+    stored = len(store)
+
+    text2vec = FakeText2Vec()
+    stats, store = run(tmp_path, text2vec)
+    assert stats.completed_documents == failed and stats.skipped_documents == 3 - failed
+    # slices stored before the failure are not embedded again
+    assert "FAQ\nAsk support." in text2vec.embedded
+    assert len(text2vec.embedded) == 5 - stored
+    assert len(store) == 5
+
+
+def test_transient_errors_are_retried(tmp_path):
+    write_docs(tmp_path / "docs", DOCS)
+    stats, store = run(tmp_path, FakeText2Vec(fail_on="Ask support", fail_times=1))
+    assert stats.failed_documents == 0
+    assert stats.retries == 1
+    assert len(store) == 5
+
+
+def test_prune_removed_documents(tmp_path):
+    write_docs(tmp_path / "docs", DOCS)
+    run(tmp_path, FakeText2Vec())
+    (tmp_path / "docs" / "billing.md").unlink()
+    stats, store = run(tmp_path, FakeText2Vec(), prune=True)
+    assert len(store) == 3
+    assert all(r.metadata["source"] != "billing" for r in store.search("Billing", top_k=5))
+
+
+class CountingStore(NumpyStore):
+    saves = 0
+
+    def save(self):
+        self.saves += 1
+        super().save()
+
+
+def test_store_is_saved_at_checkpoints(tmp_path):
+    write_docs(tmp_path / "docs", DOCS)
+    store = CountingStore(FakeText2Vec(), collection_name="kb", path=tmp_path / "store")
+    # 3 batches of 2 slices
+    asyncio.run(aingest([str(tmp_path / "docs")], store, FakeText2Vec(),
+                        manifest_path=tmp_path / "store" / "manifest.json",
+                        batch_size=2, workers=2, checkpoint_every=100))
+    assert store.saves == 1
+
+    # every document marked done in the manifest is in the saved store
+    text2vec = FakeText2Vec()
+    stats, store = run(tmp_path, text2vec)
+    assert stats.skipped_documents == 3
+    assert len(store) == 5
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter():
+    now = [0.0]
+    limiter = RateLimiter(rpm=60, tpm=600, timer=lambda: now[0])
+    await limiter.acquire(300)
+    await limiter.acquire(300)
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    import cel.rag.ingest as ingest_module
+    original = ingest_module.asyncio.sleep
+    ingest_module.asyncio.sleep = fake_sleep
+    try:
+        await limiter.acquire(300)
+    finally:
+        ingest_module.asyncio.sleep = original
+    # 300 tokens at 10 tokens/s
+    assert sleeps == [30]
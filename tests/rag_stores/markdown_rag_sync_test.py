@@ -0,0 +1,80 @@
+import pytest
+from cel.rag.providers.markdown_rag import MarkdownRAG
+from cel.rag.stores.chroma.chroma_store import ChromaStore
+from cel.rag.stores.numpy.numpy_store import NumpyStore
+from cel.rag.text2vec.utils import Text2VectorProvider
+
+
+class CountingText2Vec(Text2VectorProvider):
+    model = "fake"
+
+    def __init__(self):
+        self.embedded = []
+
+    def text2vec(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), 1.0, float(text.count(" "))]
+
+    def texts2vec(self, texts):
+        return [self.text2vec(t) for t in texts]
+
+
+CONTENT = """# Fruits
+
+Pineapples are yellow.
+
+# Animals
+
+Dogs bark.
+
+# Birds
+
+Parrots talk.
+"""
+
+
+def build_store(kind, text2vec, path):
+    if kind == "chroma":
+        return ChromaStore(text2vec, collection_name="kb-test", path=path)
+    return NumpyStore(text2vec, collection_name="kb-test", path=path)
+
+
+@pytest.mark.parametrize("kind", ["chroma", "numpy"])
+def test_only_changed_slices_are_embedded(kind, tmp_path):
+    text2vec = CountingText2Vec()
+    rag = MarkdownRAG("kb", content=CONTENT, text2vec=text2vec, store=build_store(kind, text2vec, tmp_path))
+    rag.load()
+    first = len(text2vec.embedded)
+    assert first > 0
+
+    # restart with the same content: nothing to embed
+    text2vec = CountingText2Vec()
+    store = build_store(kind, text2vec, tmp_path)
+    MarkdownRAG("kb", content=CONTENT, text2vec=text2vec, store=store).load()
+    assert text2vec.embedded == []
+    assert len(store.get_content_hashes()) == first
+
+    # a changed and a removed section
+    changed = CONTENT.replace("Dogs bark.", "Dogs bark loudly.").replace("# Birds\n\nParrots talk.\n", "")
+    text2vec = CountingText2Vec()
+    store = build_store(kind, text2vec, tmp_path)
+    MarkdownRAG("kb", content=changed, text2vec=text2vec, store=store).load()
+    assert any("loudly" in t for t in text2vec.embedded)
+    assert not any("Pineapples" in t for t in text2vec.embedded)
+    stored = store.get_content_hashes()
+    assert len(stored) == first - 1
+    assert not any("Parrots" in (store.get_vector(id).text or "") for id in stored)
+
+
+def test_documents_share_a_store():
+    text2vec = CountingText2Vec()
+    store = NumpyStore(text2vec, collection_name="kb-test")
+    MarkdownRAG("faq", content=CONTENT, text2vec=text2vec, store=store).load()
+    faq = set(store.get_content_hashes())
+    MarkdownRAG("faq-extra", content="# Extra\n\nMore answers.\n", text2vec=text2vec, store=store).load()
+    MarkdownRAG("docs", content="# Docs\n\nRead the manual.\n", text2vec=text2vec, store=store).load()
+    assert set(store.get_content_hashes()) == faq | {"faq-extra-0", "docs-0"}
+
+    # reloading a shorter document only removes its own slices
+    MarkdownRAG("faq", content="# Fruits\n\nPineapples are yellow.\n", text2vec=text2vec, store=store).load()
+    assert set(store.get_content_hashes()) == {"faq-0", "faq-extra-0", "docs-0"}
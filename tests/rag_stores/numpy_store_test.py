@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from cel.rag.stores.numpy.numpy_store import NumpyStore
+from cel.rag.text2vec.utils import Text2VectorProvider
+
+
+WORDS = ["pineapple", "orange", "lemon", "dog", "parrot"]
+
+
+class BagOfWords(Text2VectorProvider):
+    def text2vec(self, text):
+        return [float(w in text.lower()) for w in WORDS] + [0.01]
+
+    def texts2vec(self, texts):
+        return [self.text2vec(t) for t in texts]
+
+
+texts = [f"This is a document about {w}s" for w in WORDS]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NumpyStore(BagOfWords(), collection_name="test", path=tmp_path)
+    provider = store.text2vec
+    store.upsert_many([str(i) for i in range(len(texts))],
+                      provider.texts2vec(texts),
+                      texts,
+                      [{"kind": "animal" if i > 2 else "fruit"} for i in range(len(texts))])
+    return store
+
+
+def test_search_top_k(store):
+    res = store.search("Tell me about parrots", top_k=2)
+    assert len(res) == 2
+    assert res[0].id == "4"
+    assert res[0].distance < res[1].distance
+    assert res[0].vector is None
+
+
+def test_search_projection(store):
+    res = store.search("parrot", include=["vector"])[0]
+    assert res.id == "4"
+    assert res.text is None and res.metadata is None and res.distance is None
+    assert np.isclose(np.linalg.norm(res.vector), 1)
+    with pytest.raises(AssertionError):
+        store.search("parrot", include=["embedding"])
+
+
+def test_metadata_filter(store):
+    res = store.search("parrot", top_k=5, where={"kind": "fruit"})
+    assert sorted(r.id for r in res) == ["0", "1", "2"]
+    assert store.search("parrot", where={"kind": "car"}) == []
+
+
+def test_upsert_and_delete_tombstones(store):
+    store.upsert("4", store.text2vec.text2vec("lemon"), "lemon", {"kind": "fruit"})
+    store.delete("3")
+    assert len(store) == 4
+    assert store.get_vector("3") is None
+    assert store.get_vector("4").text == "lemon"
+    res = store.search("lemon", top_k=5)
+    assert [r.id for r in res][:2] in (["2", "4"], ["4", "2"])
+    assert "3" not in [r.id for r in res]
+    assert sorted(r.id for r in store.search("lemon", top_k=5, where={"kind": "fruit"})) == ["0", "1", "2", "4"]
+
+
+def test_boots_from_disk(store, tmp_path):
+    # bulk writes are saved explicitly
+    assert not store.matrix_path.exists()
+    store.delete_many(["0"])
+    store.save()
+    reloaded = NumpyStore(BagOfWords(), collection_name="test", path=tmp_path)
+    assert isinstance(reloaded._matrix, np.memmap)
+    assert len(reloaded) == 4
+    assert reloaded.get_vector("0") is None
+    assert reloaded.search("dog")[0].id == "3"
+    # appends on top of the mapped matrix
+    reloaded.upsert_text("9", "pineapple again", {})
+    assert reloaded.search("pineapple")[0].id == "9"
+
+
+def test_compaction_keeps_results(tmp_path):
+    store = NumpyStore(BagOfWords(), compact_ratio=0.5)
+    for i in range(10):
+        store.upsert_text(str(i), texts[i % len(texts)], {"i": i})
+    for i in range(6):
+        store.delete(str(i))
+    assert store._tombstones < 6
+    assert sorted(r.id for r in store.search("dog", top_k=10)) == [str(i) for i in range(6, 10)]
+    assert store.search("dog", where={"i": 8})[0].id == "8"
+
+
+@pytest.mark.asyncio
+async def test_asearch(store):
+    res = await store.asearch("parrot")
+    assert res[0].id == "4"
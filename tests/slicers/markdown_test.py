@@ -22,3 +22,59 @@ def test_do():
     print(slices)
     assert 1==1
     
+
+
+MANUAL = """# Guide
+
+Intro.
+
+## Install
+
+Run pip.
+
+### Linux
+
+Use apt.
+
+## Usage
+
+Call the api.
+
+# Reference
+
+| Option | Default |
+| --- | --- |
+| timeout | 20 |
+| retries | 3 |
+"""
+
+
+def test_breadcrumbs_running_stack():
+    from cel.rag.slicers.markdown.utils import parse_markdown
+    blocks = [b for b in parse_markdown(MANUAL) if b.type == 'paragraph']
+    assert [b.breadcrumbs for b in blocks] == [
+        ['Guide'],
+        ['Guide', 'Install'],
+        ['Guide', 'Install', 'Linux'],
+        ['Guide', 'Usage'],
+    ]
+
+
+def test_breadcrumbs_match_backwards_walk():
+    import marko
+    from cel.rag.slicers.markdown.utils import build_breadcrumbs, parse_markdown
+    doc = marko.Markdown(extensions=['gfm']).parse(MANUAL)
+    for block in parse_markdown(MANUAL, split_table_rows=True):
+        assert block.breadcrumbs == build_breadcrumbs(doc, block.index)
+
+
+def test_split_table_rows_and_lazy_slices():
+    slicer = MarkdownSlicer('manual', content=MANUAL, split_table_rows=True)
+    slices = slicer.iter_slices()
+    first = next(slices)
+    assert first.id == 'manual-0'
+    assert first.text == 'Guide\nIntro.'
+    rows = [s.text for s in slices if s.text.startswith('Reference\nOption | Default')]
+    assert rows == ['Reference\nOption | Default\n--- | ---\ntimeout | 20',
+                    'Reference\nOption | Default\n--- | ---\nretries | 3']
+    assert [s.id for s in slicer.slice()] == [f'manual-{i}' for i in range(len(slicer.slice()))]
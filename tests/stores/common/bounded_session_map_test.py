@@ -0,0 +1,70 @@
+import pytest
+from cel.stores.common.bounded_session_map import BoundedSessionMap
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+def test_lru_eviction():
+    m = BoundedSessionMap(max_sessions=2)
+    m.set("a", 1)
+    m.set("b", 2)
+    assert m.get("a") == 1
+    m.set("c", 3)
+    # b is the least recently used
+    assert m.get("b") is None
+    assert m.get("a") == 1
+    assert m.get("c") == 3
+    assert m.stats()["evicted_lru"] == 1
+
+
+def test_idle_ttl(timer):
+    m = BoundedSessionMap(ttl=10, timer=timer)
+    m.set("a", 1)
+    m.set("b", 2)
+    timer.now = 8
+    assert m.get("a") == 1
+    timer.now = 15
+    # b is idle since 0, a was accessed at 8
+    assert m.get("b") is None
+    assert m.get("a") == 1
+    timer.now = 30
+    assert m.purge_expired() == 1
+    assert len(m) == 0
+    assert m.stats()["evicted_ttl"] == 2
+
+
+def test_weight_budget():
+    m = BoundedSessionMap(max_weight=5)
+    m.set("a", [1, 2], weight=2)
+    m.set("b", [1, 2], weight=2)
+    m.add_weight("b", 1)
+    assert m.stats()["weight"] == 5
+    assert m.get("a") is not None
+    m.add_weight("b", 1)
+    # over budget, b is the session being written, a is evicted
+    assert m.get("a") is None
+    assert m.get("b") is not None
+    assert m.stats()["weight"] == 4
+    assert m.stats()["evicted_budget"] == 1
+
+
+def test_pop_and_clear():
+    m = BoundedSessionMap()
+    m.set("a", 1, weight=3)
+    assert m.pop("a") == 1
+    assert m.pop("a") is None
+    m.set("b", 1, weight=3)
+    m.clear()
+    assert m.stats()["sessions"] == 0
+    assert m.stats()["weight"] == 0
@@ -0,0 +1,12 @@
+import json
+from cel.stores.common import fast_json
+
+
+def test_roundtrip():
+    value = {"name": "Ana", "items": [1, 2.5, None, True], "nested": {"a": "á"}}
+    assert fast_json.loads(fast_json.dumps(value)) == value
+
+
+def test_accepts_what_json_accepts():
+    value = {1: "a", "big": 2 ** 70 + 1, "negative": -(2 ** 63) - 1}
+    assert fast_json.loads(fast_json.dumps(value)) == json.loads(json.dumps(value))
@@ -39,3 +39,26 @@ async def test_list_get_last(store):
     await store.list_append('key', 'value2')
     l = await store.list_get_last('key', 2)
     assert l == ['value1', 'value2']
+
+@pytest.mark.asyncio
+async def test_list_append_many(store, aioredis):
+    await store.list_append('key', 'value0')
+    await store.list_append_many('key', ['value1', 'value2'], ttl=10)
+    await store.list_append_many('key', [])
+    l = await store.list_get('key')
+    assert l == ['value0', 'value1', 'value2']
+    assert 0 < await aioredis.ttl('h:key') <= 10
+
+@pytest.mark.asyncio
+async def test_list_append_max_length(store):
+    await store.list_append_many('key', ['value0', 'value1', 'value2'], max_length=2)
+    assert await store.list_get('key') == ['value1', 'value2']
+    await store.list_append('key', 'value3', max_length=2)
+    assert await store.list_get('key') == ['value2', 'value3']
+
+@pytest.mark.asyncio
+async def test_list_trim(store):
+    await store.list_append_many('key', ['value0', 'value1', 'value2'])
+    await store.list_trim('key', 1)
+    assert await store.list_get('key') == ['value2']
+    assert await store.list_get_last('key', 0) == []
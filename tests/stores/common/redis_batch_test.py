@@ -0,0 +1,131 @@
+import fakeredis
+import pytest
+import shortuuid
+from cel.connectors.telegram.model.telegram_lead import TelegramLead
+from cel.gateway.model.message import Message
+from cel.middlewares.redis_blacklist import RedisBlackListMiddleware
+from cel.middlewares.redis_blacklist_async import RedisBlackListAsyncMiddleware
+from cel.stores.common import redis_batch
+from cel.stores.common.redis_batch import RedisBatch
+
+
+class MockMessage(Message):
+    def __init__(self, lead):
+        self.lead = lead
+
+    def is_voice_message(self):
+        return False
+
+    @classmethod
+    def load_from_dict(cls, message_dict: dict):
+        pass
+
+
+@pytest.fixture
+def client():
+    return fakeredis.aioredis.FakeRedis()
+
+
+@pytest.mark.asyncio
+async def test_direct_without_batch(client):
+    assert RedisBatch.current() is None
+    await redis_batch.hset(client, "h", "f", "v")
+    assert await redis_batch.hget(client, "h", "f") == b"v"
+    await redis_batch.hdel(client, "h", "f")
+    assert await client.hget("h", "f") is None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_and_flush(client):
+    await client.hset("h", "a", "1")
+    batch = RedisBatch()
+    token = batch.activate()
+    try:
+        batch.prefetch_hget(client, "h", "a")
+        batch.prefetch_hget(client, "h", "b")
+        await batch.load()
+        assert batch.round_trips == 1
+        assert await redis_batch.hget(client, "h", "a") == b"1"
+        assert await redis_batch.hget(client, "h", "b") is None
+        assert batch.round_trips == 1
+
+        # writes are deferred but visible in the batch
+        await redis_batch.hset(client, "h", "b", "2")
+        await redis_batch.hdel(client, "h", "a")
+        assert await redis_batch.hget(client, "h", "b") == "2"
+        assert await redis_batch.hget(client, "h", "a") is None
+        assert await client.hget("h", "b") is None
+    finally:
+        batch.deactivate(token)
+        await batch.flush()
+
+    assert batch.round_trips == 2
+    assert RedisBatch.current() is None
+    assert await client.hgetall("h") == {b"b": b"2"}
+
+
+@pytest.mark.asyncio
+async def test_delete_key(client):
+    await client.hset("h", "a", "1")
+    batch = RedisBatch()
+    token = batch.activate()
+    await redis_batch.delete(client, "h")
+    assert await redis_batch.hget(client, "h", "a") is None
+    await redis_batch.hset(client, "h", "b", "2")
+    assert await redis_batch.hget(client, "h", "b") == "2"
+    batch.deactivate(token)
+    await batch.flush()
+    assert await client.hgetall("h") == {b"b": b"2"}
+
+
+class FailingPipelineRedis(fakeredis.aioredis.FakeRedis):
+    def pipeline(self, transaction=True, shard_hint=None):
+        raise ConnectionError("pipeline failed")
+
+
+@pytest.mark.asyncio
+async def test_flush_falls_back_to_single_commands():
+    client = FailingPipelineRedis()
+    batch = RedisBatch()
+    batch.hset(client, "h", "a", "1")
+    batch.hset(client, "h", "b", "2")
+    await batch.flush()
+    assert await client.hgetall("h") == {b"a": b"1", b"b": b"2"}
+
+
+class DownRedis(FailingPipelineRedis):
+    async def hset(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_flush_raises_when_writes_fail():
+    batch = RedisBatch()
+    batch.hset(DownRedis(), "h", "a", "1")
+    with pytest.raises(ConnectionError):
+        await batch.flush()
+
+
+@pytest.mark.asyncio
+async def test_blacklist_middlewares_prefetch(client):
+    sync_client = fakeredis.FakeRedis()
+    mw_async = RedisBlackListAsyncMiddleware(redis=client)
+    mw_sync = RedisBlackListMiddleware(redis=sync_client)
+    lead = TelegramLead(shortuuid.uuid())
+    message = MockMessage(lead)
+    await mw_async.add_to_black_list(lead.get_session_id(), "test reason")
+
+    batch = RedisBatch()
+    token = batch.activate()
+    try:
+        for mw in (mw_async, mw_sync):
+            mw.prefetch(message, batch)
+        await batch.load()
+        # one round-trip per client
+        assert batch.round_trips == 2
+        assert await mw_sync(message, None, None) == True
+        assert await mw_async(message, None, None) == False
+        assert batch.round_trips == 2
+    finally:
+        batch.deactivate(token)
+        await batch.flush()
@@ -0,0 +1,55 @@
+import pytest
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.stores.history.history_bounded_memory_provider import BoundedInMemoryHistoryProvider
+
+
+@pytest.fixture
+def lead():
+    lead = ConversationLead()
+    return lead.get_session_id()
+
+
+@pytest.fixture
+def history() -> BoundedInMemoryHistoryProvider:
+    return BoundedInMemoryHistoryProvider(key_prefix='test', max_length=5)
+
+
+@pytest.mark.asyncio
+async def test_append_and_get(history: BoundedInMemoryHistoryProvider, lead):
+    await history.append_to_history(lead, {'message': 'test0'})
+    await history.append_many(lead, [{'message': 'test1'}, {'message': 'test2'}])
+    assert await history.get_history(lead) == [{'message': 'test0'}, {'message': 'test1'}, {'message': 'test2'}]
+    assert await history.get_last_messages(lead, 2) == [{'message': 'test1'}, {'message': 'test2'}]
+    assert await history.get_last_messages(lead, 0) == []
+    assert await history.get_history('unknown') == []
+
+
+@pytest.mark.asyncio
+async def test_ring_buffer(history: BoundedInMemoryHistoryProvider, lead):
+    await history.append_many(lead, [{'message': f'test{i}'} for i in range(8)])
+    assert await history.get_history(lead) == [{'message': f'test{i}'} for i in range(3, 8)]
+    assert history.stats()['weight'] == 5
+
+
+@pytest.mark.asyncio
+async def test_clear_history(history: BoundedInMemoryHistoryProvider, lead):
+    await history.append_many(lead, [{'message': f'test{i}'} for i in range(4)])
+    await history.clear_history(lead, keep_last_messages=1)
+    assert await history.get_history(lead) == [{'message': 'test3'}]
+    assert history.stats()['weight'] == 1
+    await history.clear_history(lead)
+    assert await history.get_history(lead) == []
+    assert history.stats()['weight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_global_budget():
+    history = BoundedInMemoryHistoryProvider(max_length=10, max_total_entries=6)
+    await history.append_many('s1', [1, 2, 3])
+    await history.append_many('s2', [1, 2, 3])
+    await history.append_to_history('s2', 4)
+    assert await history.get_history('s1') == []
+    assert await history.get_history('s2') == [1, 2, 3, 4]
+    stats = history.stats()
+    assert stats['sessions'] == 1
+    assert stats['evicted_budget'] == 1
@@ -0,0 +1,55 @@
+import pytest
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.stores.state.state_bounded_memory_provider import BoundedInMemoryStateProvider
+
+
+@pytest.fixture
+def lead() -> str:
+    lead = ConversationLead()
+    return lead.get_session_id()
+
+
+@pytest.fixture
+def store():
+    return BoundedInMemoryStateProvider()
+
+
+@pytest.mark.asyncio
+async def test_set_key_value(store: BoundedInMemoryStateProvider, lead):
+    await store.set_key_value(lead, 'key1', 'value1')
+    assert await store.get_key_value(lead, 'key1') == 'value1'
+    assert await store.get_key_value(lead, 'key2') is None
+
+
+@pytest.mark.asyncio
+async def test_get_set_store(store: BoundedInMemoryStateProvider, lead):
+    await store.set_key_value(lead, 'key0', 'value0')
+    await store.set_key_value(lead, 'key1', 'value1')
+    assert await store.get_store(lead) == {'key0': 'value0', 'key1': 'value1'}
+    await store.set_store(lead, {'key2': 'value2'})
+    assert await store.get_store(lead) == {'key2': 'value2'}
+    assert store.stats()['weight'] == 1
+
+
+@pytest.mark.asyncio
+async def test_clear(store: BoundedInMemoryStateProvider, lead):
+    await store.set_key_value(lead, 'key0', 'value0')
+    await store.set_key_value('other', 'key0', 'value0')
+    await store.clear_store(lead)
+    assert await store.get_store(lead) is None
+    assert await store.get_store('other') == {'key0': 'value0'}
+    await store.clear_all_stores()
+    assert await store.get_store('other') is None
+
+
+@pytest.mark.asyncio
+async def test_max_sessions():
+    store = BoundedInMemoryStateProvider(max_sessions=2)
+    await store.set_key_value('s1', 'k', 1)
+    await store.set_key_value('s2', 'k', 2)
+    await store.get_store('s1')
+    await store.set_key_value('s3', 'k', 3)
+    assert await store.get_store('s2') is None
+    assert await store.get_key_value('s1', 'k') == 1
+    assert await store.get_key_value('s3', 'k') == 3
+    assert store.stats()['evicted_lru'] == 1
@@ -0,0 +1,72 @@
+import pytest
+import fakeredis.aioredis
+import pytest_asyncio
+from cel.gateway.model.conversation_lead import ConversationLead
+from cel.stores.common.async_cache_aside_redis import AsyncMemRedisCacheAside
+from cel.stores.state.state_redis_provider_async import RedisChatStateProviderAsync
+
+@pytest.fixture
+def lead() -> str:
+    lead = ConversationLead()
+    return lead.get_session_id()
+
+@pytest_asyncio.fixture()
+async def redis_client():
+    return fakeredis.aioredis.FakeRedis()
+
+@pytest.fixture
+def store(redis_client):
+    return RedisChatStateProviderAsync(redis_client, 's')
+
+@pytest.fixture
+def cached_store(redis_client):
+    cache = AsyncMemRedisCacheAside(redis_client, 'sc', memory_maxsize=10, ttl=60)
+    return RedisChatStateProviderAsync(redis_client, 's', cache=cache)
+
+
+@pytest.mark.asyncio
+async def test_set_key_value(store: RedisChatStateProviderAsync, lead):
+    await store.set_key_value(lead, 'key1', 'value1')
+    v = await store.get_key_value(lead, 'key1')
+    assert v == 'value1'
+    
+@pytest.mark.asyncio
+async def test_set_store(store: RedisChatStateProviderAsync, lead, redis_client):
+    await store.set_store(lead, {'key0': 'value0', 'key1': {'a': 1}}, ttl=10)
+    assert await store.get_store(lead) == {'key0': 'value0', 'key1': {'a': 1}}
+    assert 0 < await redis_client.ttl(store.get_key(lead)) <= 10
+    
+    # the whole state is replaced
+    await store.set_store(lead, {'key1': 'value1'})
+    assert await store.get_store(lead) == {'key1': 'value1'}
+    
+    await store.set_store(lead, {})
+    assert await store.get_store(lead) is None
+
+@pytest.mark.asyncio
+async def test_clear_all_stores(redis_client):
+    store = RedisChatStateProviderAsync(redis_client, 's', scan_batch_size=2)
+    sessions = [ConversationLead().get_session_id() for _ in range(5)]
+    for s in sessions:
+        await store.set_key_value(s, 'key0', 'value0')
+    await redis_client.set('other:key', 'keep')
+    
+    await store.clear_all_stores()
+    for s in sessions:
+        assert await store.get_store(s) is None
+    assert await redis_client.get('other:key') == b'keep'
+
+@pytest.mark.asyncio
+async def test_cached_store(cached_store: RedisChatStateProviderAsync, lead):
+    await cached_store.set_store(lead, {'key0': 'value0'})
+    
+    state = await cached_store.get_store(lead)
+    state['key0'] = 'changed'
+    assert await cached_store.get_store(lead) == {'key0': 'value0'}
+    assert cached_store.cache.cache_memory_hits == 2
+    
+    await cached_store.set_key_value(lead, 'key1', 'value1')
+    assert await cached_store.get_store(lead) == {'key0': 'value0', 'key1': 'value1'}
+    
+    await cached_store.clear_store(lead)
+    assert await cached_store.get_store(lead) is None
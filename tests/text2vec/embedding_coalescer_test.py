@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from cel.rag.text2vec.cache.disk_cache import DiskCache
+from cel.rag.text2vec.cached_openai import CachedOpenAIEmbedding
+from cel.rag.text2vec.coalescing import EmbeddingCoalescer
+
+
+def fake_vector(text):
+    return [float(len(text)), 1.0]
+
+
+class FakeBatch:
+    def __init__(self, delay=0.01, error=None):
+        self.calls = []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [fake_vector(t) for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_and_micro_batching():
+    embed_batch = FakeBatch()
+    coalescer = EmbeddingCoalescer(embed_batch, batch_window=0.01)
+    texts = ["hello", "refunds", "hello", "shipping", "refunds", "hello"]
+    res = await asyncio.gather(*[coalescer.embed(t) for t in texts])
+    assert res == [fake_vector(t) for t in texts]
+    assert embed_batch.calls == [["hello", "refunds", "shipping"]]
+    assert coalescer.stats()["coalesced"] == 3
+    assert coalescer.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_and_concurrency():
+    embed_batch = FakeBatch(delay=0.05)
+    coalescer = EmbeddingCoalescer(embed_batch, batch_window=1, max_batch_size=2, max_concurrency=1)
+    res = await coalescer.embed_many([f"t{i}" for i in range(5)])
+    assert len(res) == 5
+    assert sorted(len(c) for c in embed_batch.calls) == [1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    coalescer = EmbeddingCoalescer(FakeBatch(error=ValueError("boom")), batch_window=0)
+    results = await asyncio.gather(coalescer.embed("a"), coalescer.embed("a"), coalescer.embed("b"),
+                                   return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert coalescer.stats()["inflight"] == 0
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, input, model):
+        self.calls.append(list(input))
+        await asyncio.sleep(0.01)
+        # the API may return the data in any order
+        data = [SimpleNamespace(index=i, embedding=fake_vector(t)) for i, t in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.mark.asyncio
+async def test_openai_async_provider(tmp_path):
+    provider = CachedOpenAIEmbedding(api_key="test", cache_backend=DiskCache(cache_dir=str(tmp_path)))
+    embeddings = FakeEmbeddings()
+    provider._aclient = SimpleNamespace(embeddings=embeddings)
+
+    queries = ["how do refunds work", "opening hours", "how do refunds work"] * 10
+    res = await asyncio.gather(*[provider.atext2vec(q) for q in queries])
+    assert res == [fake_vector(q) for q in queries]
+    assert embeddings.calls == [["how do refunds work", "opening hours"]]
+
+    # cached for the async and the sync paths
+    assert await provider.atexts2vec(["opening hours", "new question"]) == [fake_vector("opening hours"), fake_vector("new question")]
+    assert embeddings.calls[1:] == [["new question"]]
+    assert provider.text2vec("opening hours") == fake_vector("opening hours")
@@ -0,0 +1,71 @@
+import pytest
+from cel.rag.text2vec.cache.disk_cache import DiskCache
+from cel.rag.text2vec.utils import cached_texts2vec
+
+
+def fake_text2vec(text: str, model: str) -> list[float]:
+    return [float(len(text)), 1.0]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(cache_dir=str(tmp_path))
+
+
+def test_batches_dedup_and_order(cache):
+    calls = []
+    
+    def embed_batch(batch):
+        calls.append(batch)
+        return [fake_text2vec(t, "m") for t in batch]
+    
+    texts = ["a", "bb", "a", "ccc", "dddd", "bb"]
+    res = cached_texts2vec(texts, embed_batch,
+                           cache_backend=cache,
+                           cached_func=fake_text2vec,
+                           cache_args=("m",),
+                           cache_tag="test",
+                           batch_size=2,
+                           max_concurrency=2)
+    
+    assert res == [fake_text2vec(t, "m") for t in texts]
+    # unique texts only, in chunks of batch_size
+    assert sorted(len(b) for b in calls) == [2, 2]
+    assert sorted(t for b in calls for t in b) == ["a", "bb", "ccc", "dddd"]
+
+
+def test_bulk_cache_is_shared_with_memoize(cache):
+    memoized = cache.memoize(typed=True, expire=60, tag="test")(fake_text2vec)
+    memoized("a", "m")
+    
+    calls = []
+    
+    def embed_batch(batch):
+        calls.append(batch)
+        return [fake_text2vec(t, "m") for t in batch]
+    
+    kwargs = dict(cache_backend=cache, cached_func=fake_text2vec, cache_args=("m",), cache_tag="test")
+    cached_texts2vec(["a", "bb"], embed_batch, **kwargs)
+    assert calls == [["bb"]]
+    
+    # everything is cached now, no calls
+    res = cached_texts2vec(["bb", "a"], embed_batch, **kwargs)
+    assert calls == [["bb"]]
+    assert res == [[2.0, 1.0], [1.0, 1.0]]
+    # the memoized single path reads the bulk entries
+    assert cache.cache.get(cache.memoize_key(fake_text2vec, True, "test", "bb", "m")) == [2.0, 1.0]
+
+
+class StringCache(DiskCache):
+    """Returns cached vectors as strings, like RedisCache"""
+
+    def get_many(self, keys):
+        return [str(v) if v is not None else None for v in super().get_many(keys)]
+
+
+def test_string_cache_values_are_float_vectors(tmp_path):
+    cache = StringCache(cache_dir=str(tmp_path))
+    kwargs = dict(cache_backend=cache, cached_func=fake_text2vec, cache_args=("m",), cache_tag="test")
+    embed_batch = lambda batch: [fake_text2vec(t, "m") for t in batch]
+    cached_texts2vec(["a"], embed_batch, **kwargs)
+    assert cached_texts2vec(["a", "bb"], embed_batch, **kwargs) == [[1.0, 1.0], [2.0, 1.0]]